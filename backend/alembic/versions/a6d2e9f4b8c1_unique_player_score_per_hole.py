@@ -0,0 +1,36 @@
+"""Unique player score per hole
+
+Revision ID: a6d2e9f4b8c1
+Revises: f3b9c7d2a614
+Create Date: 2026-10-17 09:12:40.518307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d2e9f4b8c1'
+down_revision: Union[str, None] = 'f3b9c7d2a614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep only the latest score where a hole was recorded more than once
+    op.execute(
+        "DELETE FROM player_scores WHERE id NOT IN ("
+        "SELECT id FROM (SELECT MAX(id) AS id FROM player_scores GROUP BY match_id, player_id, hole_id) AS latest"
+        ")"
+    )
+    op.create_unique_constraint(
+        'uq_player_scores_match_id_player_id_hole_id', 'player_scores', ['match_id', 'player_id', 'hole_id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_player_scores_match_id_player_id_hole_id', 'player_scores', type_='unique')
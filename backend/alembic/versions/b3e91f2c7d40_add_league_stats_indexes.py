@@ -0,0 +1,43 @@
+"""Add league stats indexes
+
+Revision ID: b3e91f2c7d40
+Revises: d7c0c6d17106
+Create Date: 2026-10-16 09:12:44.218305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e91f2c7d40'
+down_revision: Union[str, None] = 'd7c0c6d17106'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # MatchPlayer -> Match -> Week join path used by the stats endpoints
+    op.create_index('ix_league_weeks_league_id_id', 'league_weeks', ['league_id', 'id'], unique=False)
+    op.create_index('ix_matches_week_id_is_completed', 'matches', ['week_id', 'is_completed'], unique=False)
+    op.create_index('ix_match_players_player_id_gross_score', 'match_players', ['player_id', 'gross_score'], unique=False)
+    
+    # Top gross/net score listings
+    op.create_index('ix_match_players_gross_score_match_id', 'match_players', ['gross_score', 'match_id'], unique=False)
+    op.create_index('ix_match_players_net_score_match_id', 'match_players', ['net_score', 'match_id'], unique=False)
+    
+    # Scorecard loads
+    op.create_index('ix_player_scores_match_id_player_id', 'player_scores', ['match_id', 'player_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_player_scores_match_id_player_id', table_name='player_scores')
+    op.drop_index('ix_match_players_net_score_match_id', table_name='match_players')
+    op.drop_index('ix_match_players_gross_score_match_id', table_name='match_players')
+    op.drop_index('ix_match_players_player_id_gross_score', table_name='match_players')
+    op.drop_index('ix_matches_week_id_is_completed', table_name='matches')
+    op.drop_index('ix_league_weeks_league_id_id', table_name='league_weeks')
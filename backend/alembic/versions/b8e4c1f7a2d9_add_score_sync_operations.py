@@ -0,0 +1,44 @@
+"""Add score sync operations
+
+Revision ID: b8e4c1f7a2d9
+Revises: a6d2e9f4b8c1
+Create Date: 2026-10-17 11:03:22.846150
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e4c1f7a2d9'
+down_revision: Union[str, None] = 'a6d2e9f4b8c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('score_sync_operations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('idempotency_key', sa.String(length=64), nullable=False),
+    sa.Column('match_id', sa.Integer(), nullable=False),
+    sa.Column('player_id', sa.Integer(), nullable=False),
+    sa.Column('hole_id', sa.Integer(), nullable=False),
+    sa.Column('strokes', sa.Integer(), nullable=True),
+    sa.Column('client_timestamp', sa.DateTime(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['match_id'], ['matches.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_score_sync_operations_id'), 'score_sync_operations', ['id'], unique=False)
+    op.create_index(op.f('ix_score_sync_operations_idempotency_key'), 'score_sync_operations', ['idempotency_key'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_score_sync_operations_idempotency_key'), table_name='score_sync_operations')
+    op.drop_index(op.f('ix_score_sync_operations_id'), table_name='score_sync_operations')
+    op.drop_table('score_sync_operations')
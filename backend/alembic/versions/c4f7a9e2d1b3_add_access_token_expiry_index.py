@@ -0,0 +1,28 @@
+"""Add access token expiry index
+
+Revision ID: c4f7a9e2d1b3
+Revises: b8e4c1f7a2d9
+Create Date: 2026-10-17 13:41:08.210574
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f7a9e2d1b3'
+down_revision: Union[str, None] = 'b8e4c1f7a2d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_match_access_tokens_expires_at', 'match_access_tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_match_access_tokens_expires_at', table_name='match_access_tokens')
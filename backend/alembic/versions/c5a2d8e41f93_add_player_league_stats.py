@@ -0,0 +1,48 @@
+"""Add player league stats rollup
+
+Revision ID: c5a2d8e41f93
+Revises: b3e91f2c7d40
+Create Date: 2026-10-16 10:02:17.504821
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a2d8e41f93'
+down_revision: Union[str, None] = 'b3e91f2c7d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('player_league_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('league_id', sa.Integer(), nullable=False),
+    sa.Column('player_id', sa.Integer(), nullable=False),
+    sa.Column('rounds_played', sa.Integer(), nullable=False),
+    sa.Column('gross_total', sa.Integer(), nullable=False),
+    sa.Column('lowest_gross', sa.Integer(), nullable=True),
+    sa.Column('net_rounds', sa.Integer(), nullable=False),
+    sa.Column('net_total', sa.Integer(), nullable=False),
+    sa.Column('lowest_net', sa.Integer(), nullable=True),
+    sa.Column('points_rounds', sa.Integer(), nullable=False),
+    sa.Column('points_total', sa.Float(), nullable=False),
+    sa.Column('best_points', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['league_id'], ['leagues.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['player_id'], ['players.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('league_id', 'player_id', name='_league_player_stats_uc')
+    )
+    op.create_index(op.f('ix_player_league_stats_id'), 'player_league_stats', ['id'], unique=False)
+    # Existing leagues are backfilled with: python rebuild_stats.py --all
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_player_league_stats_id'), table_name='player_league_stats')
+    op.drop_table('player_league_stats')
@@ -0,0 +1,28 @@
+"""Add league data version
+
+Revision ID: e5b2d8f1a9c4
+Revises: c4f7a9e2d1b3
+Create Date: 2026-10-17 16:12:44.508213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b2d8f1a9c4'
+down_revision: Union[str, None] = 'c4f7a9e2d1b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('leagues', sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('leagues', 'data_version')
@@ -0,0 +1,48 @@
+"""Add team league standings
+
+Revision ID: e8f4a1b6c2d7
+Revises: c5a2d8e41f93
+Create Date: 2026-10-16 11:41:05.218330
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8f4a1b6c2d7'
+down_revision: Union[str, None] = 'c5a2d8e41f93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('team_league_standings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('league_id', sa.Integer(), nullable=False),
+    sa.Column('team_id', sa.Integer(), nullable=False),
+    sa.Column('matches_played', sa.Integer(), nullable=False),
+    sa.Column('points_won', sa.Float(), nullable=False),
+    sa.Column('points_lost', sa.Float(), nullable=False),
+    sa.Column('gross_rounds', sa.Integer(), nullable=False),
+    sa.Column('gross_total', sa.Integer(), nullable=False),
+    sa.Column('lowest_gross', sa.Integer(), nullable=True),
+    sa.Column('net_rounds', sa.Integer(), nullable=False),
+    sa.Column('net_total', sa.Integer(), nullable=False),
+    sa.Column('lowest_net', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['league_id'], ['leagues.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('league_id', 'team_id', name='_league_team_standings_uc')
+    )
+    op.create_index(op.f('ix_team_league_standings_id'), 'team_league_standings', ['id'], unique=False)
+    # Existing leagues are backfilled with: python rebuild_stats.py --all
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_team_league_standings_id'), table_name='team_league_standings')
+    op.drop_table('team_league_standings')
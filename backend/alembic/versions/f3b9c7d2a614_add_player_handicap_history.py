@@ -0,0 +1,49 @@
+"""Add player handicap history
+
+Revision ID: f3b9c7d2a614
+Revises: e8f4a1b6c2d7
+Create Date: 2026-10-16 14:27:51.830264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9c7d2a614'
+down_revision: Union[str, None] = 'e8f4a1b6c2d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('player_handicap_history',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('player_id', sa.Integer(), nullable=False),
+    sa.Column('league_id', sa.Integer(), nullable=True),
+    sa.Column('handicap', sa.Float(), nullable=True),
+    sa.Column('effective_date', sa.Date(), nullable=False),
+    sa.Column('source', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['league_id'], ['leagues.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['player_id'], ['players.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_player_handicap_history_id'), 'player_handicap_history', ['id'], unique=False)
+    op.create_index('ix_player_handicap_history_player_id_effective_date', 'player_handicap_history', ['player_id', 'effective_date'], unique=False)
+    
+    # Start every player's history from their current handicap
+    op.execute(
+        "INSERT INTO player_handicap_history (player_id, handicap, effective_date, source, created_at) "
+        "SELECT id, handicap, CURRENT_DATE, 'baseline', CURRENT_TIMESTAMP FROM players WHERE handicap IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_player_handicap_history_player_id_effective_date', table_name='player_handicap_history')
+    op.drop_index(op.f('ix_player_handicap_history_id'), table_name='player_handicap_history')
+    op.drop_table('player_handicap_history')
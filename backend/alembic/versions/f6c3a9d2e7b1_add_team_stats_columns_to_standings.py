@@ -0,0 +1,43 @@
+"""Add team stats columns to team league standings
+
+Revision ID: f6c3a9d2e7b1
+Revises: e5b2d8f1a9c4
+Create Date: 2026-10-17 17:03:29.741856
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6c3a9d2e7b1'
+down_revision: Union[str, None] = 'e5b2d8f1a9c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('team_league_standings', sa.Column('scored_matches', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('team_league_standings', sa.Column('scored_points_won', sa.Float(), server_default='0', nullable=False))
+    op.add_column('team_league_standings', sa.Column('scored_points_lost', sa.Float(), server_default='0', nullable=False))
+    op.add_column('team_league_standings', sa.Column('scored_gross_total', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('team_league_standings', sa.Column('scored_lowest_gross', sa.Integer(), nullable=True))
+    op.add_column('team_league_standings', sa.Column('scored_net_rounds', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('team_league_standings', sa.Column('scored_net_total', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('team_league_standings', sa.Column('scored_lowest_net', sa.Integer(), nullable=True))
+    # Existing leagues are backfilled with: python rebuild_stats.py --all
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('team_league_standings', 'scored_lowest_net')
+    op.drop_column('team_league_standings', 'scored_net_total')
+    op.drop_column('team_league_standings', 'scored_net_rounds')
+    op.drop_column('team_league_standings', 'scored_lowest_gross')
+    op.drop_column('team_league_standings', 'scored_gross_total')
+    op.drop_column('team_league_standings', 'scored_points_lost')
+    op.drop_column('team_league_standings', 'scored_points_won')
+    op.drop_column('team_league_standings', 'scored_matches')
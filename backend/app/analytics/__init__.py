@@ -0,0 +1,9 @@
+"""Vectorized season analytics over a league's MatchPlayer rows"""
+from app.analytics.season import (
+    SeasonFrame,
+    load_season_frame,
+    player_metrics,
+    team_metrics,
+    most_improved,
+    to_records,
+)
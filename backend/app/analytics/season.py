@@ -0,0 +1,195 @@
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.match import Match
+from app.models.match_player import MatchPlayer
+from app.models.week import Week
+
+class SeasonFrame:
+    """
+    One league season's MatchPlayer rows as contiguous column arrays.
+    Rows are sorted by player, then match date, then match id, so every
+    player's rounds form one chronological run. Missing scores are NaN.
+    """
+
+    def __init__(self, player_id, team_id, match_id, match_date, gross, net, points):
+        player_id = np.asarray(player_id, dtype=np.int64)
+        match_id = np.asarray(match_id, dtype=np.int64)
+        match_date = np.asarray(match_date, dtype="datetime64[D]")
+        order = np.lexsort((match_id, match_date, player_id))
+
+        self.player_id = player_id[order]
+        self.team_id = np.asarray(team_id, dtype=np.int64)[order]
+        self.match_id = match_id[order]
+        self.match_date = match_date[order]
+        self.gross = np.asarray(gross, dtype=np.float64)[order]
+        self.net = np.asarray(net, dtype=np.float64)[order]
+        self.points = np.asarray(points, dtype=np.float64)[order]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> "SeasonFrame":
+        """Build from (player_id, team_id, match_id, match_date, gross, net, points) tuples"""
+        columns = list(zip(*rows)) or [()] * 7
+        # float64 conversion turns NULL scores (None) into NaN
+        return cls(*columns)
+
+    def __len__(self) -> int:
+        return len(self.player_id)
+
+def load_season_frame(db: Session, league_id: int) -> SeasonFrame:
+    """Load every MatchPlayer row of a league in one query"""
+    rows = db.execute(
+        select(
+            MatchPlayer.player_id,
+            MatchPlayer.team_id,
+            MatchPlayer.match_id,
+            Match.match_date,
+            MatchPlayer.gross_score,
+            MatchPlayer.net_score,
+            MatchPlayer.points
+        ).join(
+            Match, MatchPlayer.match_id == Match.id
+        ).join(
+            Week, Match.week_id == Week.id
+        ).where(
+            Week.league_id == league_id
+        )
+    ).all()
+    return SeasonFrame.from_rows(rows)
+
+PLAYER_METRICS = (
+    "player_id", "latest_team_id", "rounds_played", "gross_total", "avg_gross", "lowest_gross",
+    "net_rounds", "avg_net", "lowest_net", "points_rounds", "total_points", "avg_points",
+    "best_points", "handicap_differential",
+)
+
+TEAM_METRICS = (
+    "team_id", "player_rounds", "avg_gross", "lowest_gross", "avg_net", "lowest_net",
+    "total_points", "avg_points",
+)
+
+IMPROVEMENT_METRICS = ("player_id", "total_rounds", "initial_avg", "overall_avg", "improvement")
+
+def _group_starts(keys: np.ndarray) -> np.ndarray:
+    """Start offset of each run of equal values in a sorted key array"""
+    return np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+
+def _grouped(values: np.ndarray, starts: np.ndarray) -> Dict[str, np.ndarray]:
+    """Count, sum, min and max of the non-NaN values in each group"""
+    present = ~np.isnan(values)
+    count = np.add.reduceat(present.astype(np.int64), starts)
+    total = np.add.reduceat(np.where(present, values, 0.0), starts)
+    lowest = np.minimum.reduceat(np.where(present, values, np.inf), starts)
+    highest = np.maximum.reduceat(np.where(present, values, -np.inf), starts)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        average = np.where(count > 0, total / count, np.nan)
+    return {
+        "count": count,
+        "total": total,
+        "average": average,
+        "lowest": np.where(count > 0, lowest, np.nan),
+        "highest": np.where(count > 0, highest, np.nan),
+    }
+
+def player_metrics(frame: SeasonFrame) -> Dict[str, np.ndarray]:
+    """
+    Per-player season metrics, one array element per player (ascending id).
+    Net averages only count rounds with a gross score, matching the rollups.
+    """
+    if not len(frame):
+        return {name: np.array([]) for name in PLAYER_METRICS}
+
+    starts = _group_starts(frame.player_id)
+    ends = np.concatenate((starts[1:], [len(frame)])) - 1
+
+    gross = _grouped(frame.gross, starts)
+    net = _grouped(np.where(np.isnan(frame.gross), np.nan, frame.net), starts)
+    points = _grouped(frame.points, starts)
+
+    return {
+        "player_id": frame.player_id[starts],
+        "latest_team_id": frame.team_id[ends],
+        "rounds_played": gross["count"],
+        "gross_total": gross["total"],
+        "avg_gross": gross["average"],
+        "lowest_gross": gross["lowest"],
+        "net_rounds": net["count"],
+        "avg_net": net["average"],
+        "lowest_net": net["lowest"],
+        "points_rounds": points["count"],
+        "total_points": points["total"],
+        "avg_points": points["average"],
+        "best_points": points["highest"],
+        "handicap_differential": gross["average"] - net["average"],
+    }
+
+def team_metrics(frame: SeasonFrame) -> Dict[str, np.ndarray]:
+    """Per-team metrics over the individual rounds played for each team (ascending team id)"""
+    if not len(frame):
+        return {name: np.array([]) for name in TEAM_METRICS}
+
+    order = np.argsort(frame.team_id, kind="stable")
+    team_id = frame.team_id[order]
+    starts = _group_starts(team_id)
+
+    gross = _grouped(frame.gross[order], starts)
+    net = _grouped(frame.net[order], starts)
+    points = _grouped(frame.points[order], starts)
+
+    return {
+        "team_id": team_id[starts],
+        "player_rounds": gross["count"],
+        "avg_gross": gross["average"],
+        "lowest_gross": gross["lowest"],
+        "avg_net": net["average"],
+        "lowest_net": net["lowest"],
+        "total_points": points["total"],
+        "avg_points": points["average"],
+    }
+
+def most_improved(frame: SeasonFrame, min_rounds: int = 4, initial_rounds: int = 3) -> Dict[str, np.ndarray]:
+    """
+    Compare each player's first initial_rounds gross scores with their season
+    average. Only players with at least min_rounds gross rounds are included;
+    positive improvement means the season average is lower than the start.
+    Results are ordered by player id.
+    """
+    has_gross = ~np.isnan(frame.gross)
+    player_id = frame.player_id[has_gross]
+    gross = frame.gross[has_gross]
+    if not len(gross):
+        return {name: np.array([]) for name in IMPROVEMENT_METRICS}
+
+    starts = _group_starts(player_id)
+    counts = np.diff(np.concatenate((starts, [len(gross)])))
+
+    # Position of each round within its player's chronological run
+    position = np.arange(len(gross)) - np.repeat(starts, counts)
+    initial_total = np.add.reduceat(np.where(position < initial_rounds, gross, 0.0), starts)
+    overall_total = np.add.reduceat(gross, starts)
+
+    eligible = counts >= min_rounds
+    counts = counts[eligible]
+    initial_avg = initial_total[eligible] / np.minimum(counts, initial_rounds)
+    overall_avg = overall_total[eligible] / counts
+
+    return {
+        "player_id": player_id[starts][eligible],
+        "total_rounds": counts,
+        "initial_avg": initial_avg,
+        "overall_avg": overall_avg,
+        "improvement": initial_avg - overall_avg,
+    }
+
+def to_records(table: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Turn a metrics table into plain Python rows, with NaN as None"""
+    columns = {name: values.tolist() for name, values in table.items()}
+    size = len(next(iter(columns.values()), []))
+    return [
+        {name: (None if isinstance(values[i], float) and values[i] != values[i] else values[i]) for name, values in columns.items()}
+        for i in range(size)
+    ]
@@ -1,31 +1,29 @@
 from typing import Generator, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from app.core.security import ALGORITHM, SECRET_KEY
-from app.db.session import SessionLocal
+from app.core.user_cache import user_principals
+from app.db.session import get_db
 from app import schemas
 from app.crud import user as user_crud
 from app.models.user import User
 from app.schemas.user import TokenPayload
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
-
-def get_db() -> Generator:
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login", auto_error=False)
 
 def get_current_user(
     db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
 ) -> User:
-    
+    return get_user_from_token(db, token)
+
+def get_user_from_token(db: Session, token: str) -> User:
+    """The user a signed access token belongs to, or a 403/404"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         token_data = TokenPayload(**payload)
@@ -46,7 +44,19 @@ def get_current_user(
             detail="Could not validate credentials",
         )
     
-    user = user_crud.get(db, user_id=int(token_data.sub))
+    user_id = int(token_data.sub)
+    if user_principals.is_revoked(user_id, token_data.iat):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+    
+    # Repeated requests with the same token are served without a users query
+    user = user_principals.get_user(user_id, token_data.iat)
+    if user is not None:
+        return user
+    
+    user = user_crud.get(db, user_id=user_id)
     
     if not user:
         raise HTTPException(
@@ -54,6 +64,7 @@ def get_current_user(
             detail="User not found"
         )
     
+    user_principals.put_user(user, token_data.iat)
     return user
 
 def get_current_active_user(
@@ -66,6 +77,21 @@ def get_current_active_user(
         )
     return current_user
 
+def get_optional_stream_user(
+    db: Session = Depends(get_db),
+    bearer_token: Optional[str] = Depends(optional_oauth2_scheme),
+    access_token: Optional[str] = Query(None)
+) -> Optional[User]:
+    """
+    The active user of a streaming request, or None when it has no token. A
+    browser EventSource cannot send an Authorization header, so the token may
+    also come as ?access_token=.
+    """
+    token = bearer_token or access_token
+    if token is None:
+        return None
+    return get_current_active_user(get_user_from_token(db, token))
+
 def get_current_active_superuser(
     current_user: User = Depends(get_current_active_user),
 ) -> User:
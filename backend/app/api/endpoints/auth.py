@@ -8,21 +8,31 @@ from sqlalchemy.orm import Session
 
 from app import crud
 from app.api.deps import get_db
-from app.core.security import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.security import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES, PasswordHashPoolFull
 from app.schemas.user import Token, LoginRequest, User, UserCreate
 from app.crud import user as user_crud
 
 router = APIRouter()
 
+QUERY_BUDGET = 5
+
+async def _authenticate(db: Session, username: str, password: str):
+    try:
+        return await user_crud.authenticate(db, username=username, password=password)
+    except PasswordHashPoolFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many logins in progress, please try again",
+            headers={"Retry-After": "5"},
+        )
+
 @router.post("/login", response_model=Token)
-def login_access_token(
+async def login_access_token(
     db: Session = Depends(get_db), 
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """OAuth2 compatible token login, get an access token for future requests"""
-    user = user_crud.authenticate(
-        db, username=form_data.username, password=form_data.password
-    )
+    user = await _authenticate(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -43,14 +53,12 @@ def login_access_token(
     }
 
 @router.post("/login/json", response_model=Token)
-def login_json(
+async def login_json(
     login_data: LoginRequest,
     db: Session = Depends(get_db),
 ) -> Any:
     """JSON login endpoint, get an access token for future requests"""
-    user = user_crud.authenticate(
-        db, username=login_data.username, password=login_data.password
-    )
+    user = await _authenticate(db, login_data.username, login_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
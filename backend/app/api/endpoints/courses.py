@@ -13,6 +13,8 @@ from app.schemas.hole import HoleCreate, HoleResponse, HoleUpdate
 
 router = APIRouter()
 
+QUERY_BUDGET = 15
+
 @router.post("/", response_model=CourseResponse, status_code=status.HTTP_201_CREATED)
 def create_course(course: CourseCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     # First create the course
@@ -61,11 +63,13 @@ def update_course(course_id: int, course_update: CourseUpdate, db: Session = Dep
     
     # Handle holes if provided
     if course_update.holes is not None:
+        # The course's holes, loaded once rather than one query per hole
+        course_holes = {hole.id: hole for hole in db_course.holes}
         for hole_data in course_update.holes:
             if hole_data.id:
                 # Update existing hole
-                db_hole = db.query(Hole).filter(Hole.id == hole_data.id).first()
-                if db_hole and db_hole.course_id == course_id: # type: ignore
+                db_hole = course_holes.get(hole_data.id)
+                if db_hole:
                     db_hole.number = hole_data.number # type: ignore
                     db_hole.par = hole_data.par # type: ignore
                     db_hole.yards = hole_data.yards # type: ignore
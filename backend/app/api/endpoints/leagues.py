@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
+from sqlalchemy.orm import Session, contains_eager
 from sqlalchemy.sql import func
 from sqlalchemy.sql.expression import case
 from typing import List, Optional
@@ -20,11 +20,18 @@ from app.schemas.league import (
 from app.schemas.match import MatchResponse  # Import MatchResponse
 from app.schemas.week import WeekCreate, WeekResponse
 from app.api.deps import get_current_active_user
+from app.core import live
+from app.core.stats_cache import cache_league_response
 from app.models.user import User
+from app.crud import player_league_stats as player_league_stats_crud
+from app.crud import team_league_standings as team_league_standings_crud
+from app.crud import league_summary as league_summary_crud
 
 # Make sure prefix matches what frontend is requesting
 router = APIRouter()
 
+QUERY_BUDGET = 15
+
 @router.post("/", response_model=LeagueResponse, status_code=status.HTTP_201_CREATED)
 def create_league(league: LeagueCreate, db: Session = Depends(get_db)):
     # Create the league
@@ -190,11 +197,16 @@ def delete_week(league_id: int, week_id: int, db: Session = Depends(get_db)):
     
     # Now delete the week
     db.delete(week)
+    
+    # Scores from the deleted matches no longer count toward season stats
+    player_league_stats_crud.rebuild_league_player_stats(db, league_id)
+    team_league_standings_crud.rebuild_league_team_standings(db, league_id)
     db.commit()
     
     return {"message": "Week and associated matches deleted successfully"}
 
 @router.get("/{league_id}/leaderboard", response_model=List[dict])
+@cache_league_response
 def get_league_leaderboard(league_id: int, db: Session = Depends(get_db)):
     """
     Get leaderboard statistics for all teams in a league
@@ -206,99 +218,48 @@ def get_league_leaderboard(league_id: int, db: Session = Depends(get_db)):
     if not league:
         raise HTTPException(status_code=404, detail="League not found")
     
-    # Get all completed matches for this league
-    completed_matches = (db.query(Match)
-        .join(Week, Match.week_id == Week.id)
-        .filter(Week.league_id == league_id, Match.is_completed == True)
-        .all())
-    
-    # Initialize team stats dictionary
-    team_stats = {}
-    
-    # Get all teams in the league
-    for team in league.teams:
-        team_stats[team.id] = {
-            "id": team.id,
-            "name": team.name,
-            "matches_played": 0,
-            "points_won": 0,
-            "points_lost": 0,
-            "lowest_gross": None,
-            "lowest_net": None
-        }
-    
-    # Track lowest scores
-    lowest_gross_scores = {}
-    lowest_net_scores = {}
+    return team_league_standings_crud.get_league_leaderboard(db, league_id)
+
+@router.get("/{league_id}/live")
+def stream_league_standings(
+    league_id: int,
+    cursor: Optional[int] = Query(None),
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID"),
+    db: Session = Depends(get_db)
+):
+    """
+    Server-Sent Events stream of a league's standings: a "standings" event with
+    the leaderboard and top scores whenever a match completes or a completed
+    match's points change. A client resuming from an event id (cursor, or
+    EventSource's Last-Event-ID) gets the events it missed, or a "reset" event
+    when it should reload the leaderboard instead.
+    """
+    if not db.query(League.id).filter(League.id == league_id).first():
+        raise HTTPException(status_code=404, detail="League not found")
+    # Don't hold a pooled connection for the life of the stream
+    db.close()
+    return live.event_stream_response(live.league_channel(league_id), cursor if cursor is not None else last_event_id)
+
+@router.get("/{league_id}/summary", response_model=dict)
+@cache_league_response(daily=True)
+def get_league_summary(
+    league_id: int,
+    week_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Everything the printable weekly report needs in one response: league, weeks,
+    the selected (default: latest) and previous week's matches, makeup matches,
+    leaderboard, player stats, rankings, most improved and MVP lists.
+    """
+    season = league_summary_crud.load_season(db, league_id)
+    if season is None:
+        raise HTTPException(status_code=404, detail="League not found")
+    if week_id is not None and week_id not in season.weeks_by_id:
+        raise HTTPException(status_code=404, detail="Week not found")
     
-    # Calculate statistics for each team based on completed matches
-    for match in completed_matches:
-        if (match.home_team_id is not None and match.away_team_id is not None and 
-            match.home_team_points is not None and match.away_team_points is not None):
-            
-            # Update home team stats
-            if match.home_team_id in team_stats:
-                team_stats[match.home_team_id]["matches_played"] += 1
-                team_stats[match.home_team_id]["points_won"] += match.home_team_points
-                team_stats[match.home_team_id]["points_lost"] += match.away_team_points
-                
-                # Track home team's gross score if available
-                if match.home_team_gross_score is not None:
-                    if (match.home_team_id not in lowest_gross_scores or 
-                        match.home_team_gross_score < lowest_gross_scores[match.home_team_id]):
-                        lowest_gross_scores[match.home_team_id] = match.home_team_gross_score
-                        team_stats[match.home_team_id]["lowest_gross"] = match.home_team_gross_score
-                
-                # Track home team's net score if available
-                if match.home_team_net_score is not None:
-                    if (match.home_team_id not in lowest_net_scores or 
-                        match.home_team_net_score < lowest_net_scores[match.home_team_id]):
-                        lowest_net_scores[match.home_team_id] = match.home_team_net_score
-                        team_stats[match.home_team_id]["lowest_net"] = match.home_team_net_score
-            
-            # Update away team stats
-            if match.away_team_id in team_stats:
-                team_stats[match.away_team_id]["matches_played"] += 1
-                team_stats[match.away_team_id]["points_won"] += match.away_team_points
-                team_stats[match.away_team_id]["points_lost"] += match.home_team_points
-                
-                # Track away team's gross score if available
-                if match.away_team_gross_score is not None:
-                    if (match.away_team_id not in lowest_gross_scores or 
-                        match.away_team_gross_score < lowest_gross_scores[match.away_team_id]):
-                        lowest_gross_scores[match.away_team_id] = match.away_team_gross_score
-                        team_stats[match.away_team_id]["lowest_gross"] = match.away_team_gross_score
-                
-                # Track away team's net score if available
-                if match.away_team_net_score is not None:
-                    if (match.away_team_id not in lowest_net_scores or 
-                        match.away_team_net_score < lowest_net_scores[match.away_team_id]):
-                        lowest_net_scores[match.away_team_id] = match.away_team_net_score
-                        team_stats[match.away_team_id]["lowest_net"] = match.away_team_net_score
-    
-    # Calculate win percentage and convert to list
-    result = []
-    for team_id, stats in team_stats.items():
-        total_points = stats["points_won"] + stats["points_lost"]
-        win_percentage = 0
-        if total_points > 0:
-            win_percentage = (stats["points_won"] / total_points * 100)
-        
-        result.append({
-            "id": stats["id"],
-            "name": stats["name"],
-            "matches_played": stats["matches_played"],
-            "points_won": stats["points_won"],
-            "points_lost": stats["points_lost"],
-            "win_percentage": win_percentage,
-            "lowest_gross": stats["lowest_gross"],
-            "lowest_net": stats["lowest_net"]
-        })
-    
-    # Sort by win percentage (descending)
-    result.sort(key=lambda x: x["win_percentage"], reverse=True)
-    
-    return result
+    return league_summary_crud.build_league_summary(season, week_id)
 
 @router.get("/{league_id}/matches", response_model=List[MatchResponse])
 def get_league_matches(league_id: int, db: Session = Depends(get_db)):
@@ -357,25 +318,28 @@ def get_league_teams(league_id: int, db: Session = Depends(get_db)):
     # Get teams directly associated with the league
     teams = league.teams
     
+    # Get the players of every team who have participated in this league as NON-SUBSTITUTES,
+    # in one query. Players are found through match_player entries in league matches
+    team_players = {}
+    rows = db.query(MatchPlayer.team_id, Player).select_from(Player).join(
+        MatchPlayer, MatchPlayer.player_id == Player.id
+    ).join(
+        Match, MatchPlayer.match_id == Match.id
+    ).join(
+        Week, Match.week_id == Week.id
+    ).filter(
+        MatchPlayer.team_id.in_([team.id for team in teams]),
+        Week.league_id == league_id,
+        MatchPlayer.is_substitute == False  # Exclude substitute players
+    ).distinct().all()
+    for team_id, player in rows:
+        team_players.setdefault(team_id, []).append(player)
+    
     teams_data = []
     for team in teams:
-        # Get all players for this team who have participated in this league as NON-SUBSTITUTES
-        # Players are found through match_player entries in league matches
-        players_query = db.query(Player).join(
-            MatchPlayer, MatchPlayer.player_id == Player.id
-        ).join(
-            Match, MatchPlayer.match_id == Match.id
-        ).join(
-            Week, Match.week_id == Week.id
-        ).filter(
-            MatchPlayer.team_id == team.id,
-            Week.league_id == league_id,
-            MatchPlayer.is_substitute == False  # Exclude substitute players
-        ).distinct().all()
-        
         # Format player data
         players_data = []
-        for player in players_query:
+        for player in team_players.get(team.id, []):
             player_data = {
                 "id": player.id,
                 "first_name": player.first_name,
@@ -427,6 +391,11 @@ def get_league_player_detail(league_id: int, player_id: int, db: Session = Depen
         Team, MatchPlayer.team_id == Team.id
     ).join(
         Course, Match.course_id == Course.id
+    ).options(
+        # Fill entry.match.week, entry.match.course and entry.team from the joins above
+        contains_eager(MatchPlayer.match).contains_eager(Match.week),
+        contains_eager(MatchPlayer.match).contains_eager(Match.course),
+        contains_eager(MatchPlayer.team)
     ).filter(
         MatchPlayer.player_id == player_id,
         Week.league_id == league_id
@@ -435,6 +404,13 @@ def get_league_player_detail(league_id: int, player_id: int, db: Session = Depen
     if not match_entries:
         raise HTTPException(status_code=404, detail="Player has not played in this league")
     
+    # Opponent team names, with one query for all matches
+    opponent_team_ids = {
+        entry.match.away_team_id if entry.match.home_team_id == entry.team_id else entry.match.home_team_id
+        for entry in match_entries
+    }
+    opponent_team_names = dict(db.query(Team.id, Team.name).filter(Team.id.in_(opponent_team_ids)).all())
+    
     # Format match data
     matches_data = []
     total_points = 0.0
@@ -471,8 +447,7 @@ def get_league_player_detail(league_id: int, player_id: int, db: Session = Depen
             opponent_net = match.home_team_net_score
         
         # Get opponent team name
-        opponent_team = db.query(Team).filter(Team.id == opponent_team_id).first()
-        opponent_team_name = opponent_team.name if opponent_team else "Unknown Team"
+        opponent_team_name = opponent_team_names.get(opponent_team_id, "Unknown Team")
         
         match_data = {
             "match_id": match.id,
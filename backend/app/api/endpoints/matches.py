@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Header
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import secrets
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from collections import Counter
 from decimal import Decimal, ROUND_HALF_UP
 
 from app.db.base import get_db
 from app.models.user import User
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, get_optional_stream_user
 from app.models.match import Match, MatchAccessToken
 from app.models.week import Week
 from app.models.team import Team
@@ -17,16 +20,30 @@ from app.models.player import Player
 from app.models.hole import Hole
 from app.models.match_player import MatchPlayer
 from app.schemas.match import MatchCreate, MatchResponse, MatchUpdate
+from app.schemas.score import HoleScoreUpdate, HoleScoresUpdate, ScoreSyncRequest
 from app import schemas
+from app.crud import player_league_stats as player_league_stats_crud
+from app.crud import team_league_standings as team_league_standings_crud
+from app.crud import handicap as handicap_crud
+from app.crud import score as score_crud
+from app.crud import access_token as access_token_crud
+from app.core import live, stats_cache
+from app.core.query_budget import query_budget
+from app.core.token_cache import CachedAccessToken, access_tokens
+from app import scoring
+from app.core.settings import settings
 
 router = APIRouter()
 
+QUERY_BUDGET = 10
+
 def round_half_up(value: float, decimals: int = 0) -> float:
     """Round a value with .5 always rounding up"""
     multiplier = 10 ** decimals
     return float(Decimal(str(value * multiplier)).quantize(Decimal('1'), rounding=ROUND_HALF_UP)) / multiplier
 
 @router.post("/", response_model=MatchResponse, status_code=status.HTTP_201_CREATED)
+@query_budget(20)
 def create_match(match: MatchCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     # Verify week exists
     week = db.query(Week).filter(Week.id == match.week_id).first()
@@ -113,12 +130,20 @@ def get_matches_by_week(week_id: int, db: Session = Depends(get_db), current_use
     # Get all matches for this week with team and course info
     matches = db.query(Match).filter(Match.week_id == week_id).all()
     
+    # Teams and courses of all the matches, one query each
+    team_ids = {match.home_team_id for match in matches} | {match.away_team_id for match in matches}
+    teams = {team.id: team for team in db.query(Team).filter(Team.id.in_(team_ids)).all()}
+    courses = {
+        course.id: course
+        for course in db.query(Course).filter(Course.id.in_({match.course_id for match in matches})).all()
+    }
+    
     # Convert to response model with detailed info
     match_responses = []
     for match in matches:
-        home_team = db.query(Team).filter(Team.id == match.home_team_id).first()
-        away_team = db.query(Team).filter(Team.id == match.away_team_id).first()
-        course = db.query(Course).filter(Course.id == match.course_id).first()
+        home_team = teams.get(match.home_team_id)
+        away_team = teams.get(match.away_team_id)
+        course = courses.get(match.course_id)
         
         match_responses.append({
             "id": match.id,
@@ -164,28 +189,57 @@ def get_match(match_id: int, db: Session = Depends(get_db), current_user: User =
     
     return response
 
+def _standings_state(match: Match):
+    """The parts of a match the league standings are built from"""
+    return (match.is_completed, match.home_team_points, match.away_team_points)
+
+def _queue_standings_if_changed(db: Session, match: Match, previous_state, league_id: Optional[int]):
+    """Publish the league's standings on commit when the match completed or its team points moved"""
+    state = _standings_state(match)
+    # Standings only count completed matches
+    if league_id is not None and state != previous_state and (state[0] or previous_state[0]):
+        team_league_standings_crud.queue_standings_update(db, league_id)
+
 @router.put("/{match_id}", response_model=MatchResponse)
 def update_match(match_id: int, match: MatchUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     db_match = db.query(Match).filter(Match.id == match_id).first()
     if not db_match:
         raise HTTPException(status_code=404, detail="Match not found")
     
+    # Teams the match may be moving away from still need their standings refreshed
+    previous_team_ids = [db_match.home_team_id, db_match.away_team_id]
+    previous_standings = _standings_state(db_match)
+    
     # Update fields
     for key, value in match.dict(exclude_unset=True).items():
         setattr(db_match, key, value)
     
+    team_league_standings_crud.refresh_for_match(db, db_match, previous_team_ids)
+    _queue_standings_if_changed(
+        db, db_match, previous_standings, player_league_stats_crud.get_league_id_for_match(db, db_match)
+    )
     db.commit()
     db.refresh(db_match)
     return db_match
 
 @router.delete("/{match_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(25)
 def delete_match(match_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     db_match = db.query(Match).filter(Match.id == match_id).first()
     if not db_match:
         raise HTTPException(status_code=404, detail="Match not found")
     
+    # Remember whose season stats this match contributed to
+    league_id = player_league_stats_crud.get_league_id_for_match(db, db_match)
+    player_ids = [mp.player_id for mp in db_match.match_players]
+    team_ids = [db_match.home_team_id, db_match.away_team_id]
+    
     db.delete(db_match)
+    if league_id is not None:
+        player_league_stats_crud.refresh_player_league_stats(db, league_id, player_ids)
+        team_league_standings_crud.refresh_team_league_standings(db, league_id, team_ids)
     db.commit()
+    access_tokens.invalidate_match(match_id)
     return None
 
 @router.get("/{match_id}/scores")
@@ -230,7 +284,37 @@ def get_match_scores(match_id: int, db: Session = Depends(get_db), current_user:
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/{match_id}/live")
+def stream_match_scores(
+    match_id: int,
+    cursor: Optional[int] = Query(None),
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID"),
+    token: Optional[str] = Query(None),
+    db: Session = Depends(get_db), current_user: Optional[User] = Depends(get_optional_stream_user)
+):
+    """
+    Server-Sent Events stream of a match's scoring: a "scores" event with the
+    changed holes and the current totals after every committed save. A client
+    resuming from an event id (cursor, or EventSource's Last-Event-ID) gets
+    the events it missed first.
+    
+    EventSource cannot send headers, so the stream also accepts the user's
+    token as ?access_token=, or a team's match access token as ?token=.
+    """
+    if current_user is None:
+        if token is None:
+            raise HTTPException(
+                status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"}
+            )
+        _get_valid_access_token(db, match_id, token)
+    if not db.query(Match.id).filter(Match.id == match_id).first():
+        raise HTTPException(status_code=404, detail="Match not found")
+    # Don't hold a pooled connection for the life of the stream
+    db.close()
+    return live.event_stream_response(live.match_channel(match_id), cursor if cursor is not None else last_event_id)
+
 @router.post("/{match_id}/scores")
+@query_budget(50)
 def save_match_scores(match_id: int, data: dict, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     """Save or update scores for a match with proper player tracking and statistics"""
     try:
@@ -239,29 +323,27 @@ def save_match_scores(match_id: int, data: dict, db: Session = Depends(get_db),
         if not match:
             raise HTTPException(status_code=404, detail="Match not found")
         
-        # Remove existing scores for this match if any
-        db.query(PlayerScore).filter(PlayerScore.match_id == match_id).delete()
+        previous_standings = _standings_state(match)
+        was_completed = match.is_completed
         
-        # Track unique players who are submitting scores
-        all_players = set()
+        # Load the match's players once; summaries and substitutes are matched against them
+        match_players = {
+            (mp.player_id, mp.team_id): mp
+            for mp in db.query(MatchPlayer).filter(MatchPlayer.match_id == match_id).all()
+        }
+        # Gross scores before this save, to find whose handicap may move
+        previous_gross = {mp.player_id: mp.gross_score for mp in match_players.values()}
         
-        # Add new scores
+        # Collect the posted scorecard
+        strokes = {}
         for score_data in data.get("scores", []):
             player_id = score_data.get("player_id")
             if not player_id:
                 continue
-                
-            # Track this player
-            all_players.add(player_id)
-            
-            # Add the score
-            new_score = PlayerScore(
-                match_id=match_id,
-                player_id=player_id,
-                hole_id=score_data["hole_id"],
-                strokes=score_data["strokes"]
-            )
-            db.add(new_score)
+            strokes[(player_id, score_data["hole_id"])] = score_data["strokes"]
+        
+        # Write only the holes that were added, changed or removed
+        score_changes = score_crud.sync_match_scores(db, match_id, strokes)
         
         # Update player summary data if provided
         if "player_summaries" in data:
@@ -272,13 +354,7 @@ def save_match_scores(match_id: int, data: dict, db: Session = Depends(get_db),
                 if not player_id or not team_id:
                     continue
                 
-                # Find the match_player record
-                match_player = db.query(MatchPlayer).filter(
-                    MatchPlayer.match_id == match_id,
-                    MatchPlayer.player_id == player_id,
-                    MatchPlayer.team_id == team_id
-                ).first()
-                
+                match_player = match_players.get((player_id, team_id))
                 if match_player:
                     # Update with player statistics
                     match_player.handicap = player_summary.get("handicap")
@@ -302,6 +378,7 @@ def save_match_scores(match_id: int, data: dict, db: Session = Depends(get_db),
                         is_active=True
                     )
                     db.add(new_match_player)
+                    match_players[(player_id, team_id)] = new_match_player
         
         # Process substitutes if provided (legacy support)
         if "substitute_players" in data:
@@ -315,15 +392,9 @@ def save_match_scores(match_id: int, data: dict, db: Session = Depends(get_db),
                 # Determine team_id from team_type
                 team_id = match.home_team_id if team_type == "home" else match.away_team_id
                 
-                # Find or create match_player record
-                match_player = db.query(MatchPlayer).filter(
-                    MatchPlayer.match_id == match_id,
-                    MatchPlayer.player_id == player_id,
-                    MatchPlayer.team_id == team_id
-                ).first()
-                
+                match_player = match_players.get((player_id, team_id))
                 if match_player:
-                    setattr(match_player, "is_substitute", True)
+                    match_player.is_substitute = True
                 else:
                     new_match_player = MatchPlayer(
                         match_id=match_id,
@@ -333,6 +404,7 @@ def save_match_scores(match_id: int, data: dict, db: Session = Depends(get_db),
                         is_active=True
                     )
                     db.add(new_match_player)
+                    match_players[(player_id, team_id)] = new_match_player
         
         # Update match completion status and team scores if provided
         if "is_completed" in data:
@@ -352,14 +424,381 @@ def save_match_scores(match_id: int, data: dict, db: Session = Depends(get_db),
         if "away_team_points" in data:
             match.away_team_points = data["away_team_points"]
         
+        # With hole scores posted, pops, net, points and team totals are derived
+        # here rather than trusted from the client's summaries
+        if strokes:
+            scoring.apply_match_scoring(db, match, strokes)
+        
+        # Keep the season rollups in step with the new scores
+        player_league_stats_crud.refresh_for_match(db, match)
+        team_league_standings_crud.refresh_for_match(db, match)
+        
+        # Handicaps only count completed matches: completing (or reopening) the
+        # match moves every player's window, otherwise only a completed match's
+        # changed gross scores do
+        if match.is_completed != was_completed:
+            rescored_players = {mp.player_id for mp in match_players.values()}
+        elif match.is_completed:
+            rescored_players = {
+                mp.player_id for mp in match_players.values()
+                if mp.gross_score != previous_gross.get(mp.player_id)
+            }
+        else:
+            rescored_players = set()
+        league_id = player_league_stats_crud.get_league_id_for_match(db, match)
+        if settings.HANDICAP_AUTO_UPDATE and rescored_players and league_id is not None:
+            handicap_crud.update_player_handicaps(db, league_id, rescored_players)
+        
+        # The bulk score statements bypass the stats cache's flush listener
+        if score_changes:
+            stats_cache.mark_league_changed(db, league_id)
+        
+        _queue_live_update(db, match_id, score_changes, match, list(match_players.values()))
+        _queue_standings_if_changed(db, match, previous_standings, league_id)
         db.commit()
         return {"message": "Scores saved successfully"}
         
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         print(f"Error saving scores for match {match_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error saving scores: {str(e)}")
 
+def _queue_live_update(
+    db: Session,
+    match_id: int,
+    cells: Dict[Tuple[int, int], Optional[int]],
+    match: Optional[Match] = None,
+    match_players: List[MatchPlayer] = ()
+):
+    """
+    Send the changed holes (strokes None for a cleared hole) to the match's
+    live stream once the save commits, with the match's current results when
+    the scored match and its players are given
+    """
+    update = {
+        "match_id": match_id,
+        "scores": [
+            {"player_id": player_id, "hole_id": hole_id, "strokes": strokes}
+            for (player_id, hole_id), strokes in sorted(cells.items())
+        ],
+    }
+    if match is not None:
+        update["is_completed"] = match.is_completed
+        update["players"] = [
+            {
+                "player_id": mp.player_id,
+                "team_id": mp.team_id,
+                "pops": mp.pops,
+                "gross_score": mp.gross_score,
+                "net_score": mp.net_score,
+                "points": mp.points,
+            }
+            for mp in match_players if mp.is_active
+        ]
+        for team in ("home", "away"):
+            update[f"{team}_team"] = {
+                "team_id": getattr(match, f"{team}_team_id"),
+                "gross_score": getattr(match, f"{team}_team_gross_score"),
+                "net_score": getattr(match, f"{team}_team_net_score"),
+                "points": getattr(match, f"{team}_team_points"),
+            }
+    live.publish_on_commit(db, live.match_channel(match_id), "scores", update)
+
+def _get_valid_access_token(db: Session, match_id: int, token: str) -> CachedAccessToken:
+    """The match's access token, or a 403 if it is unknown or expired"""
+    token_record = access_token_crud.get_access_token(db, token)
+    
+    if not token_record or token_record.match_id != match_id:
+        raise HTTPException(status_code=403, detail="Invalid access token")
+    if token_record.is_expired():
+        raise HTTPException(status_code=403, detail="Access token has expired")
+    return token_record
+
+def _write_score_cells(
+    db: Session,
+    match: Match,
+    match_players: List[MatchPlayer],
+    holes,
+    existing: Dict[Tuple[int, int], Tuple[int, int]],
+    cells: Dict[Tuple[int, int], Optional[int]],
+    recorded: Optional[Dict[Tuple[int, int], datetime]] = None
+) -> Dict[str, Any]:
+    """
+    Apply {(player_id, hole_id): strokes} cells (None clears a hole) to the
+    match's stored scores (existing, from score_crud.get_match_scores), writing
+    only real changes, then rescore the match from the resulting card and queue
+    its rollup, cache and live updates, without committing. Only the MatchPlayer
+    rows whose results moved are written. recorded optionally gives the time
+    each cell was entered. Returns the scoring results.
+    """
+    strokes = {key: value for key, (_, value) in existing.items()}
+    changed, removed = {}, {}
+    for key, value in cells.items():
+        if value is None:
+            if key in existing:
+                removed[key] = existing[key][0]
+                del strokes[key]
+        elif strokes.get(key) != value:
+            changed[key] = value
+            strokes[key] = value
+    score_crud.upsert_scores(db, match.id, changed, recorded)
+    score_crud.delete_scores(db, removed.values())
+    
+    previous = {mp.player_id: (mp.pops, mp.gross_score, mp.net_score, mp.points) for mp in match_players}
+    previous_standings = _standings_state(match)
+    results = scoring.apply_match_scoring(db, match, strokes, match_players=match_players, holes=holes)
+    
+    if changed or removed:
+        league_id = player_league_stats_crud.get_league_id_for_match(db, match)
+        if league_id is not None:
+            # Only players whose results moved need their rollups refreshed;
+            # standings only count completed matches
+            moved = {
+                mp.player_id for mp in match_players
+                if (mp.pops, mp.gross_score, mp.net_score, mp.points) != previous[mp.player_id]
+            }
+            player_league_stats_crud.refresh_player_league_stats(db, league_id, moved)
+            if match.is_completed:
+                team_league_standings_crud.refresh_for_match(db, match)
+                # Handicaps only count completed matches, never a round in progress
+                rescored_players = {
+                    mp.player_id for mp in match_players if mp.gross_score != previous[mp.player_id][1]
+                }
+                if settings.HANDICAP_AUTO_UPDATE and rescored_players:
+                    handicap_crud.update_player_handicaps(db, league_id, rescored_players)
+        # The bulk score statements bypass the stats cache's flush listener
+        stats_cache.mark_league_changed(db, league_id)
+        _queue_live_update(db, match.id, {**changed, **dict.fromkeys(removed)}, match, match_players)
+        _queue_standings_if_changed(db, match, previous_standings, league_id)
+    return results
+
+def _save_hole_scores(
+    db: Session, match_id: int, cells: Dict[Tuple[int, int], Optional[int]], token: Optional[str]
+) -> Tuple[Match, List[MatchPlayer], Dict[str, Any]]:
+    """
+    Validate and write a few {(player_id, hole_id): strokes} cells of a match
+    (see _write_score_cells) and commit. With a team access token, only that
+    team's players may be scored.
+    Returns (match, active match players, scoring results).
+    """
+    # Both teams score the same match at once, and the match is rescored from
+    # the whole card, so lock the match before reading its stored scores
+    match = db.query(Match).filter(Match.id == match_id).with_for_update().first()
+    if not match:
+        raise HTTPException(status_code=404, detail="Match not found")
+    team_id = _get_valid_access_token(db, match_id, token).team_id if token is not None else None
+    
+    match_players = db.query(MatchPlayer).filter(
+        MatchPlayer.match_id == match_id,
+        MatchPlayer.is_active == True
+    ).order_by(MatchPlayer.id).all()
+    holes = scoring.load_match_holes(db, match)
+    teams_by_player = {mp.player_id: mp.team_id for mp in match_players}
+    hole_ids = {hole_id for hole_id, _ in holes}
+    for player_id, hole_id in cells:
+        if player_id not in teams_by_player:
+            raise HTTPException(status_code=404, detail=f"Player {player_id} is not playing in this match")
+        if team_id is not None and teams_by_player[player_id] != team_id:
+            raise HTTPException(status_code=403, detail="Access token does not cover this player")
+        if hole_id not in hole_ids:
+            raise HTTPException(status_code=404, detail=f"Hole {hole_id} is not on this match's course")
+    
+    results = _write_score_cells(db, match, match_players, holes, score_crud.get_match_scores(db, match_id), cells)
+    
+    db.commit()
+    return match, match_players, results
+
+def _running_totals(match: Match, match_players: List[MatchPlayer], results: Dict[str, Any], player_ids: List[int]) -> Dict[str, Any]:
+    """Running totals for the given players and their teams from a scored match"""
+    teams = {match.home_team_id: "home", match.away_team_id: "away"}
+    team_of = {mp.player_id: mp.team_id for mp in match_players}
+    players = []
+    for player_id in sorted(set(player_ids)):
+        player = results["players"][player_id]
+        players.append({
+            "player_id": player_id,
+            "team_id": team_of[player_id],
+            "holes_played": sum(net is not None for net in player["net_by_hole"]),
+            "pops": scoring.round_strokes(player["pops"]),
+            "gross_score": player["gross_score"],
+            "net_score": scoring.round_strokes(player["net_score"]),
+            "points": player["points"],
+        })
+    team_totals = []
+    for team_id in sorted({team_of[player_id] for player_id in player_ids}):
+        team = results[f"{teams[team_id]}_team"]
+        team_totals.append({
+            "team_id": team_id,
+            "gross_score": team["gross_score"],
+            "net_score": scoring.round_strokes(team["net_score"]),
+            "points": team["points"],
+        })
+    return {"match_id": match.id, "players": players, "teams": team_totals}
+
+@router.patch("/{match_id}/holes/{hole_id}/players/{player_id}")
+@query_budget(50)
+def update_hole_score(
+    match_id: int,
+    hole_id: int,
+    player_id: int,
+    data: HoleScoreUpdate,
+    token: Optional[str] = Query(None),
+    db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)
+):
+    """Save one player's score on one hole and return their running totals and their team's"""
+    try:
+        match, match_players, results = _save_hole_scores(db, match_id, {(player_id, hole_id): data.strokes}, token)
+        totals = _running_totals(match, match_players, results, [player_id])
+        return {"match_id": match_id, "player": totals["players"][0], "team": totals["teams"][0]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        print(f"Error saving hole score for match {match_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error saving score: {str(e)}")
+
+@router.patch("/{match_id}/scores")
+@query_budget(50)
+def update_hole_scores(
+    match_id: int,
+    data: HoleScoresUpdate,
+    token: Optional[str] = Query(None),
+    db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)
+):
+    """Save a few hole scores at once and return the running totals of the players and teams involved"""
+    try:
+        cells = {(cell.player_id, cell.hole_id): cell.strokes for cell in data.scores}
+        match, match_players, results = _save_hole_scores(db, match_id, cells, token)
+        return _running_totals(match, match_players, results, [player_id for player_id, _ in cells])
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        print(f"Error saving hole scores for match {match_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error saving scores: {str(e)}")
+
+def _as_utc(timestamp: datetime) -> datetime:
+    """Naive UTC, as date_recorded is stored"""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+@router.post("/sync")
+@query_budget(100)
+def sync_scores(data: ScoreSyncRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+    """
+    Apply a batch of hole scores entered offline, possibly across several
+    matches, in one transaction. Each operation is answered with its status:
+    - "applied": written (or already the stored value)
+    - "superseded": a later operation of the batch for the same hole won
+    - "stale": the hole was changed more recently than the operation's client_timestamp
+    - "rejected": the match, player or hole does not exist or does not belong together
+    - "duplicate": the idempotency key was seen before; original_status is its outcome
+    """
+    try:
+        operations = data.operations
+        known = score_crud.get_sync_statuses(db, [op.idempotency_key for op in operations])
+        fresh = {}
+        for op in operations:
+            if op.idempotency_key not in known:
+                fresh.setdefault(op.idempotency_key, op)
+        
+        # Everything the batch touches, loaded once per kind
+        match_ids = {op.match_id for op in fresh.values()}
+        matches = {match.id: match for match in db.query(Match).filter(Match.id.in_(match_ids)).all()} if match_ids else {}
+        match_players: Dict[int, List[MatchPlayer]] = {match_id: [] for match_id in matches}
+        holes: Dict[int, list] = {match.course_id: [] for match in matches.values()}
+        if matches:
+            for mp in db.query(MatchPlayer).filter(
+                MatchPlayer.match_id.in_(matches.keys()),
+                MatchPlayer.is_active == True
+            ).order_by(MatchPlayer.id).all():
+                match_players[mp.match_id].append(mp)
+            for course_id, hole_id, handicap in db.query(Hole.course_id, Hole.id, Hole.handicap).filter(
+                Hole.course_id.in_(holes.keys())
+            ).order_by(Hole.number, Hole.id).all():
+                holes[course_id].append((hole_id, handicap))
+        
+        statuses: Dict[str, str] = {}
+        latest = {}
+        for key, op in fresh.items():
+            match = matches.get(op.match_id)
+            if (
+                match is None
+                or op.player_id not in {mp.player_id for mp in match_players[op.match_id]}
+                or op.hole_id not in {hole_id for hole_id, _ in holes[match.course_id]}
+            ):
+                statuses[key] = "rejected"
+                continue
+            # Last writer wins per hole; the later operation of the batch breaks ties
+            cell = (op.match_id, op.player_id, op.hole_id)
+            winner = latest.get(cell)
+            if winner is not None:
+                if _as_utc(op.client_timestamp) < _as_utc(winner.client_timestamp):
+                    statuses[key] = "superseded"
+                    continue
+                statuses[winner.idempotency_key] = "superseded"
+            latest[cell] = op
+        
+        # Winners older than the stored value (or the time the hole was cleared) are stale
+        applied_matches = {match_id for match_id, _, _ in latest}
+        existing = score_crud.lock_scores(db, applied_matches) if applied_matches else {}
+        cleared = score_crud.get_sync_clear_times(db, applied_matches) if applied_matches else {}
+        cells: Dict[int, Dict[Tuple[int, int], Optional[int]]] = {}
+        recorded: Dict[int, Dict[Tuple[int, int], datetime]] = {}
+        for (match_id, player_id, hole_id), op in latest.items():
+            stored = existing.get(match_id, {}).get((player_id, hole_id))
+            changed_at = stored[2] if stored is not None else cleared.get((match_id, player_id, hole_id))
+            timestamp = _as_utc(op.client_timestamp)
+            if changed_at is not None and changed_at > timestamp:
+                statuses[op.idempotency_key] = "stale"
+                continue
+            statuses[op.idempotency_key] = "applied"
+            cells.setdefault(match_id, {})[(player_id, hole_id)] = op.strokes
+            recorded.setdefault(match_id, {})[(player_id, hole_id)] = timestamp
+        
+        for match_id, match_cells in sorted(cells.items()):
+            match = matches[match_id]
+            stored = {key: (score_id, strokes) for key, (score_id, strokes, _) in existing.get(match_id, {}).items()}
+            _write_score_cells(
+                db, match, match_players[match_id], holes[match.course_id], stored, match_cells, recorded[match_id]
+            )
+        
+        score_crud.record_sync_operations(db, [
+            {
+                "idempotency_key": key, "match_id": op.match_id, "player_id": op.player_id, "hole_id": op.hole_id,
+                "strokes": op.strokes, "client_timestamp": _as_utc(op.client_timestamp), "status": statuses[key]
+            }
+            # Rejected operations may name a match that does not exist
+            for key, op in fresh.items() if statuses[key] != "rejected"
+        ])
+        db.commit()
+    except HTTPException:
+        raise
+    except IntegrityError:
+        # Another request recorded one of these keys first
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Operations in this batch are already being synced; retry")
+    except Exception as e:
+        db.rollback()
+        print(f"Error syncing scores: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error syncing scores: {str(e)}")
+    
+    results = []
+    seen = set()
+    for op in operations:
+        key = op.idempotency_key
+        result = {"idempotency_key": key, "match_id": op.match_id, "player_id": op.player_id, "hole_id": op.hole_id}
+        if key in known or key in seen:
+            result.update(status="duplicate", original_status=known[key] if key in known else statuses[key])
+        else:
+            result["status"] = statuses[key]
+        seen.add(key)
+        results.append(result)
+    return {"results": results, "counts": dict(Counter(result["status"] for result in results))}
+
 @router.get("/{match_id}/players")
 def get_match_players(match_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     """Get all players for a specific match from the match_players table"""
@@ -402,6 +841,7 @@ def get_match_players(match_id: int, db: Session = Depends(get_db), current_user
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/{match_id}/players/substitute")
+@query_budget(25)
 def substitute_match_player(
     match_id: int, 
     data: dict, 
@@ -473,6 +913,8 @@ def substitute_match_player(
             )
             db.add(new_substitute)
         
+        player_league_stats_crud.refresh_for_match(db, match)
+        
         db.commit()
         return {"message": "Substitution recorded successfully"}
         
@@ -496,6 +938,11 @@ def generate_match_access_tokens(
         # Delete any existing tokens for this match
         db.query(MatchAccessToken).filter(MatchAccessToken.match_id == match_id).delete()
         
+        # Both teams' names in one query
+        team_names = dict(db.query(Team.id, Team.name).filter(
+            Team.id.in_([match.home_team_id, match.away_team_id])
+        ).all())
+        
         # Generate tokens for both teams
         tokens = []
         for team_id in [match.home_team_id, match.away_team_id]:
@@ -512,25 +959,22 @@ def generate_match_access_tokens(
             # Create datetime at midnight on match date and add 14 days
             expires_at = datetime.now() + timedelta(days=14)
             
-            # Create token record
-            token_record = MatchAccessToken(
-                match_id=match_id,
-                team_id=team_id,
-                token=token,
-                expires_at=expires_at
-            )
-            db.add(token_record)
-            
             # Add to response
-            team = db.query(Team).filter(Team.id == team_id).first()
             tokens.append({
                 "team_id": team_id,
-                "team_name": team.name if team else None,
+                "team_name": team_names.get(team_id),
                 "token": token,
                 "expires_at": expires_at
             })
         
+        # Both token records in one executemany INSERT
+        db.execute(insert(MatchAccessToken), [
+            {"match_id": match_id, "team_id": token["team_id"], "token": token["token"], "expires_at": token["expires_at"]}
+            for token in tokens
+        ])
         db.commit()
+        # The replaced tokens stop working here at once
+        access_tokens.invalidate_match(match_id)
         return tokens
         
     except Exception as e:
@@ -549,8 +993,10 @@ def get_match_access_tokens(
         if not match:
             raise HTTPException(status_code=404, detail="Match not found")
         
-        # Get existing tokens
-        token_records = db.query(MatchAccessToken).filter(
+        # Get existing tokens with their team names
+        token_records = db.query(MatchAccessToken, Team.name).outerjoin(
+            Team, Team.id == MatchAccessToken.team_id
+        ).filter(
             MatchAccessToken.match_id == match_id
         ).all()
         
@@ -559,11 +1005,10 @@ def get_match_access_tokens(
         
         # Format response
         tokens = []
-        for token_record in token_records:
-            team = db.query(Team).filter(Team.id == token_record.team_id).first()
+        for token_record, team_name in token_records:
             tokens.append({
                 "team_id": token_record.team_id,
-                "team_name": team.name if team else None,
+                "team_name": team_name,
                 "token": token_record.token,
                 "expires_at": token_record.expires_at
             })
@@ -579,26 +1024,21 @@ def get_match_access_tokens(
 def validate_access_token(token: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     """Validate a team access token and return match and team info"""
     try:
-        # Find the token
-        token_record = db.query(MatchAccessToken).filter(MatchAccessToken.token == token).first()
+        # Find the token, with its match and team details
+        token_record = access_token_crud.get_access_token(db, token)
         
         if not token_record:
             raise HTTPException(status_code=404, detail="Invalid access token")
         
         # Check if token is expired
-        expires_at = token_record.expires_at
-        if expires_at is not None and datetime.now() > expires_at.replace(tzinfo=None):
+        if token_record.is_expired():
             raise HTTPException(status_code=403, detail="Access token has expired")
         
-        # Get match and team details
-        match = db.query(Match).filter(Match.id == token_record.match_id).first()
-        team = db.query(Team).filter(Team.id == token_record.team_id).first()
-        
         return {
-            "match_id": match.id if match else None,
-            "match_date": match.match_date if match else None,
-            "team_id": team.id if team else None,
-            "team_name": team.name if team else None
+            "match_id": token_record.match_id,
+            "match_date": token_record.match_date,
+            "team_id": token_record.team_id,
+            "team_name": token_record.team_name
         }
         
     except HTTPException:
@@ -615,60 +1055,40 @@ def save_team_scores(
 ):
     """Save scores for a specific team using their access token"""
     try:
-        # Validate token
-        token_record = db.query(MatchAccessToken).filter(
-            MatchAccessToken.match_id == match_id,
-            MatchAccessToken.token == token
-        ).first()
-        
-        if not token_record:
-            raise HTTPException(status_code=403, detail="Invalid access token")
-        expires_at = token_record.expires_at
-        if expires_at is not None and expires_at.replace(tzinfo=None) < datetime.now():
-            raise HTTPException(status_code=403, detail="Access token has expired")
-        
         # Only allow updates for the team that owns this token
-        team_id = token_record.team_id
+        team_id = _get_valid_access_token(db, match_id, token).team_id
         
-        # Process scores for only this team's players
-        scores_to_update = []
-        for score_data in data.get("scores", []):
-            player_id = score_data.get("player_id")
-            
-            # Verify this player belongs to the correct team
-            player = db.query(MatchPlayer).filter(
-                MatchPlayer.match_id == match_id,
-                MatchPlayer.player_id == player_id,
-                MatchPlayer.team_id == team_id
-            ).first()
-            
-            if not player:
-                continue  # Skip players that don't belong to this team
-            
-            # Add score for update
-            scores_to_update.append({
-                "match_id": match_id,
-                "player_id": player_id,
-                "hole_id": score_data["hole_id"],
-                "strokes": score_data["strokes"]
-            })
-        
-        # Remove existing scores for these players
-        for score in scores_to_update:
-            db.query(PlayerScore).filter(
-                PlayerScore.match_id == match_id,
-                PlayerScore.player_id == score["player_id"],
-                PlayerScore.hole_id == score["hole_id"]
-            ).delete()
+        # Process scores for only this team's players, checking the roster with one query
+        posted = [score_data for score_data in data.get("scores", []) if score_data.get("player_id")]
+        roster = set()
+        if posted:
+            roster = {
+                player_id for (player_id,) in db.query(MatchPlayer.player_id).filter(
+                    MatchPlayer.match_id == match_id,
+                    MatchPlayer.team_id == team_id,
+                    MatchPlayer.player_id.in_({score_data["player_id"] for score_data in posted})
+                ).all()
+            }
+        strokes = {
+            (score_data["player_id"], score_data["hole_id"]): score_data["strokes"]
+            for score_data in posted
+            if score_data["player_id"] in roster  # Skip players that don't belong to this team
+        }
         
-        # Add new scores
-        for score in scores_to_update:
-            new_score = PlayerScore(**score)
-            db.add(new_score)
+        # One upsert touching only this team's rows, so the other team's
+        # submission for the same match never overwrites or blocks on them
+        if strokes:
+            score_crud.upsert_scores(db, match_id, strokes)
+            league_id = db.query(Week.league_id).join(Match, Match.week_id == Week.id).filter(Match.id == match_id).scalar()
+            stats_cache.mark_league_changed(db, league_id)
+            # Team submissions do not rescore the match, so only the holes are sent
+            _queue_live_update(db, match_id, strokes)
         
         db.commit()
         return {"message": "Team scores saved successfully"}
         
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
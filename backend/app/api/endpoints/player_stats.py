@@ -11,11 +11,17 @@ from app.models.league import League
 from app.models.team import Team
 from app.models.week import Week
 from app.models.course import Course
+from app.models.player_league_stats import PlayerLeagueStats
 from app.models.user import User
 from app.api.deps import get_current_active_user
+from app.core.stats_cache import cache_league_response
+from app import analytics
+from app.crud import player_league_stats as player_league_stats_crud
 
 router = APIRouter()
 
+QUERY_BUDGET = 10
+
 @router.get("/top-gross-scores", response_model=List[Dict[str, Any]])
 def get_top_gross_scores(
     limit: int = 10,
@@ -207,6 +213,7 @@ def get_player_average(
     }
 
 @router.get("/league/{league_id}/player-stats", response_model=List[Dict[str, Any]])
+@cache_league_response
 def get_league_player_stats(
     league_id: int, 
     min_rounds: int = 1,
@@ -222,62 +229,29 @@ def get_league_player_stats(
     if not league:
         raise HTTPException(status_code=404, detail="League not found")
     
-    # Get all player scores for this league with player info
-    # Query raw data for each player across all teams
+    # Read the per-player season rollup (one row per player, across all teams)
     stats_query = db.query(
-        MatchPlayer.player_id,
+        PlayerLeagueStats,
         Player.first_name,
-        Player.last_name,
-        func.count(MatchPlayer.id).label("rounds_played"),
-        func.avg(MatchPlayer.gross_score).label("avg_gross"),
-        func.avg(MatchPlayer.net_score).label("avg_net"),
-        func.min(MatchPlayer.gross_score).label("lowest_gross"),
-        func.min(MatchPlayer.net_score).label("lowest_net")
-    ).join(
-        Player, MatchPlayer.player_id == Player.id
-    ).join(
-        Match, MatchPlayer.match_id == Match.id
+        Player.last_name
     ).join(
-        Week, Match.week_id == Week.id
+        Player, PlayerLeagueStats.player_id == Player.id
     ).filter(
-        Week.league_id == league_id,
-        MatchPlayer.gross_score.isnot(None)
-    ).group_by(
-        MatchPlayer.player_id,
-        Player.first_name,
-        Player.last_name
-    ).having(
-        func.count(MatchPlayer.id) >= min_rounds
-    ).order_by(
-        func.avg(MatchPlayer.gross_score)
+        PlayerLeagueStats.league_id == league_id,
+        PlayerLeagueStats.rounds_played > 0,
+        PlayerLeagueStats.rounds_played >= min_rounds
     ).all()
     
-    # Now get the most recent team for each player
-    player_teams = {}
+    # Order by average gross score
+    stats_query.sort(key=lambda row: row.PlayerLeagueStats.avg_gross)
     
-    for player_id in [stat.player_id for stat in stats_query]:
-        most_recent_team = db.query(
-            Team.name.label("team_name")
-        ).join(
-            MatchPlayer, MatchPlayer.team_id == Team.id
-        ).join(
-            Match, MatchPlayer.match_id == Match.id
-        ).join(
-            Week, Match.week_id == Week.id
-        ).filter(
-            MatchPlayer.player_id == player_id,
-            Week.league_id == league_id
-        ).order_by(
-            Match.match_date.desc()
-        ).first()
-        
-        if most_recent_team:
-            player_teams[player_id] = most_recent_team.team_name
-        else:
-            player_teams[player_id] = "Unknown Team"
+    # Most recent team for every listed player, resolved in one query
+    player_teams = player_league_stats_crud.get_latest_team_names(
+        db, league_id, [row.PlayerLeagueStats.player_id for row in stats_query]
+    )
     
     results = []
-    for stat in stats_query:
+    for stat, first_name, last_name in stats_query:
         # Calculate handicap differential
         handicap_diff = None
         if stat.avg_gross and stat.avg_net:
@@ -285,7 +259,7 @@ def get_league_player_stats(
         
         results.append({
             "player_id": stat.player_id,
-            "player_name": f"{stat.first_name} {stat.last_name}",
+            "player_name": f"{first_name} {last_name}",
             "team_name": player_teams.get(stat.player_id, "Unknown Team"),
             "rounds_played": stat.rounds_played,
             "avg_gross_score": float(stat.avg_gross) if stat.avg_gross else None,
@@ -298,6 +272,7 @@ def get_league_player_stats(
     return results
 
 @router.get("/league/{league_id}/top-scores", response_model=List[Dict[str, Any]])
+@cache_league_response
 def get_top_player_scores(
     league_id: int,
     score_type: str = "gross",
@@ -320,7 +295,7 @@ def get_top_player_scores(
     top_scores = (
         db.query(
             MatchPlayer.player_id,
-            func.concat(Player.first_name, ' ', Player.last_name).label("player_name"),
+            (Player.first_name + ' ' + Player.last_name).label("player_name"),
             score_field.label("score"),
             Match.match_date.label("date"),
             Course.name.label("course_name")
@@ -352,6 +327,7 @@ def get_top_player_scores(
     return result
 
 @router.get("/league/{league_id}/most-improved", response_model=List[Dict[str, Any]])
+@cache_league_response
 def get_most_improved_players(
     league_id: int,
     limit: int = 10,
@@ -368,81 +344,40 @@ def get_most_improved_players(
     if not league:
         raise HTTPException(status_code=404, detail="League not found")
     
-    # First get all players with their match scores, ordered by date
-    player_rounds = db.query(
-        MatchPlayer.player_id,
-        Player.first_name,
-        Player.last_name,
-        MatchPlayer.gross_score,
-        Match.match_date
-    ).join(
-        Player, MatchPlayer.player_id == Player.id
-    ).join(
-        Match, MatchPlayer.match_id == Match.id
-    ).join(
-        Week, Match.week_id == Week.id
+    # Each player's gross rounds in date order, reduced with vectorized group sums
+    frame = analytics.load_season_frame(db, league_id)
+    improvements = analytics.to_records(analytics.most_improved(frame, min_rounds=4, initial_rounds=3))
+    
+    # Sort by improvement (highest improvement first), ties in player order
+    improvements.sort(key=lambda x: round(x["improvement"], 1), reverse=True)
+    improvements = improvements[:limit]
+    
+    names = dict(db.query(
+        Player.id,
+        Player.first_name + ' ' + Player.last_name
     ).filter(
-        Week.league_id == league_id,
-        MatchPlayer.gross_score.isnot(None)
-    ).order_by(
-        MatchPlayer.player_id,
-        Match.match_date
-    ).all()
+        Player.id.in_([row["player_id"] for row in improvements])
+    ).all()) if improvements else {}
     
-    # Organize scores by player
-    player_data = {}
-    for round_data in player_rounds:
-        player_id = round_data.player_id
-        player_name = f"{round_data.first_name} {round_data.last_name}"
-        gross_score = round_data.gross_score
-        
-        if player_id not in player_data:
-            player_data[player_id] = {
-                "player_id": player_id,
-                "player_name": player_name,
-                "rounds": []
-            }
+    results = []
+    for row in improvements:
+        improvement = row["improvement"]
         
-        player_data[player_id]["rounds"].append(gross_score)
-    
-    # Calculate improvement for players with at least 4 rounds
-    improvements = []
-    for player_id, data in player_data.items():
-        rounds = data["rounds"]
-        if len(rounds) >= 4:  # Need at least 4 rounds
-            # Calculate initial average (first 3 rounds)
-            initial_rounds = rounds[:3]
-            initial_avg = sum(initial_rounds) / len(initial_rounds)
-            
-            # Calculate overall average (all rounds)
-            overall_avg = sum(rounds) / len(rounds)
-            
-            # Calculate improvement (positive = better)
-            improvement = initial_avg - overall_avg
-            
-            # Format improvement string with + or - sign
-            if improvement > 0:
-                improvement_display = f"+{improvement:.1f}"
-            else:
-                improvement_display = f"{improvement:.1f}"
-            
-            improvements.append({
-                "player_id": player_id,
-                "player_name": data["player_name"],
-                "total_rounds": len(rounds),
-                "initial_avg": round(initial_avg, 1),
-                "overall_avg": round(overall_avg, 1),
-                "improvement": round(improvement, 1),
-                "improvement_display": improvement_display
-            })
-    
-    # Sort by improvement (highest improvement first)
-    improvements.sort(key=lambda x: x["improvement"], reverse=True)
+        # Format improvement string with + or - sign
+        results.append({
+            "player_id": row["player_id"],
+            "player_name": names.get(row["player_id"]),
+            "total_rounds": row["total_rounds"],
+            "initial_avg": round(row["initial_avg"], 1),
+            "overall_avg": round(row["overall_avg"], 1),
+            "improvement": round(improvement, 1),
+            "improvement_display": f"+{improvement:.1f}" if improvement > 0 else f"{improvement:.1f}"
+        })
     
-    # Apply the limit
-    return improvements[:limit]
+    return results
 
 @router.get("/league/{league_id}/mvp", response_model=List[Dict[str, Any]])
+@cache_league_response
 def get_most_valuable_players(
     league_id: int,
     limit: int = 10,
@@ -460,72 +395,43 @@ def get_most_valuable_players(
     if not league:
         raise HTTPException(status_code=404, detail="League not found")
     
-    # Query to get total points for each player in the league
+    # Total points for each player come straight from the season rollup
     mvp_stats = db.query(
-        MatchPlayer.player_id,
+        PlayerLeagueStats,
         Player.first_name,
-        Player.last_name,
-        func.sum(MatchPlayer.points).label("total_points"),
-        func.count(MatchPlayer.id).label("rounds_played"),
-        func.avg(MatchPlayer.points).label("avg_points_per_round")
-    ).join(
-        Player, MatchPlayer.player_id == Player.id
-    ).join(
-        Match, MatchPlayer.match_id == Match.id
+        Player.last_name
     ).join(
-        Week, Match.week_id == Week.id
+        Player, PlayerLeagueStats.player_id == Player.id
     ).filter(
-        Week.league_id == league_id,
-        MatchPlayer.points.isnot(None)
-    ).group_by(
-        MatchPlayer.player_id,
-        Player.first_name,
-        Player.last_name
-    ).having(
-        func.count(MatchPlayer.id) >= min_rounds
+        PlayerLeagueStats.league_id == league_id,
+        PlayerLeagueStats.points_rounds > 0,
+        PlayerLeagueStats.points_rounds >= min_rounds
     ).order_by(
-        func.sum(MatchPlayer.points).desc()
+        PlayerLeagueStats.points_total.desc()
     ).limit(limit).all()
     
     # Get the most recent team for each player
-    player_teams = {}
-    for stat in mvp_stats:
-        most_recent_team = db.query(
-            Team.name.label("team_name")
-        ).join(
-            MatchPlayer, MatchPlayer.team_id == Team.id
-        ).join(
-            Match, MatchPlayer.match_id == Match.id
-        ).join(
-            Week, Match.week_id == Week.id
-        ).filter(
-            MatchPlayer.player_id == stat.player_id,
-            Week.league_id == league_id
-        ).order_by(
-            Match.match_date.desc()
-        ).first()
-        
-        if most_recent_team:
-            player_teams[stat.player_id] = most_recent_team.team_name
-        else:
-            player_teams[stat.player_id] = "Unknown Team"
+    player_teams = player_league_stats_crud.get_latest_team_names(
+        db, league_id, [stat.player_id for stat, _, _ in mvp_stats]
+    )
     
     # Format results
     results = []
-    for rank, stat in enumerate(mvp_stats, 1):
+    for rank, (stat, first_name, last_name) in enumerate(mvp_stats, 1):
         results.append({
             "rank": rank,
             "player_id": stat.player_id,
-            "player_name": f"{stat.first_name} {stat.last_name}",
+            "player_name": f"{first_name} {last_name}",
             "team_name": player_teams.get(stat.player_id, "Unknown Team"),
-            "total_points": float(stat.total_points) if stat.total_points else 0.0,
-            "rounds_played": stat.rounds_played,
-            "avg_points_per_round": round(float(stat.avg_points_per_round), 2) if stat.avg_points_per_round else 0.0
+            "total_points": float(stat.points_total) if stat.points_total else 0.0,
+            "rounds_played": stat.points_rounds,
+            "avg_points_per_round": round(float(stat.avg_points), 2) if stat.avg_points else 0.0
         })
     
     return results
 
 @router.get("/league/{league_id}/mvp-detailed", response_model=Dict[str, Any])
+@cache_league_response
 def get_mvp_detailed_stats(
     league_id: int,
     player_id: Optional[int] = None,
@@ -568,7 +474,7 @@ def get_mvp_detailed_stats(
         ).filter(
             MatchPlayer.player_id == player_id,
             Week.league_id == league_id,
-            MatchPlayer.points_earned.isnot(None)
+            MatchPlayer.points.isnot(None)
         ).order_by(
             Match.match_date.desc()
         ).all()
@@ -577,23 +483,17 @@ def get_mvp_detailed_stats(
         total_points = sum(match.points for match in player_matches)
         rounds_played = len(player_matches)
         avg_points = total_points / rounds_played if rounds_played > 0 else 0
-        best_week = max(player_matches, key=lambda x: x.points_earned) if player_matches else None
+        best_week = max(player_matches, key=lambda x: x.points) if player_matches else None
         
-        # Get player's rank in league
+        # Get player's rank in league from the season rollup
         rank_query = db.query(
-            MatchPlayer.player_id,
-            func.sum(MatchPlayer.points).label("total_points")
-        ).join(
-            Match, MatchPlayer.match_id == Match.id
-        ).join(
-            Week, Match.week_id == Week.id
+            PlayerLeagueStats.player_id,
+            PlayerLeagueStats.points_total.label("total_points")
         ).filter(
-            Week.league_id == league_id,
-            MatchPlayer.points.isnot(None)
-        ).group_by(
-            MatchPlayer.player_id
+            PlayerLeagueStats.league_id == league_id,
+            PlayerLeagueStats.points_rounds > 0
         ).order_by(
-            func.sum(MatchPlayer.points).desc()
+            PlayerLeagueStats.points_total.desc()
         ).all()
         
         player_rank = None
@@ -612,7 +512,7 @@ def get_mvp_detailed_stats(
             "avg_points_per_round": round(avg_points, 2),
             "best_week": {
                 "week_number": best_week.week_number,
-                "points_earned": best_week.points_earned,
+                "points_earned": best_week.points,
                 "match_date": best_week.match_date,
                 "course_name": best_week.course_name
             } if best_week else None,
@@ -622,7 +522,7 @@ def get_mvp_detailed_stats(
                     "match_date": match.match_date,
                     "course_name": match.course_name,
                     "team_name": match.team_name,
-                    "points_earned": match.points_earned,
+                    "points_earned": match.points,
                     "gross_score": match.gross_score,
                     "net_score": match.net_score
                 }
@@ -633,60 +533,44 @@ def get_mvp_detailed_stats(
     else:
         # Get overall MVP leaderboard with context
         mvp_stats = db.query(
-            MatchPlayer.player_id,
+            PlayerLeagueStats,
             Player.first_name,
-            Player.last_name,
-            func.sum(MatchPlayer.points).label("total_points"),
-            func.count(MatchPlayer.id).label("rounds_played"),
-            func.avg(MatchPlayer.points).label("avg_points_per_round"),
-            func.max(MatchPlayer.points).label("best_week_points")
-        ).join(
-            Player, MatchPlayer.player_id == Player.id
-        ).join(
-            Match, MatchPlayer.match_id == Match.id
+            Player.last_name
         ).join(
-            Week, Match.week_id == Week.id
+            Player, PlayerLeagueStats.player_id == Player.id
         ).filter(
-            Week.league_id == league_id,
-            MatchPlayer.points.isnot(None)
-        ).group_by(
-            MatchPlayer.player_id,
-            Player.first_name,
-            Player.last_name
+            PlayerLeagueStats.league_id == league_id,
+            PlayerLeagueStats.points_rounds > 0
         ).order_by(
-            func.sum(MatchPlayer.points).desc()
+            PlayerLeagueStats.points_total.desc()
         ).limit(10).all()
         
         # Get league context
         total_weeks = db.query(func.count(Week.id)).filter(Week.league_id == league_id).scalar()
-        total_players = db.query(func.count(func.distinct(MatchPlayer.player_id))).join(
-            Match, MatchPlayer.match_id == Match.id
-        ).join(
-            Week, Match.week_id == Week.id
-        ).filter(Week.league_id == league_id).scalar()
+        league_totals = db.query(
+            func.count(PlayerLeagueStats.id).label("total_players"),
+            func.sum(PlayerLeagueStats.points_total).label("points_total"),
+            func.sum(PlayerLeagueStats.points_rounds).label("points_rounds")
+        ).filter(
+            PlayerLeagueStats.league_id == league_id
+        ).first()
+        total_players = league_totals.total_players if league_totals else 0
         
         # Calculate average points per week across all players
-        avg_points_per_week = db.query(
-            func.avg(MatchPlayer.points)
-        ).join(
-            Match, MatchPlayer.match_id == Match.id
-        ).join(
-            Week, Match.week_id == Week.id
-        ).filter(
-            Week.league_id == league_id,
-            MatchPlayer.points.isnot(None)
-        ).scalar()
+        avg_points_per_week = None
+        if league_totals and league_totals.points_rounds:
+            avg_points_per_week = league_totals.points_total / league_totals.points_rounds
         
         results = []
-        for rank, stat in enumerate(mvp_stats, 1):
+        for rank, (stat, first_name, last_name) in enumerate(mvp_stats, 1):
             results.append({
                 "rank": rank,
                 "player_id": stat.player_id,
-                "player_name": f"{stat.first_name} {stat.last_name}",
-                "total_points": float(stat.total_points) if stat.total_points else 0.0,
-                "rounds_played": stat.rounds_played,
-                "avg_points_per_round": round(float(stat.avg_points_per_round), 2) if stat.avg_points_per_round else 0.0,
-                "best_week_points": float(stat.best_week_points) if stat.best_week_points else 0.0
+                "player_name": f"{first_name} {last_name}",
+                "total_points": float(stat.points_total) if stat.points_total else 0.0,
+                "rounds_played": stat.points_rounds,
+                "avg_points_per_round": round(float(stat.avg_points), 2) if stat.avg_points else 0.0,
+                "best_week_points": float(stat.best_points) if stat.best_points else 0.0
             })
         
         return {
@@ -1,12 +1,12 @@
 from typing import List, Optional, Dict, Any
+from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker, selectinload
 from sqlalchemy import func
-import statistics
-from decimal import Decimal, ROUND_HALF_UP
 
 from app.db.session import get_db
-from app.models.player import Player
+from app.crud import handicap as handicap_crud
+from app.models.player import Player, player_team_association
 from app.models.league import League
 from app.models.match_player import MatchPlayer
 from app.models.match import Match
@@ -22,10 +22,7 @@ from app.api.deps import get_current_active_user
 
 router = APIRouter()
 
-def round_half_up(value: float, decimals: int = 0) -> float:
-    """Round a value with .5 always rounding up"""
-    multiplier = 10 ** decimals
-    return float(Decimal(str(value * multiplier)).quantize(Decimal('1'), rounding=ROUND_HALF_UP)) / multiplier
+QUERY_BUDGET = 10
 
 @router.get("", response_model=List[PlayerResponse])
 def get_players(
@@ -39,7 +36,7 @@ def get_players(
     Retrieve all players.
     Optional query parameter team_id to filter by team.
     """
-    query = db.query(Player)
+    query = db.query(Player).options(selectinload(Player.teams))
     
     # Filter by team if requested
     if team_id is not None:
@@ -151,161 +148,50 @@ def update_league_player_handicaps(
     if not league:
         raise HTTPException(status_code=404, detail="League not found")
     
-    # Get league handicap settings - ensure we have Python int/float values
-    min_scores_required = 3
-    scores_to_use = 10
-    handicap_percentage = 0.85
-    
-    if league.handicap_required_scores is not None:
-        min_scores_required = league.handicap_required_scores
-    if league.handicap_recent_scores_used is not None:
-        scores_to_use = league.handicap_recent_scores_used
-    if league.handicap_perecentage_to_par is not None:
-        handicap_percentage = league.handicap_perecentage_to_par / 100
+    settings = handicap_crud.get_league_handicap_settings(league)
     
     # Validate exclude_highest parameter
     if exclude_highest is not None and exclude_highest < 0:
         raise HTTPException(status_code=400, detail="exclude_highest must be non-negative")
     
     # Run the update as a background task to avoid timeouts for large leagues
+    # The task opens its own session on the same engine: the request's session
+    # is closed by the time background tasks run
     background_tasks.add_task(
-        _process_handicap_updates,
-        db_session=db,
+        handicap_crud.recalculate_league_handicaps,
+        session_factory=sessionmaker(bind=db.get_bind(), autoflush=False),
         league_id=league_id,
-        min_scores_required=min_scores_required, # type: ignore
-        scores_to_use=scores_to_use, # type: ignore
-        handicap_percentage=handicap_percentage, # type: ignore
-        exclude_highest=exclude_highest
+        exclude_highest=exclude_highest,
+        **settings
     )
     
     return {
         "message": "Handicap update started",
         "league_id": league_id,
-        "min_scores_required": min_scores_required,
-        "scores_to_use": scores_to_use,
-        "handicap_percentage": handicap_percentage,
+        **settings,
         "exclude_highest": exclude_highest
     }
 
-def _process_handicap_updates(
-    db_session: Session,
+@router.get("/leagues/{league_id}/handicaps", response_model=Dict[str, Any])
+def get_league_handicaps(
     league_id: int,
-    min_scores_required: int,
-    scores_to_use: int,
-    handicap_percentage: float,
-    exclude_highest: Optional[int] = None
+    as_of: Optional[date] = None,
+    db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)
 ):
-    """Background task to process handicap updates for all players in a league"""
-    updated_count = 0
-    skipped_count = 0
-    
-    try:
-        # Get all players who have played in this league
-        player_scores = (
-            db_session.query(
-                MatchPlayer.player_id,
-                Player.first_name,
-                Player.last_name,
-                func.count(MatchPlayer.id).label("score_count")
-            )
-            .join(Player, MatchPlayer.player_id == Player.id)
-            .join(Match, MatchPlayer.match_id == Match.id)
-            .join(Week, Match.week_id == Week.id)
-            .filter(Week.league_id == league_id)
-            .filter(MatchPlayer.gross_score.isnot(None))
-            .group_by(MatchPlayer.player_id, Player.first_name, Player.last_name)
-            .all()
-        )
-        
-        # Process each player
-        for player_id, first_name, last_name, score_count in player_scores:
-            # Skip if not enough scores
-            if score_count < min_scores_required:
-                skipped_count += 1
-                continue
-            
-            # Get the player's recent scores with course par info
-            recent_scores = (
-                db_session.query(
-                    MatchPlayer.gross_score,
-                    Match.course_id,
-                    Course.total_par.label("course_par")
-                )
-                .join(Match, MatchPlayer.match_id == Match.id)
-                .join(Week, Match.week_id == Week.id)
-                .join(Course, Match.course_id == Course.id)
-                .filter(Week.league_id == league_id)
-                .filter(MatchPlayer.player_id == player_id)
-                .filter(MatchPlayer.gross_score.isnot(None))
-                .order_by(Match.match_date.desc())
-                .limit(scores_to_use)
-                .all()
-            )
-            
-            # Calculate differentials (score minus par)
-            differentials = []
-            for score in recent_scores:
-                if score.gross_score and score.course_par:
-                    differential = score.gross_score - score.course_par
-                    differentials.append(differential)
-            
-            if not differentials:
-                skipped_count += 1
-                continue
-            
-            # Exclude highest scores if specified
-            if exclude_highest is not None and exclude_highest > 0:
-                # Sort differentials in ascending order and exclude the highest ones
-                differentials.sort()
-                exclude_count = min(exclude_highest, len(differentials))
-                differentials = differentials[:-exclude_count]
-            
-            # Skip if no differentials remain after exclusion
-            if not differentials:
-                skipped_count += 1
-                continue
-            # Calculate average differential
-            avg_differential = statistics.mean(differentials)
-            
-            # Apply handicap percentage (typically 85% of average differential)
-            handicap = avg_differential * handicap_percentage
-            
-            # Round to nearest tenth (1 decimal place)
-            handicap = round(handicap, 1)
-            
-            # Update player handicap
-            player = db_session.query(Player).filter(Player.id == player_id).first()
-            if player:
-                player.handicap = handicap
-                db_session.add(player)
-                updated_count += 1
-
-            # Also update player handicap on incomplete matches for this player
-            incomplete_matches = (
-                db_session.query(MatchPlayer)
-                .join(Match, MatchPlayer.match_id == Match.id)
-                .join(Week, Match.week_id == Week.id)
-                .filter(Week.league_id == league_id)
-                .filter(MatchPlayer.player_id == player_id)
-                .filter(MatchPlayer.gross_score.is_(None))
-                .all()
-            )
-
-            for incomplete_match in incomplete_matches:
-                incomplete_match.handicap = round_half_up(handicap, 0) # type: ignore
-                db_session.add(incomplete_match)
-        
-        # Commit all changes
-        db_session.commit()
-        
-        print(f"Handicap update complete: {updated_count} players updated, {skipped_count} players skipped")
+    """
+    Handicaps of every player in a league as of a date (default today),
+    read from the handicap history rather than the current Player.handicap.
+    """
+    league = db.query(League).filter(League.id == league_id).first()
+    if not league:
+        raise HTTPException(status_code=404, detail="League not found")
     
-    except Exception as e:
-        db_session.rollback()
-        print(f"Error updating handicaps: {str(e)}")
-        
-    finally:
-        db_session.close()
+    as_of = as_of or date.today()
+    return {
+        "league_id": league_id,
+        "as_of": as_of,
+        "players": handicap_crud.get_league_handicaps_as_of(db, league_id, as_of)
+    }
 
 @router.get("/{player_id}/teams")
 def get_player_teams(player_id: int, db: Session = Depends(get_db)):
@@ -325,7 +211,24 @@ def get_player_teams(player_id: int, db: Session = Depends(get_db)):
         .filter(Team.players.any(Player.id == player_id))
         
     tournament_teams = tournament_teams_query.all()
-    
+        
+    # Check if this team is associated with a league
+    league_teams_query = db.query(Team, League.name.label('event_name'))\
+        .join(league_teams, Team.id == league_teams.c.team_id)\
+        .join(League, league_teams.c.league_id == League.id)\
+        .filter(Team.players.any(Player.id == player_id))
+
+    league_teams_results = league_teams_query.all()
+
+    # Player counts of all these teams, with one query
+    team_ids = {team.id for team, _ in tournament_teams} | {team.id for team, _ in league_teams_results}
+    player_counts = dict(
+        db.query(player_team_association.c.team_id, func.count(player_team_association.c.player_id))
+        .filter(player_team_association.c.team_id.in_(team_ids))
+        .group_by(player_team_association.c.team_id)
+        .all()
+    )
+
     for team, tournament_name in tournament_teams:
         teams_data.append({
             "id": team.id,
@@ -333,17 +236,9 @@ def get_player_teams(player_id: int, db: Session = Depends(get_db)):
             "description": team.description,
             "status": "active",
             "type": "tournament",
-            "player_count": len(team.players) if team.players else 0,
+            "player_count": player_counts.get(team.id, 0),
             "event_name": tournament_name
         })
-        
-        # Check if this team is associated with a league
-    league_teams_query = db.query(Team, League.name.label('event_name'))\
-        .join(league_teams, Team.id == league_teams.c.team_id)\
-        .join(League, league_teams.c.league_id == League.id)\
-        .filter(Team.players.any(Player.id == player_id))
-
-    league_teams_results = league_teams_query.all()
 
     for team, event_name in league_teams_results:
         teams_data.append({
@@ -352,7 +247,7 @@ def get_player_teams(player_id: int, db: Session = Depends(get_db)):
             "description": team.description,
             "status": "active",
             "type": "league",
-            "player_count": len(team.players) if team.players else 0,
+            "player_count": player_counts.get(team.id, 0),
             "event_name": event_name
         })
 
@@ -5,6 +5,7 @@ from typing import List, Dict, Any, Optional
 
 from app.db.session import get_db
 from app.api.deps import get_current_active_user
+from app.core.stats_cache import cache_league_response
 from app.models.user import User
 from app.models.match_player import MatchPlayer
 from app.models.match import Match
@@ -13,10 +14,14 @@ from app.models.league import League
 from app.models.team import Team
 from app.models.week import Week
 from app.models.course import Course
+from app.models.team_league_standings import TeamLeagueStandings
 
 router = APIRouter()
 
+QUERY_BUDGET = 10
+
 @router.get("/league/{league_id}", response_model=List[Dict[str, Any]])
+@cache_league_response
 def get_league_team_stats(
     league_id: int,
     db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)
@@ -30,135 +35,33 @@ def get_league_team_stats(
     if not league:
         raise HTTPException(status_code=404, detail="League not found")
     
-    # Get all teams in the league
-    teams = db.query(Team).filter(
-        Team.leagues.any(League.id == league_id)
+    # Read the materialized stats for every team with a scored completed match
+    standings_rows = db.query(
+        TeamLeagueStandings,
+        Team.name
+    ).join(
+        Team, TeamLeagueStandings.team_id == Team.id
+    ).filter(
+        TeamLeagueStandings.league_id == league_id,
+        TeamLeagueStandings.scored_matches > 0
     ).all()
     
     results = []
-    
-    for team in teams:
-        # Stats as home team
-        home_stats = db.query(
-            func.count(Match.id).label("matches_played"),
-            func.avg(Match.home_team_gross_score).label("avg_gross"),
-            func.min(Match.home_team_gross_score).label("lowest_gross"),
-            func.avg(Match.home_team_net_score).label("avg_net"),
-            func.min(Match.home_team_net_score).label("lowest_net"),
-            func.sum(Match.home_team_points).label("points_won"),
-            func.sum(Match.away_team_points).label("points_lost")
-        ).join(
-            Week, Match.week_id == Week.id
-        ).filter(
-            Week.league_id == league_id,
-            Match.home_team_id == team.id,
-            Match.is_completed == True,
-            Match.home_team_gross_score.isnot(None)
-        ).first()
-        
-        # Stats as away team
-        away_stats = db.query(
-            func.count(Match.id).label("matches_played"),
-            func.avg(Match.away_team_gross_score).label("avg_gross"),
-            func.min(Match.away_team_gross_score).label("lowest_gross"),
-            func.avg(Match.away_team_net_score).label("avg_net"),
-            func.min(Match.away_team_net_score).label("lowest_net"),
-            func.sum(Match.away_team_points).label("points_won"),
-            func.sum(Match.home_team_points).label("points_lost")
-        ).join(
-            Week, Match.week_id == Week.id
-        ).filter(
-            Week.league_id == league_id,
-            Match.away_team_id == team.id,
-            Match.is_completed == True,
-            Match.away_team_gross_score.isnot(None)
-        ).first()
-        
-        # Calculate combined statistics
-        home_matches = home_stats.matches_played if home_stats else 0
-        away_matches = away_stats.matches_played if away_stats else 0
-        matches_played = (home_matches or 0) + (away_matches or 0)
-        
-        # Skip teams with no matches
-        if matches_played == 0:
-            continue
-        
-        # Calculate points
-        points_won = 0
-        if home_stats is not None and home_stats.points_won is not None:
-            points_won += home_stats.points_won
-        if away_stats is not None and away_stats.points_won is not None:
-            points_won += away_stats.points_won
-            
-        points_lost = 0
-        if home_stats is not None and home_stats.points_lost is not None:
-            points_lost += home_stats.points_lost
-        if away_stats is not None and away_stats.points_lost is not None:
-            points_lost += away_stats.points_lost
-        
-        # Calculate win percentage
-        win_percentage = 0
-        total_points = points_won + points_lost
-        if total_points > 0:
-            win_percentage = round((points_won / total_points) * 100)
-        
-        # Calculate averages
-        home_rounds = home_stats.matches_played if home_stats else 0
-        away_rounds = away_stats.matches_played if away_stats else 0
-        
-        # Calculate average gross score
-        avg_gross = None
-        if home_rounds > 0 and away_rounds > 0:
-            if home_stats is not None and away_stats is not None and home_stats.avg_gross is not None and away_stats.avg_gross is not None:
-                home_total = home_stats.avg_gross * home_rounds
-                away_total = away_stats.avg_gross * away_rounds
-                avg_gross = (home_total + away_total) / matches_played
-        elif home_rounds > 0 and home_stats is not None and home_stats.avg_gross is not None:
-            avg_gross = home_stats.avg_gross
-        elif away_rounds > 0 and away_stats is not None and away_stats.avg_gross is not None:
-            avg_gross = away_stats.avg_gross
-            
-        # Calculate average net score
-        avg_net = None
-        if home_rounds > 0 and away_rounds > 0:
-            if (home_stats is not None and home_stats.avg_net is not None and 
-                away_stats is not None and away_stats.avg_net is not None):
-                home_total = home_stats.avg_net * home_rounds
-                away_total = away_stats.avg_net * away_rounds
-                avg_net = (home_total + away_total) / matches_played
-        elif home_rounds > 0 and home_stats is not None and home_stats.avg_net is not None:
-            avg_net = home_stats.avg_net
-        elif away_rounds > 0 and away_stats is not None and away_stats.avg_net is not None:
-            avg_net = away_stats.avg_net
-            
-        # Find lowest scores
-        lowest_gross = None
-        if home_stats is not None and away_stats is not None and home_stats.lowest_gross is not None and away_stats.lowest_gross is not None:
-            lowest_gross = min(home_stats.lowest_gross, away_stats.lowest_gross)
-        elif home_stats is not None and home_stats.lowest_gross is not None:
-            lowest_gross = home_stats.lowest_gross
-        elif away_stats is not None and away_stats.lowest_gross is not None:
-            lowest_gross = away_stats.lowest_gross
-            
-        lowest_net = None
-        if home_stats is not None and away_stats is not None and home_stats.lowest_net is not None and away_stats.lowest_net is not None:
-            lowest_net = min(home_stats.lowest_net, away_stats.lowest_net)
-        elif home_stats is not None and home_stats.lowest_net is not None:
-            lowest_net = home_stats.lowest_net
-        elif away_stats is not None and away_stats.lowest_net is not None:
-            lowest_net = away_stats.lowest_net
+    for standings, team_name in standings_rows:
+        avg_gross = standings.scored_avg_gross
+        avg_net = standings.scored_avg_net
         
         results.append({
-            "team_id": team.id,
-            "team_name": team.name,
-            "matches_played": matches_played,
-            "points_won": points_won,
-            "points_lost": points_lost,
-            "win_percentage": win_percentage,
+            "team_id": standings.team_id,
+            "team_name": team_name,
+            "matches_played": standings.scored_matches,
+            "points_won": standings.scored_points_won,
+            "points_lost": standings.scored_points_lost,
+            "win_percentage": round(standings.scored_win_percentage),
             "avg_gross_score": float(avg_gross) if avg_gross is not None else None,
             "avg_net_score": float(avg_net) if avg_net is not None else None,
-            "lowest_gross_score": int(lowest_gross) if lowest_gross is not None else None,
-            "lowest_net_score": float(lowest_net) if lowest_net is not None else None
+            "lowest_gross_score": int(standings.scored_lowest_gross) if standings.scored_lowest_gross is not None else None,
+            "lowest_net_score": float(standings.scored_lowest_net) if standings.scored_lowest_net is not None else None
         })
     
     # Sort by win percentage (descending)
@@ -171,6 +74,7 @@ def get_league_team_stats(
     return results
 
 @router.get("/league/{league_id}/top-scores", response_model=List[Dict[str, Any]])
+@cache_league_response
 def get_top_team_scores(
     league_id: int,
     score_type: str = "gross",
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from typing import List
 
 from app.db.base import get_db
@@ -7,10 +7,13 @@ from app.models.team import Team
 from app.models.player import Player
 from app.models.user import User
 from app.api.deps import get_current_active_user
+from app.core.query_budget import query_budget
 from app.schemas.team import TeamCreate, TeamResponse, PlayerCreate, PlayerResponse, TeamUpdate, PlayerUpdate
 
 router = APIRouter()
 
+QUERY_BUDGET = 15
+
 @router.get("/check-email")
 def check_email_exists(email: str = Query(..., description="Email to check"), db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     """Check if an email already exists in the players table"""
@@ -20,6 +23,7 @@ def check_email_exists(email: str = Query(..., description="Email to check"), db
 
 # Update the create_team endpoint
 @router.post("", response_model=TeamResponse, status_code=status.HTTP_201_CREATED)
+@query_budget(30)
 def create_team(team_in: TeamCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     """Create a new team."""
     # Create the team
@@ -116,12 +120,16 @@ def create_team(team_in: TeamCreate, db: Session = Depends(get_db), current_user
 
 @router.get("", response_model=List[TeamResponse])
 def read_teams(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    teams = db.query(Team).offset(skip).limit(limit).all()
+    teams = db.query(Team).options(
+        selectinload(Team.players).selectinload(Player.teams)
+    ).offset(skip).limit(limit).all()
     return teams
 
 @router.get("/{team_id}", response_model=TeamResponse)
 def read_team(team_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
-    db_team = db.query(Team).filter(Team.id == team_id).first()
+    db_team = db.query(Team).options(
+        selectinload(Team.players).selectinload(Player.teams)
+    ).filter(Team.id == team_id).first()
     if db_team is None:
         raise HTTPException(status_code=404, detail="Team not found")
     return db_team
@@ -165,6 +173,7 @@ def delete_team(team_id: int, db: Session = Depends(get_db), current_user: User
     return None
 
 @router.put("/{team_id}", response_model=TeamResponse)
+@query_budget(30)
 def update_team(team_id: int, team_update: TeamUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     """Update a team and its players"""
     # Find the team
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Dict, Optional
 from sqlalchemy import func
 from datetime import date, datetime
@@ -19,6 +19,8 @@ from app.schemas.team import TeamResponse
 
 router = APIRouter()
 
+QUERY_BUDGET = 15
+
 @router.post("/", response_model=TournamentOut)
 def create_tournament(tournament: TournamentCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     # Create tournament logic
@@ -288,7 +290,9 @@ def get_tournament_teams(
 ):
     """Get all teams assigned to a tournament"""
     # Verify tournament exists
-    tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
+    tournament = db.query(Tournament).options(
+        selectinload(Tournament.teams).selectinload(Team.players)
+    ).filter(Tournament.id == tournament_id).first()
     if not tournament:
         raise HTTPException(status_code=404, detail="Tournament not found")
     
@@ -10,6 +10,8 @@ from app.crud import user as user_crud
 
 router = APIRouter()
 
+QUERY_BUDGET = 5
+
 @router.get("/me", response_model=User)
 def read_user_me(
     current_user: User = Depends(get_current_active_user),
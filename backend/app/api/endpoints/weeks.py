@@ -11,6 +11,8 @@ from app.api.deps import get_current_active_user
 
 router = APIRouter()
 
+QUERY_BUDGET = 5
+
 @router.post("/{league_id}/weeks", response_model=WeekRead, status_code=status.HTTP_201_CREATED)
 def create_week(league_id: int, week_data: WeekCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     return week_crud.create_week(db, week_data, league_id)
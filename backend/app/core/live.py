@@ -0,0 +1,287 @@
+"""
+Live score events over Server-Sent Events.
+
+Score writes queue an event on their session with publish_on_commit. Once the
+session commits, the event is serialized a single time and handed to the
+broker, which fans the same message out to every subscriber of its channel
+(e.g. "match:12") without touching the database. Rolled-back writes publish
+nothing.
+
+Every event carries an id that increases per channel, and the broker keeps the
+last LIVE_REPLAY_SIZE messages of each channel. A client reconnecting with the
+last id it saw (EventSource sends it as Last-Event-ID) is sent what it missed,
+or a "reset" event when those messages are gone and it must reload.
+
+The default MemoryBroker only reaches subscribers connected to this process.
+With several workers, set LIVE_BROKER_URL to a Redis URL: every worker then
+publishes through that Redis server and relays its messages to its own
+subscribers. Any other transport can be plugged in with set_broker.
+"""
+import asyncio
+import itertools
+import json
+import threading
+from collections import OrderedDict, defaultdict, deque
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+
+def match_channel(match_id: int) -> str:
+    return f"match:{match_id}"
+
+def league_channel(league_id: int) -> str:
+    return f"league:{league_id}"
+
+def _encode(data: Any) -> str:
+    return json.dumps(jsonable_encoder(data), separators=(",", ":"))
+
+def _message(event_id: int, event_type: str, payload: str) -> str:
+    return f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n"
+
+def format_event(event_id: int, event_type: str, data: Any) -> str:
+    """One SSE message"""
+    return _message(event_id, event_type, _encode(data))
+
+# Sent instead of a replay the broker no longer has
+RESET_EVENT = "event: reset\ndata: {}\n\n"
+
+class Subscription:
+    """
+    One subscriber's queue of SSE messages, owned by the event loop that
+    created it. Messages may be delivered from any thread. A subscriber that
+    falls more than max_queued messages behind is closed rather than allowed
+    to grow without bound; the client reconnects.
+    """
+
+    def __init__(self, channel: str, max_queued: int):
+        self.channel = channel
+        self.max_queued = max_queued
+        self.closed = False
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def deliver(self, message: str):
+        self._loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message: Optional[str]):
+        if self.closed:
+            return
+        if message is None or self._queue.qsize() >= self.max_queued:
+            self.closed = True
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            message = None
+        self._queue.put_nowait(message)
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._put, None)
+
+    async def get(self) -> Optional[str]:
+        """The next message, or None once the subscription is closed"""
+        return await self._queue.get()
+
+class MemoryBroker:
+    """Fans published messages out to the subscribers in this process"""
+
+    # Replay history is kept for this many of the most recently active channels
+    max_history_channels = 1000
+
+    def __init__(self, max_queued: Optional[int] = None, replay_size: Optional[int] = None):
+        self.max_queued = max_queued or settings.LIVE_SUBSCRIBER_QUEUE_SIZE
+        self.replay_size = replay_size or settings.LIVE_REPLAY_SIZE
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._sequences: Dict[str, itertools.count] = defaultdict(lambda: itertools.count(1))
+        self._history: "OrderedDict[str, deque]" = OrderedDict()
+        self._last_ids: Dict[str, int] = {}
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, channel: str, last_event_id: Optional[int] = None) -> Subscription:
+        """
+        Subscribe from inside the event loop that will read the messages. With
+        last_event_id, the messages published after it are queued first (or
+        RESET_EVENT when they are no longer all kept).
+        """
+        subscription = Subscription(channel, self.max_queued)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+            if last_event_id is not None:
+                # Queued synchronously, ahead of any message delivered from now on
+                for message in self._replay(channel, last_event_id):
+                    subscription._put(message)
+        return subscription
+
+    def _replay(self, channel: str, last_event_id: int) -> List[str]:
+        history = self._history.get(channel) or ()
+        latest = self._last_ids.get(channel, 0)
+        oldest = history[0][0] if history else latest + 1
+        # Ids ahead of ours mean the sequence restarted (e.g. a server restart)
+        if last_event_id > latest or last_event_id < oldest - 1:
+            return [RESET_EVENT]
+        return [message for event_id, message in history if event_id > last_event_id]
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+        if subscription.closed:
+            self.dropped += 1
+
+    def subscriber_count(self, channel: Optional[str] = None) -> int:
+        with self._lock:
+            if channel is not None:
+                return len(self._subscribers.get(channel, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, channel: str, event_type: str, data: Any) -> str:
+        """Serialize an event once and send it to every subscriber of the channel"""
+        payload = _encode(data)
+        # Ids are taken and delivered under one lock, so concurrent publishes
+        # reach the history and every subscriber in id order
+        with self._lock:
+            event_id = next(self._sequences[channel])
+            message = _message(event_id, event_type, payload)
+            self._deliver_locked(channel, event_id, message)
+        return message
+
+    def _deliver(self, channel: str, event_id: int, message: str):
+        with self._lock:
+            self._deliver_locked(channel, event_id, message)
+
+    def _deliver_locked(self, channel: str, event_id: int, message: str):
+        history = self._history.get(channel)
+        if history is None:
+            history = self._history[channel] = deque(maxlen=self.replay_size)
+            if len(self._history) > self.max_history_channels:
+                self._history.popitem(last=False)
+        self._history.move_to_end(channel)
+        history.append((event_id, message))
+        self._last_ids[channel] = max(event_id, self._last_ids.get(channel, 0))
+        self.published += 1
+        # Only schedules the put on each subscriber's loop, so it is cheap under the lock
+        for subscription in self._subscribers.get(channel, ()):
+            subscription.deliver(message)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            channels = len(self._subscribers)
+        return {
+            "broker": type(self).__name__,
+            "channels": channels,
+            "subscribers": self.subscriber_count(),
+            "published": self.published,
+            "dropped_subscribers": self.dropped,
+        }
+
+class RedisBroker(MemoryBroker):
+    """
+    Publishes through a Redis server, so subscribers connected to any worker
+    receive the event. Event ids come from a Redis counter per channel and
+    each worker delivers the already-formatted message to its own subscribers.
+    Requires the redis package.
+    """
+
+    def __init__(self, url: str, prefix: str = "golf:live:", max_queued: Optional[int] = None):
+        super().__init__(max_queued)
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("LIVE_BROKER_URL requires the redis package (pip install redis)") from e
+
+        self._prefix = prefix
+        self._redis = redis.Redis.from_url(url)
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.psubscribe(**{f"{prefix}channel:*": self._on_message})
+        self._listener = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def _next_id(self, channel: str) -> int:
+        return int(self._redis.incr(f"{self._prefix}sequence:{channel}"))
+
+    def publish(self, channel: str, event_type: str, data: Any) -> str:
+        message = format_event(self._next_id(channel), event_type, data)
+        # Delivered to this worker's subscribers too, by _on_message
+        self._redis.publish(f"{self._prefix}channel:{channel}", message)
+        return message
+
+    def _on_message(self, item: Dict[str, Any]):
+        channel = item["channel"].decode()[len(f"{self._prefix}channel:"):]
+        message = item["data"].decode()
+        # Messages start with their "id: N" line
+        self._deliver(channel, int(message[4:message.index("\n")]), message)
+
+_broker: Optional[MemoryBroker] = None
+_broker_lock = threading.Lock()
+
+def get_broker() -> MemoryBroker:
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = RedisBroker(settings.LIVE_BROKER_URL) if settings.LIVE_BROKER_URL else MemoryBroker()
+        return _broker
+
+def set_broker(broker: MemoryBroker):
+    """Replace the process-wide broker (custom transports, tests)"""
+    global _broker
+    with _broker_lock:
+        _broker = broker
+
+def get_live_stats() -> Dict[str, Any]:
+    return get_broker().get_stats()
+
+async def stream_events(channel: str, last_event_id: Optional[int] = None) -> AsyncIterator[str]:
+    """
+    SSE messages for one subscriber, starting after last_event_id when given,
+    with a comment line as keepalive while idle
+    """
+    broker = get_broker()
+    subscription = broker.subscribe(channel, last_event_id)
+    try:
+        yield f"retry: {settings.LIVE_RETRY_MILLISECONDS}\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.get(), timeout=settings.LIVE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if message is None:
+                return
+            yield message
+    finally:
+        broker.unsubscribe(subscription)
+
+def event_stream_response(channel: str, last_event_id: Optional[int] = None) -> StreamingResponse:
+    return StreamingResponse(
+        stream_events(channel, last_event_id),
+        media_type="text/event-stream",
+        # Proxies must pass each event through as soon as it is written
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+_EVENTS_KEY = "live_events"
+
+def publish_on_commit(session: Session, channel: str, event_type: str, data: Any):
+    """Publish an event once the session's current transaction commits"""
+    session.info.setdefault(_EVENTS_KEY, []).append((channel, event_type, data))
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_events(session: Session):
+    events: List = session.info.pop(_EVENTS_KEY, None) or []
+    for channel, event_type, data in events:
+        try:
+            get_broker().publish(channel, event_type, data)
+        except Exception as e:
+            # The write has committed; a lost live update must not fail it
+            print(f"Error publishing live event to {channel}: {str(e)}")
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_events(session: Session):
+    session.info.pop(_EVENTS_KEY, None)
@@ -0,0 +1,233 @@
+"""
+Per-route request and database metrics in Prometheus text format.
+
+MetricsMiddleware times every HTTP request and labels it with the route
+template it matched (e.g. "/api/matches/{match_id}"), so ids never multiply
+the series. While a request runs, the SQLAlchemy listeners below add each
+statement it executes, the time spent in the driver and the rows the driver
+reports to that request's counters. Statements run outside a request (the
+token reaper, scripts) are not counted.
+
+The work per request is a few clock reads and one dict update under a lock.
+Streaming responses (the live SSE routes) are timed until the stream closes.
+"""
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+from anyio import to_thread
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Request latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class RequestStats:
+    """Database work of the request in progress"""
+    __slots__ = ("statements", "sql_seconds", "rows")
+
+    def __init__(self):
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+
+_current_request: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "metrics_request", default=None
+)
+
+class RouteMetrics:
+    __slots__ = ("buckets", "count", "seconds", "statements", "sql_seconds", "rows", "response_bytes", "statuses")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.response_bytes = 0
+        self.statuses: Dict[int, int] = {}
+
+class MetricsRegistry:
+    """Request metrics by (method, route template)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str], RouteMetrics] = {}
+
+    def record(self, method: str, route: str, status_code: int, seconds: float, stats: RequestStats, response_bytes: int):
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[(method, route)] = RouteMetrics()
+            metrics.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            metrics.count += 1
+            metrics.seconds += seconds
+            metrics.statements += stats.statements
+            metrics.sql_seconds += stats.sql_seconds
+            metrics.rows += stats.rows
+            metrics.response_bytes += response_bytes
+            metrics.statuses[status_code] = metrics.statuses.get(status_code, 0) + 1
+
+    def snapshot(self) -> Dict[Tuple[str, str], RouteMetrics]:
+        with self._lock:
+            copies = {}
+            for key, metrics in self._routes.items():
+                copy = RouteMetrics()
+                for name in RouteMetrics.__slots__:
+                    value = getattr(metrics, name)
+                    setattr(copy, name, value.copy() if isinstance(value, (list, dict)) else value)
+                copies[key] = copy
+            return copies
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+registry = MetricsRegistry()
+
+def route_template(scope) -> str:
+    """The template of the route that handled a request, or unmatched"""
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    # Depending on the FastAPI version, a route of a router included with a
+    # prefix reports only its own part; the prefix is what precedes it
+    path = scope["path"]
+    regex = getattr(route, "path_regex", None)
+    if regex is not None and not regex.match(path):
+        for position in range(1, len(path)):
+            if path[position] == "/" and regex.match(path[position:]):
+                return path[:position] + template
+    return template
+
+class MetricsMiddleware:
+    """ASGI middleware recording each HTTP request in the registry"""
+
+    def __init__(self, app, registry: MetricsRegistry = registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+        response_bytes = 0
+
+        async def send_with_metrics(message):
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _current_request.reset(token)
+            self.registry.record(
+                scope["method"], route_template(scope), status_code, time.perf_counter() - started, stats, response_bytes
+            )
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    if _current_request.get() is not None and context is not None:
+        context._metrics_started = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_request.get()
+    if stats is None or context is None:
+        return
+    started = getattr(context, "_metrics_started", None)
+    stats.statements += 1
+    if started is not None:
+        stats.sql_seconds += time.perf_counter() - started
+    # Rows affected by writes; for reads, what the driver reports (MySQL's
+    # buffered cursors give the rows returned, SQLite gives -1)
+    if cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(**labels: Any) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def threadpool_stats() -> Dict[str, Any]:
+    """
+    The request threadpool (anyio's default thread limiter) that sync
+    endpoints and dependencies run on. Call from the event loop.
+    """
+    limiter = to_thread.current_default_thread_limiter()
+    statistics = limiter.statistics()
+    return {
+        "total": limiter.total_tokens,
+        "busy": statistics.borrowed_tokens,
+        "queued": statistics.tasks_waiting,
+    }
+
+def render(
+    pool_stats: Dict[str, Any],
+    threadpool: Optional[Dict[str, Any]] = None,
+    password_hashing: Optional[Dict[str, Any]] = None,
+    registry: MetricsRegistry = registry
+) -> str:
+    """All metrics in the Prometheus text exposition format"""
+    routes = sorted(registry.snapshot().items())
+    lines: List[str] = []
+
+    def family(name: str, kind: str, help_text: str, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for suffix, labels, value in samples:
+            lines.append(f"{name}{suffix}{_labels(**labels)} {_format_value(value)}")
+
+    def latency_samples():
+        for (method, route), metrics in routes:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), metrics.buckets):
+                cumulative += count
+                yield "_bucket", {"method": method, "route": route, "le": bound}, cumulative
+            yield "_sum", {"method": method, "route": route}, metrics.seconds
+            yield "_count", {"method": method, "route": route}, metrics.count
+
+    def route_samples(attribute: str):
+        for (method, route), metrics in routes:
+            yield "", {"method": method, "route": route}, getattr(metrics, attribute)
+
+    family("http_request_duration_seconds", "histogram", "Request latency by route template.", latency_samples())
+    family("http_requests_total", "counter", "Requests by route template and status code.", (
+        ("", {"method": method, "route": route, "status": status_code}, count)
+        for (method, route), metrics in routes
+        for status_code, count in sorted(metrics.statuses.items())
+    ))
+    family("http_response_bytes_total", "counter", "Response body bytes by route template.", route_samples("response_bytes"))
+    family("db_statements_total", "counter", "SQL statements executed by route template.", route_samples("statements"))
+    family("db_statement_seconds_total", "counter", "Time spent executing SQL by route template.", route_samples("sql_seconds"))
+    family("db_rows_total", "counter", "Rows reported by the database driver by route template.", route_samples("rows"))
+
+    for key, value in sorted(pool_stats.items()):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            family(f"db_pool_{key}", "gauge", f"Connection pool {key.replace('_', ' ')}.", [("", {}, value)])
+    for prefix, stats, what in (
+        ("threadpool", threadpool, "Request threadpool"),
+        ("password_hash_pool", password_hashing, "Login password hashing pool"),
+    ):
+        for key, value in sorted((stats or {}).items()):
+            family(f"{prefix}_{key}", "gauge", f"{what} {key.replace('_', ' ')}.", [("", {}, value)])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,125 @@
+"""
+Per-request SQL query budgets and N+1 detection, for development and tests.
+
+Every endpoint has a budget: the number given with @query_budget(n), or else
+its router module's QUERY_BUDGET. With QUERY_BUDGET_MODE set to "warn" or
+"raise", QueryBudgetMiddleware counts the statements each request runs (its
+dependencies and response serialization included), grouped by shape: the SQL
+text with IN lists collapsed, so the same query for different ids is one
+shape. When the response is ready it checks for
+- more statements than the endpoint's budget, or
+- one shape run more than QUERY_REPEAT_LIMIT times, the mark of a lazy load
+  or a query inside a loop over rows (N+1).
+"warn" prints the violation, "raise" answers 500 with it instead of the
+response (so tests fail). Both add an X-Query-Count header. The default,
+"off", skips the counting entirely.
+"""
+import contextvars
+import json
+import re
+import sys
+from collections import Counter
+from typing import Callable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.settings import settings
+
+def query_budget(statements: int) -> Callable:
+    """Declare how many SQL statements a request to the endpoint may run"""
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.query_budget = statements
+        return endpoint
+    return decorator
+
+def get_query_budget(endpoint: Callable) -> Optional[int]:
+    """The endpoint's declared budget, or its module's QUERY_BUDGET"""
+    budget = getattr(endpoint, "query_budget", None)
+    if budget is None:
+        module = sys.modules.get(getattr(endpoint, "__module__", ""))
+        budget = getattr(module, "QUERY_BUDGET", None)
+    return budget
+
+_IN_LIST = re.compile(r"IN \((?:\?|%s|:\w+)(?:, (?:\?|%s|:\w+))*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def statement_shape(statement: str) -> str:
+    return _IN_LIST.sub("IN (...)", _WHITESPACE.sub(" ", statement).strip())
+
+_current_shapes: contextvars.ContextVar[Optional[Counter]] = contextvars.ContextVar("query_budget_shapes", default=None)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    shapes = _current_shapes.get()
+    if shapes is not None:
+        shapes[statement] += 1
+
+def check_request(shapes: Counter, budget: Optional[int], repeat_limit: int) -> List[str]:
+    """Violations of a request's statement counts, empty when within limits"""
+    by_shape = Counter()
+    for statement, count in shapes.items():
+        by_shape[statement_shape(statement)] += count
+    violations = []
+    total = sum(by_shape.values())
+    if budget is not None and total > budget:
+        violations.append(f"{total} SQL statements, over the budget of {budget}")
+    for shape, count in by_shape.most_common():
+        if count <= repeat_limit:
+            break
+        violations.append(f"{count} runs of the same statement (N+1?): {shape[:200]}")
+    return violations
+
+class QueryBudgetMiddleware:
+    """ASGI middleware enforcing query budgets according to QUERY_BUDGET_MODE"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        mode = settings.QUERY_BUDGET_MODE
+        if scope["type"] != "http" or mode not in ("warn", "raise"):
+            await self.app(scope, receive, send)
+            return
+
+        shapes: Counter = Counter()
+        token = _current_shapes.set(shapes)
+        replaced = False
+
+        async def send_checked(message):
+            nonlocal replaced
+            if replaced:
+                return
+            if message["type"] == "http.response.start":
+                # The body is ready by now, so every query it needed has run
+                route = scope.get("route")
+                budget = get_query_budget(getattr(route, "endpoint", None))
+                violations = check_request(shapes, budget, settings.QUERY_REPEAT_LIMIT)
+                count = str(sum(shapes.values())).encode()
+                if violations:
+                    summary = f"{scope['method']} {scope['path']}: " + "; ".join(violations)
+                    if mode == "raise":
+                        replaced = True
+                        await _send_violation(send, summary, count)
+                        return
+                    print(f"Query budget exceeded by {summary}")
+                message = {**message, "headers": list(message.get("headers", [])) + [(b"x-query-count", count)]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_checked)
+        finally:
+            _current_shapes.reset(token)
+
+async def _send_violation(send, summary: str, count: bytes):
+    body = json.dumps({"detail": f"Query budget exceeded by {summary}"}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 500,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"x-query-count", count),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
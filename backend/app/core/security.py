@@ -1,12 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Optional
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
 import os
 import secrets
+import threading
+import time
 
 from jose import jwt
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.settings import settings
+
+# Hashes made with fewer rounds are replaced on the user's next login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS)
 
 ALGORITHM = "HS256"
 
@@ -33,18 +40,92 @@ def create_access_token(subject: Any, expires_delta: Optional[timedelta] = None)
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode = {"exp": expire, "sub": str(subject)}
-    print(f"Creating token for subject: {subject} with expiry: {expire}")  # Debug log
+    # iat keys the authenticated user cache and token revocation; milliseconds
+    # tell apart tokens issued in the same second as a revocation
+    to_encode = {"exp": expire, "iat": round(time.time(), 3), "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    print(f"Token created successfully")  # Debug log
     return encoded_jwt
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
-    result = pwd_context.verify(plain_password, hashed_password)
-    print(f"Password verification result: {result}")  # Debug log
-    return result
+    return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+class PasswordHashPoolFull(RuntimeError):
+    """More password checks are waiting than PASSWORD_HASH_MAX_QUEUE allows"""
+
+class PasswordHashPool:
+    """
+    Runs password hashing on max_workers threads of its own. Login requests
+    await it instead of holding a thread of the shared request threadpool, so
+    a burst of logins queues here and the rest of the API keeps its threads.
+    At most max_queued calls wait; beyond that run() raises PasswordHashPoolFull.
+    """
+
+    def __init__(self, max_workers: int, max_queued: int):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_queue_depth = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        with self._lock:
+            if self.queued >= self.max_queued:
+                self.rejected += 1
+                raise PasswordHashPoolFull("Too many logins in progress")
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        submitted = time.perf_counter()
+
+        def task():
+            waited = time.perf_counter() - submitted
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+
+        return await asyncio.wrap_future(self._executor.submit(task))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            started = self.completed + self.running
+            return {
+                "max_workers": self.max_workers,
+                "max_queued": self.max_queued,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "max_queue_depth": self.max_queue_depth,
+                "avg_wait_ms": round(self.wait_total / started * 1000, 3) if started else 0.0,
+                "max_wait_ms": round(self.wait_max * 1000, 3),
+            }
+
+password_hashing = PasswordHashPool(settings.PASSWORD_HASH_MAX_CONCURRENCY, settings.PASSWORD_HASH_MAX_QUEUE)
+
+def get_password_hash_stats() -> Dict[str, Any]:
+    return password_hashing.get_stats()
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the password hashing pool. Returns (valid, new hash),
+    where new hash is set when the stored hash uses outdated settings.
+    """
+    return await password_hashing.run(pwd_context.verify_and_update, plain_password, hashed_password)
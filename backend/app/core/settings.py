@@ -9,6 +9,56 @@ class Settings(BaseSettings):
     DB_NAME: str = "golf_db"
     SECRET_KEY: str = "your_secret_key"
 
+    # Connection pool sizing. pool_size + max_overflow matches the 40 worker
+    # threads FastAPI/anyio uses for sync endpoints, so a saturated threadpool
+    # never queues on the pool as well.
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # League stats response cache (see app.core.stats_cache)
+    STATS_CACHE_ENABLED: bool = True
+    STATS_CACHE_MAX_ENTRIES: int = 1024
+
+    # Recompute affected players' handicaps whenever a match's gross scores are saved
+    HANDICAP_AUTO_UPDATE: bool = True
+
+    # Live score streams (see app.core.live). Leave LIVE_BROKER_URL empty for
+    # a single worker; with several, point it at a Redis server.
+    LIVE_BROKER_URL: str = ""
+    LIVE_SUBSCRIBER_QUEUE_SIZE: int = 100
+    LIVE_KEEPALIVE_SECONDS: float = 15.0
+    LIVE_RETRY_MILLISECONDS: int = 3000
+    LIVE_REPLAY_SIZE: int = 50
+    
+    # Match access token cache (see app.core.token_cache). Expired tokens are
+    # deleted every ACCESS_TOKEN_REAP_INTERVAL_SECONDS; 0 turns the reaper off.
+    ACCESS_TOKEN_CACHE_TTL_SECONDS: float = 300.0
+    ACCESS_TOKEN_CACHE_MAX_ENTRIES: int = 4096
+    ACCESS_TOKEN_REAP_INTERVAL_SECONDS: float = 3600.0
+    
+    # Authenticated user cache (see app.core.user_cache)
+    AUTH_USER_CACHE_TTL_SECONDS: float = 30.0
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 1024
+    AUTH_TOKEN_REVOCATION: bool = False
+    
+    # Password hashing. Logins verify on their own pool of
+    # PASSWORD_HASH_MAX_CONCURRENCY threads; raising the rounds rehashes
+    # each password at its next login.
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 200
+    
+    # Per-route request and SQL metrics at /metrics (see app.core.metrics)
+    METRICS_ENABLED: bool = True
+    
+    # Query budgets and N+1 detection (see app.core.query_budget): "off",
+    # "warn" or "raise". Meant for development and tests.
+    QUERY_BUDGET_MODE: str = "off"
+    QUERY_REPEAT_LIMIT: int = 10
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -17,7 +67,7 @@ class Settings(BaseSettings):
 
     @property
     def database_url(self) -> str:
-        return f"mysql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}/{self.DB_NAME}"
+        return f"mysql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
 @lru_cache
 def get_settings():
@@ -0,0 +1,252 @@
+"""
+Response cache for the league stats endpoints.
+
+Every committed write that touches league data bumps that league's
+data_version column in the same transaction (see the session listeners at the
+bottom). Cached responses are keyed by route, parameters and the league's
+current version, so a bump makes the old entries unreachable and they age out
+of the LRU. The same version feeds the ETag, so a client revalidating with
+If-None-Match gets a 304 after one version lookup, before the endpoint runs
+any stats queries.
+
+The version lives in the database, so every worker, and scripts such as
+rebuild_stats.py, see the same one. Only the cached bodies are per process.
+"""
+import functools
+import hashlib
+import inspect
+import threading
+from collections import OrderedDict
+from datetime import date
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import event, inspect as sa_inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.models.course import Course
+from app.models.hole import Hole
+from app.models.league import League
+from app.models.match import Match
+from app.models.match_player import MatchPlayer
+from app.models.player import Player
+from app.models.player_league_stats import PlayerLeagueStats
+from app.models.score import PlayerScore
+from app.models.team import Team
+from app.models.team_league_standings import TeamLeagueStandings
+from app.models.week import Week
+
+def get_league_version(db: Session, league_id: int) -> Optional[int]:
+    """The league's current data version (None for an unknown league)"""
+    return db.execute(select(League.data_version).where(League.id == league_id)).scalar()
+
+def bump_league_versions(db: Session, league_ids: Optional[Iterable[int]] = None):
+    """
+    Bump the given leagues' data versions, or every league's when league_ids is
+    None (team, player or course names show up in any league), in the caller's
+    transaction.
+    """
+    leagues = League.__table__
+    statement = update(leagues).values(data_version=leagues.c.data_version + 1)
+    if league_ids is not None:
+        statement = statement.where(leagues.c.id.in_(set(league_ids)))
+    db.connection().execute(statement)
+
+class ResponseCache:
+    """Bounded LRU of encoded JSON response bodies with hit/miss/eviction counters"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Any, bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    def get(self, key) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body: bytes):
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            served = self.hits + self.not_modified
+            lookups = served + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "not_modified": self.not_modified,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+            }
+
+response_cache = ResponseCache(settings.STATS_CACHE_MAX_ENTRIES)
+
+def get_cache_stats() -> Dict[str, Any]:
+    return response_cache.get_stats()
+
+def _etag(key) -> str:
+    return '"' + hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:24] + '"'
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def cache_league_response(endpoint: Optional[Callable] = None, *, daily: bool = False) -> Callable:
+    """
+    Cache a GET endpoint that takes league_id and db parameters.
+    The wrapped endpoint gains a Request parameter (hidden from its body);
+    responses carry an ETag and are served from the cache until the league's
+    data version changes, or also until the day changes with
+    @cache_league_response(daily=True) for responses that depend on today's date.
+    """
+    if endpoint is None:
+        return functools.partial(cache_league_response, daily=daily)
+
+    signature = inspect.signature(endpoint)
+    parameters = list(signature.parameters.values())
+    parameters.append(inspect.Parameter("_cache_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        request: Request = kwargs.pop("_cache_request")
+        if not settings.STATS_CACHE_ENABLED:
+            return endpoint(*args, **kwargs)
+
+        league_id = kwargs["league_id"]
+        key = (
+            endpoint.__module__,
+            endpoint.__name__,
+            league_id,
+            tuple(sorted(request.query_params.multi_items())),
+            get_league_version(kwargs["db"], league_id),
+        )
+        if daily:
+            key += (date.today(),)
+        etag = _etag(key)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+        if _etag_matches(request, etag):
+            response_cache.record_not_modified()
+            return Response(status_code=304, headers=headers)
+
+        body = response_cache.get(key)
+        if body is None:
+            body = JSONResponse(content=jsonable_encoder(endpoint(*args, **kwargs))).body
+            response_cache.put(key, body)
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    wrapper.__signature__ = signature.replace(parameters=parameters)
+    return wrapper
+
+# --- Write tracking ---------------------------------------------------------
+
+_CHANGES_KEY = "stats_cache_changes"
+
+# Objects that carry their league id directly
+_LEAGUE_ID_MODELS = (Week, PlayerLeagueStats, TeamLeagueStandings)
+# Objects whose names appear in every league's stats
+_GLOBAL_MODELS = (Team, Player, Course, Hole)
+
+def mark_league_changed(session: Session, league_id: Optional[int] = None):
+    """
+    Record a change the flush listener cannot see (bulk UPDATE/DELETE).
+    The league (or every league when league_id is None) is bumped on commit.
+    """
+    changes = session.info.setdefault(_CHANGES_KEY, {"leagues": set(), "all": False})
+    if league_id is None:
+        changes["all"] = True
+    else:
+        changes["leagues"].add(league_id)
+
+def _loaded(obj, attribute: str):
+    """Read an attribute without triggering a lazy load during flush"""
+    return sa_inspect(obj).dict.get(attribute)
+
+@event.listens_for(Session, "after_flush")
+def _collect_league_changes(session: Session, flush_context):
+    changes = session.info.setdefault(_CHANGES_KEY, {"leagues": set(), "all": False})
+    week_ids, match_ids = set(), set()
+
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, League):
+            league_id = _loaded(obj, "id")
+        elif isinstance(obj, _LEAGUE_ID_MODELS):
+            league_id = _loaded(obj, "league_id")
+        elif isinstance(obj, Match):
+            week_ids.add(_loaded(obj, "week_id"))
+            continue
+        elif isinstance(obj, (MatchPlayer, PlayerScore)):
+            match_ids.add(_loaded(obj, "match_id"))
+            continue
+        elif isinstance(obj, _GLOBAL_MODELS):
+            changes["all"] = True
+            continue
+        else:
+            continue
+
+        if league_id is None:
+            changes["all"] = True
+        else:
+            changes["leagues"].add(league_id)
+
+    if None in week_ids or None in match_ids:
+        changes["all"] = True
+    week_ids.discard(None)
+    match_ids.discard(None)
+
+    connection = session.connection()
+    if week_ids:
+        changes["leagues"].update(connection.execute(
+            select(Week.league_id).where(Week.id.in_(week_ids))
+        ).scalars())
+    if match_ids:
+        changes["leagues"].update(connection.execute(
+            select(Week.league_id).join(Match, Match.week_id == Week.id).where(Match.id.in_(match_ids))
+        ).scalars())
+
+# Changes recorded by a flush that is later rolled back stay pending and are
+# bumped by the session's next commit, if any: an extra bump only costs a miss.
+@event.listens_for(Session, "before_commit")
+def _bump_league_versions(session: Session):
+    # Collect the changes of the commit's own flush before bumping
+    session.flush()
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if not changes:
+        return
+    if changes["all"]:
+        bump_league_versions(session)
+    elif changes["leagues"]:
+        bump_league_versions(session, changes["leagues"])
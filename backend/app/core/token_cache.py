@@ -0,0 +1,71 @@
+"""
+In-process cache of match access tokens.
+
+The team score entry screen checks its token when it loads and on every save.
+Tokens are cached by value, with their match, team, team name and expiry, for
+ACCESS_TOKEN_CACHE_TTL_SECONDS and at most ACCESS_TOKEN_CACHE_MAX_ENTRIES at
+a time (least recently used first out). The expiry is checked on every use, so
+a cached token still stops working at its expires_at.
+
+Regenerating or deleting a match's tokens drops them from this process's cache
+once committed. Another worker keeps accepting a rotated token until its entry
+reaches the TTL.
+
+TokenReaper deletes expired tokens from the database in the background.
+"""
+import threading
+from datetime import date, datetime
+from typing import Callable, NamedTuple, Optional
+
+from app.core.settings import settings
+from app.core.ttl_cache import TTLCache
+
+class CachedAccessToken(NamedTuple):
+    match_id: int
+    team_id: int
+    expires_at: Optional[datetime]
+    team_name: Optional[str]
+    match_date: Optional[date]
+
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
+        return self.expires_at is not None and self.expires_at.replace(tzinfo=None) < (now or datetime.now())
+
+class AccessTokenCache(TTLCache[CachedAccessToken]):
+    """TTL- and size-bounded LRU of CachedAccessToken by token value"""
+
+    def invalidate_match(self, match_id: int):
+        """Forget every cached token of a match"""
+        self.discard(lambda token, value: value.match_id == match_id)
+
+access_tokens = AccessTokenCache(settings.ACCESS_TOKEN_CACHE_MAX_ENTRIES, settings.ACCESS_TOKEN_CACHE_TTL_SECONDS)
+
+class TokenReaper:
+    """Runs reap() on a daemon thread every interval seconds until stopped"""
+
+    def __init__(self, reap: Callable[[], int], interval: float):
+        self.reap = reap
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="token-reaper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                deleted = self.reap()
+                if deleted:
+                    print(f"Deleted {deleted} expired match access tokens")
+            except Exception as e:
+                print(f"Error deleting expired match access tokens: {str(e)}")
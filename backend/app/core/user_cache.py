@@ -0,0 +1,62 @@
+"""
+Cache of authenticated users for app.api.deps.get_current_user.
+
+Entries are snapshots of the users row, keyed by user id and the token's issue
+time (iat), kept for AUTH_USER_CACHE_TTL_SECONDS. Requests repeating a token
+skip the users query. Each request gets its own User built from the snapshot,
+detached from any session. crud.user.update drops the user's entries once
+committed. Other workers see the change when their entries expire.
+
+With AUTH_TOKEN_REVOCATION on, deactivating a user or changing their password
+also revokes every token issued to them before that moment. Revocations are
+kept in this process only, until it restarts.
+"""
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import inspect
+
+from app.core.settings import settings
+from app.core.ttl_cache import TTLCache
+from app.models.user import User
+
+class UserPrincipalCache(TTLCache[Dict[str, Any]]):
+    """Users by (user id, token iat), plus per-user token revocation cut-offs"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        super().__init__(max_entries, ttl_seconds)
+        self._revoked_lock = threading.Lock()
+        # Tokens issued before the cut-off (epoch seconds) are refused
+        self._revoked: Dict[int, float] = {}
+
+    def get_user(self, user_id: int, issued_at: Optional[float]) -> Optional[User]:
+        values = self.get((user_id, issued_at))
+        return User(**values) if values is not None else None
+
+    def put_user(self, user: User, issued_at: Optional[float]):
+        values = {column.key: getattr(user, column.key) for column in inspect(User).column_attrs}
+        self.put((user.id, issued_at), values)
+
+    def invalidate_user(self, user_id: int):
+        self.discard(lambda key, values: key[0] == user_id)
+
+    def revoke(self, user_id: int, issued_before: Optional[float] = None):
+        """Refuse the user's tokens issued before issued_before (default now)"""
+        with self._revoked_lock:
+            # Rounded like iat, so the login right after a revocation is never refused
+            self._revoked[user_id] = round(time.time(), 3) if issued_before is None else issued_before
+        self.invalidate_user(user_id)
+
+    def is_revoked(self, user_id: int, issued_at: Optional[float]) -> bool:
+        with self._revoked_lock:
+            cutoff = self._revoked.get(user_id)
+        # Tokens without an issue time predate any revocation
+        return cutoff is not None and (issued_at is None or issued_at < cutoff)
+
+    def clear(self):
+        super().clear()
+        with self._revoked_lock:
+            self._revoked.clear()
+
+user_principals = UserPrincipalCache(settings.AUTH_USER_CACHE_MAX_ENTRIES, settings.AUTH_USER_CACHE_TTL_SECONDS)
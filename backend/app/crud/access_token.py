@@ -0,0 +1,46 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.token_cache import CachedAccessToken, access_tokens
+from app.db.session import SessionLocal
+from app.models.match import Match, MatchAccessToken
+from app.models.team import Team
+
+def get_access_token(db: Session, token: str) -> Optional[CachedAccessToken]:
+    """
+    A token with its match, team and expiry, from the token cache or else one
+    joined query; None for an unknown token. The caller checks the expiry.
+    """
+    cached = access_tokens.get(token)
+    if cached is not None:
+        return cached
+    row = db.execute(
+        select(
+            MatchAccessToken.match_id, MatchAccessToken.team_id, MatchAccessToken.expires_at,
+            Team.name, Match.match_date
+        ).join(Match, Match.id == MatchAccessToken.match_id).outerjoin(
+            Team, Team.id == MatchAccessToken.team_id
+        ).where(MatchAccessToken.token == token)
+    ).first()
+    if row is None:
+        return None
+    cached = CachedAccessToken(*row)
+    access_tokens.put(token, cached)
+    return cached
+
+def delete_expired_tokens(db: Session, now: Optional[datetime] = None) -> int:
+    """Delete every expired token with one statement, without committing"""
+    result = db.execute(
+        delete(MatchAccessToken).where(MatchAccessToken.expires_at < (now or datetime.now()))
+    )
+    return result.rowcount
+
+def reap_expired_tokens() -> int:
+    """Delete expired tokens in a session of its own (see TokenReaper)"""
+    with SessionLocal() as db:
+        deleted = delete_expired_tokens(db)
+        db.commit()
+        return deleted
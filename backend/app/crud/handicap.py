@@ -0,0 +1,325 @@
+import statistics
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, event, func, insert, inspect as sa_inspect, select, union, update
+from sqlalchemy.orm import Session
+
+from app.core import stats_cache
+from app.models.association_tables import league_teams
+from app.models.course import Course
+from app.models.league import League
+from app.models.match import Match
+from app.models.match_player import MatchPlayer
+from app.models.player import Player, player_team_association
+from app.models.player_handicap_history import PlayerHandicapHistory
+from app.models.week import Week
+
+def round_half_up(value: float, decimals: int = 0) -> float:
+    """Round a value with .5 always rounding up"""
+    multiplier = 10 ** decimals
+    return float(Decimal(str(value * multiplier)).quantize(Decimal('1'), rounding=ROUND_HALF_UP)) / multiplier
+
+def get_league_handicap_settings(league: League) -> Dict[str, Any]:
+    """League handicap settings with the defaults used when a setting is unset"""
+    return {
+        "min_scores_required": league.handicap_required_scores if league.handicap_required_scores is not None else 3,
+        "scores_to_use": league.handicap_recent_scores_used if league.handicap_recent_scores_used is not None else 10,
+        "handicap_percentage": league.handicap_perecentage_to_par / 100 if league.handicap_perecentage_to_par is not None else 0.85,
+    }
+
+def calculate_handicap(differentials: List[float], handicap_percentage: float, exclude_highest: Optional[int] = None) -> Optional[float]:
+    """
+    Handicap from a player's recent score differentials (gross minus par):
+    drop the exclude_highest worst, average the rest and apply the percentage.
+    Returns None when nothing is left to average.
+    """
+    if exclude_highest is not None and exclude_highest > 0:
+        differentials = sorted(differentials)[:-exclude_highest]
+    if not differentials:
+        return None
+    return round(statistics.mean(differentials) * handicap_percentage, 1)
+
+def get_recent_differentials(
+    db: Session,
+    league_id: int,
+    scores_to_use: int,
+    player_ids: Optional[Iterable[int]] = None
+) -> Dict[int, Tuple[int, List[float]]]:
+    """
+    Every player's score count and most recent scores_to_use differentials in a league
+    (or only the given players'). Only completed matches count, so a round still
+    being entered is never taken for a full one. One query ranks each player's
+    scored rounds newest-first with window functions.
+    Returns {player_id: (score_count, differentials newest first)}.
+    """
+    recency = func.row_number().over(
+        partition_by=MatchPlayer.player_id,
+        order_by=(Match.match_date.desc(), Match.id.desc())
+    )
+    score_count = func.count().over(partition_by=MatchPlayer.player_id)
+
+    ranked = select(
+        MatchPlayer.player_id,
+        MatchPlayer.gross_score,
+        Course.total_par,
+        recency.label("recency"),
+        score_count.label("score_count")
+    ).join(
+        Match, MatchPlayer.match_id == Match.id
+    ).join(
+        Week, Match.week_id == Week.id
+    ).join(
+        Course, Match.course_id == Course.id
+    ).where(
+        Week.league_id == league_id,
+        Match.is_completed == True,
+        MatchPlayer.gross_score.isnot(None)
+    )
+    if player_ids is not None:
+        ranked = ranked.where(MatchPlayer.player_id.in_(list(player_ids)))
+    ranked = ranked.subquery()
+
+    rows = db.execute(
+        select(ranked).where(ranked.c.recency <= scores_to_use).order_by(ranked.c.player_id, ranked.c.recency)
+    ).all()
+
+    result: Dict[int, Tuple[int, List[float]]] = {}
+    for row in rows:
+        count, differentials = result.setdefault(row.player_id, (row.score_count, []))
+        # Rounds on a course without a par cannot produce a differential
+        if row.gross_score and row.total_par:
+            differentials.append(row.gross_score - row.total_par)
+    return result
+
+def compute_league_handicaps(
+    db: Session,
+    league_id: int,
+    min_scores_required: int,
+    scores_to_use: int,
+    handicap_percentage: float,
+    exclude_highest: Optional[int] = None,
+    player_ids: Optional[Iterable[int]] = None
+) -> Tuple[Dict[int, float], int]:
+    """Return ({player_id: new handicap}, skipped player count) without writing anything"""
+    handicaps: Dict[int, float] = {}
+    skipped = 0
+    recent = get_recent_differentials(db, league_id, scores_to_use, player_ids)
+    for player_id, (score_count, differentials) in recent.items():
+        handicap = None
+        if score_count >= min_scores_required:
+            handicap = calculate_handicap(differentials, handicap_percentage, exclude_highest)
+        if handicap is None:
+            skipped += 1
+        else:
+            handicaps[player_id] = handicap
+    return handicaps, skipped
+
+def apply_league_handicaps(
+    db: Session,
+    league_id: int,
+    handicaps: Dict[int, float],
+    source: str = "recalculation"
+) -> int:
+    """
+    Write new handicaps to Player and to the players' unplayed MatchPlayer rows in
+    the league (rounded half up to whole strokes), as two executemany UPDATEs.
+    Handicaps that changed are recorded in the handicap history.
+    Returns the number of MatchPlayer rows updated.
+    """
+    if not handicaps:
+        return 0
+
+    previous = dict(db.execute(
+        select(Player.id, Player.handicap).where(Player.id.in_(list(handicaps)))
+    ).all())
+    record_handicap_changes(
+        db,
+        {player_id: handicap for player_id, handicap in handicaps.items() if previous.get(player_id) != handicap},
+        source,
+        league_id=league_id
+    )
+
+    db.execute(
+        update(Player),
+        [{"id": player_id, "handicap": handicap} for player_id, handicap in handicaps.items()]
+    )
+
+    league_matches = select(Match.id).join(Week, Match.week_id == Week.id).where(Week.league_id == league_id)
+    match_players = MatchPlayer.__table__
+    result = db.connection().execute(
+        update(match_players).where(
+            match_players.c.player_id == bindparam("b_player_id"),
+            match_players.c.gross_score.is_(None),
+            match_players.c.match_id.in_(league_matches)
+        ).values(handicap=bindparam("b_handicap")),
+        [
+            {"b_player_id": player_id, "b_handicap": round_half_up(handicap, 0)}
+            for player_id, handicap in handicaps.items()
+        ]
+    )
+
+    # Bulk UPDATEs bypass the flush listener
+    stats_cache.mark_league_changed(db, league_id)
+    return result.rowcount
+
+def update_player_handicaps(db: Session, league_id: int, player_ids: Iterable[int]) -> Dict[int, float]:
+    """
+    Incremental update after scores change: recompute only the given players'
+    handicaps from their recent-score windows in the league, using the league's
+    settings, and refresh their unplayed MatchPlayer handicaps. Players who do not
+    qualify keep their handicap, exactly as in a full recalculation.
+    Runs inside the caller's transaction; returns {player_id: new handicap}.
+    """
+    player_ids = set(player_ids)
+    if not player_ids:
+        return {}
+
+    league = db.query(League).filter(League.id == league_id).first()
+    if not league:
+        return {}
+
+    # The caller's session does not autoflush, and the window query must see the new scores
+    db.flush()
+    handicaps, _ = compute_league_handicaps(
+        db, league_id, player_ids=player_ids, **get_league_handicap_settings(league)
+    )
+    apply_league_handicaps(db, league_id, handicaps, source="scores")
+    return handicaps
+
+def recalculate_league_handicaps(
+    session_factory: Callable[[], Session],
+    league_id: int,
+    min_scores_required: int,
+    scores_to_use: int,
+    handicap_percentage: float,
+    exclude_highest: Optional[int] = None
+) -> Optional[Dict[str, int]]:
+    """
+    Recompute and store every player's handicap in a league.
+    Runs in its own session so it can be scheduled as a background task
+    after the request's session has been closed. Returns None if the update failed.
+    """
+    db = session_factory()
+    try:
+        handicaps, skipped = compute_league_handicaps(
+            db, league_id, min_scores_required, scores_to_use, handicap_percentage, exclude_highest
+        )
+        match_players_updated = apply_league_handicaps(db, league_id, handicaps)
+        db.commit()
+
+        print(f"Handicap update complete: {len(handicaps)} players updated, {skipped} players skipped")
+        return {"updated": len(handicaps), "skipped": skipped, "match_players_updated": match_players_updated}
+
+    except Exception as e:
+        db.rollback()
+        print(f"Error updating handicaps: {str(e)}")
+        return None
+
+    finally:
+        db.close()
+
+# --- Handicap history ---------------------------------------------------------
+
+def record_handicap_changes(
+    db: Session,
+    handicaps: Dict[int, Optional[float]],
+    source: str,
+    league_id: Optional[int] = None,
+    effective_date: Optional[date] = None
+):
+    """Append one history row per player, effective today unless a date is given"""
+    if not handicaps:
+        return
+    effective_date = effective_date or date.today()
+    db.connection().execute(insert(PlayerHandicapHistory), [
+        {
+            "player_id": player_id,
+            "league_id": league_id,
+            "handicap": handicap,
+            "effective_date": effective_date,
+            "source": source,
+            "created_at": datetime.now(),
+        }
+        for player_id, handicap in handicaps.items()
+    ])
+
+@event.listens_for(Session, "after_flush")
+def _record_manual_handicap_changes(session: Session, flush_context):
+    """History rows for handicaps set through the ORM (player and team edits)"""
+    changes = {}
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Player):
+            continue
+        history = sa_inspect(obj).attrs.handicap.history
+        if not history.added:
+            continue
+        if obj in session.new and obj.handicap is None:
+            continue
+        if history.deleted and history.deleted[0] == obj.handicap:
+            continue
+        changes[obj.id] = obj.handicap
+    if changes:
+        record_handicap_changes(session, changes, "manual")
+
+def get_league_handicaps_as_of(
+    db: Session, league_id: int, as_of: date, inclusive: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Every player on a league roster or scorecard with their handicap as of a date:
+    the latest history row effective on or before it, or strictly before it when
+    not inclusive (None when there is none).
+    One query over the (player_id, effective_date) index.
+    """
+    league_players = union(
+        select(player_team_association.c.player_id).join(
+            league_teams, league_teams.c.team_id == player_team_association.c.team_id
+        ).where(league_teams.c.league_id == league_id),
+        select(MatchPlayer.player_id).join(
+            Match, MatchPlayer.match_id == Match.id
+        ).join(
+            Week, Match.week_id == Week.id
+        ).where(Week.league_id == league_id)
+    )
+
+    recency = func.row_number().over(
+        partition_by=PlayerHandicapHistory.player_id,
+        order_by=(PlayerHandicapHistory.effective_date.desc(), PlayerHandicapHistory.id.desc())
+    )
+    ranked = select(
+        PlayerHandicapHistory.player_id,
+        PlayerHandicapHistory.handicap,
+        PlayerHandicapHistory.effective_date,
+        PlayerHandicapHistory.source,
+        recency.label("recency")
+    ).where(
+        PlayerHandicapHistory.effective_date <= as_of if inclusive else PlayerHandicapHistory.effective_date < as_of,
+        PlayerHandicapHistory.player_id.in_(league_players)
+    ).subquery()
+
+    rows = db.execute(
+        select(
+            Player.id,
+            Player.first_name,
+            Player.last_name,
+            ranked.c.handicap,
+            ranked.c.effective_date,
+            ranked.c.source
+        ).outerjoin(
+            ranked, and_(ranked.c.player_id == Player.id, ranked.c.recency == 1)
+        ).where(
+            Player.id.in_(league_players)
+        ).order_by(Player.last_name, Player.first_name, Player.id)
+    ).all()
+
+    return [
+        {
+            "player_id": row.id,
+            "player_name": f"{row.first_name} {row.last_name}",
+            "handicap": row.handicap,
+            "effective_date": row.effective_date,
+            "source": row.source,
+        }
+        for row in rows
+    ]
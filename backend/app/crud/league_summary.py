@@ -0,0 +1,313 @@
+from collections import defaultdict
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session, selectinload
+
+from app import analytics
+from app.crud import team_league_standings as team_league_standings_crud
+from app.models.course import Course
+from app.models.league import League
+from app.models.match import Match
+from app.models.match_player import MatchPlayer
+from app.models.player import Player
+from app.models.player_league_stats import PlayerLeagueStats
+from app.models.team import Team
+from app.models.week import Week
+
+class SeasonData:
+    """Everything the league summary needs, loaded once per request"""
+
+    def __init__(self, league: League, weeks: List[Week], matches: List[Match], rounds: List[Any],
+                 teams: Dict[int, str], courses: Dict[int, str],
+                 player_stats: List[Any], leaderboard: List[Dict[str, Any]]):
+        self.league = league
+        self.weeks = weeks
+        self.matches = matches
+        self.rounds = rounds
+        self.teams = teams
+        self.courses = courses
+        self.player_stats = player_stats
+        self.leaderboard = leaderboard
+        self.weeks_by_id = {week.id: week for week in weeks}
+        self.matches_by_id = {match.id: match for match in matches}
+
+def load_season(db: Session, league_id: int) -> Optional[SeasonData]:
+    """
+    Load a league's season in a handful of queries that all run in the
+    session's current transaction. Under InnoDB's default REPEATABLE READ
+    isolation they share one snapshot, so every section of the summary sees
+    the same data. Returns None if the league does not exist.
+    """
+    league = db.query(League).options(
+        selectinload(League.teams),
+        selectinload(League.courses)
+    ).filter(League.id == league_id).first()
+    if league is None:
+        return None
+
+    weeks = db.query(Week).filter(Week.league_id == league_id).order_by(Week.week_number).all()
+
+    matches = db.query(Match).join(
+        Week, Match.week_id == Week.id
+    ).filter(
+        Week.league_id == league_id
+    ).order_by(Match.match_date, Match.id).all()
+
+    rounds = db.query(
+        MatchPlayer.match_id,
+        MatchPlayer.player_id,
+        MatchPlayer.team_id,
+        MatchPlayer.gross_score,
+        MatchPlayer.net_score,
+        Player.first_name,
+        Player.last_name
+    ).join(
+        Player, MatchPlayer.player_id == Player.id
+    ).join(
+        Match, MatchPlayer.match_id == Match.id
+    ).join(
+        Week, Match.week_id == Week.id
+    ).filter(
+        Week.league_id == league_id
+    ).all()
+
+    # Matches and rounds may reference teams/courses that have since left the league
+    team_ids = {team.id for team in league.teams}
+    team_ids.update(team_id for match in matches for team_id in (match.home_team_id, match.away_team_id))
+    team_ids.update(row.team_id for row in rounds)
+    teams = dict(db.query(Team.id, Team.name).filter(Team.id.in_(team_ids)).all()) if team_ids else {}
+
+    course_ids = {course.id for course in league.courses}
+    course_ids.update(match.course_id for match in matches)
+    courses = dict(db.query(Course.id, Course.name).filter(Course.id.in_(course_ids)).all()) if course_ids else {}
+
+    player_stats = db.query(
+        PlayerLeagueStats,
+        Player.first_name,
+        Player.last_name
+    ).join(
+        Player, PlayerLeagueStats.player_id == Player.id
+    ).filter(
+        PlayerLeagueStats.league_id == league_id
+    ).all()
+
+    leaderboard = team_league_standings_crud.get_league_leaderboard(db, league_id)
+
+    return SeasonData(league, weeks, matches, rounds, teams, courses, player_stats, leaderboard)
+
+def _player_name(row) -> str:
+    return f"{row.first_name} {row.last_name}"
+
+def _match_summary(season: SeasonData, match: Match) -> Dict[str, Any]:
+    """Same shape as GET /matches/weeks/{week_id}/matches"""
+    def team(team_id):
+        return {"id": team_id, "name": season.teams[team_id]} if team_id in season.teams else None
+
+    return {
+        "id": match.id,
+        "match_date": match.match_date,
+        "is_completed": match.is_completed,
+        "week_id": match.week_id,
+        "course_id": match.course_id,
+        "home_team_id": match.home_team_id,
+        "away_team_id": match.away_team_id,
+        "home_team": team(match.home_team_id),
+        "away_team": team(match.away_team_id),
+        "course": {"id": match.course_id, "name": season.courses[match.course_id]} if match.course_id in season.courses else None,
+        "home_team_gross_score": match.home_team_gross_score,
+        "home_team_net_score": match.home_team_net_score,
+        "home_team_points": match.home_team_points,
+        "away_team_gross_score": match.away_team_gross_score,
+        "away_team_net_score": match.away_team_net_score,
+        "away_team_points": match.away_team_points
+    }
+
+def _week_summary(week: Optional[Week]) -> Optional[Dict[str, Any]]:
+    if week is None:
+        return None
+    return {
+        "id": week.id,
+        "week_number": week.week_number,
+        "start_date": week.start_date,
+        "end_date": week.end_date,
+        "league_id": week.league_id
+    }
+
+def _latest_team_names(season: SeasonData) -> Dict[int, str]:
+    latest = {}
+    for row in season.rounds:
+        match = season.matches_by_id[row.match_id]
+        key = (match.match_date, match.id)
+        if row.player_id not in latest or key > latest[row.player_id][0]:
+            latest[row.player_id] = (key, row.team_id)
+    return {
+        player_id: season.teams.get(team_id, "Unknown Team")
+        for player_id, (_, team_id) in latest.items()
+    }
+
+def _player_stats(season: SeasonData, player_teams: Dict[int, str]) -> List[Dict[str, Any]]:
+    """Same rows as GET /player-stats/league/{league_id}/player-stats"""
+    rows = [row for row in season.player_stats if row.PlayerLeagueStats.rounds_played > 0]
+    rows.sort(key=lambda row: row.PlayerLeagueStats.avg_gross)
+
+    results = []
+    for stat, first_name, last_name in rows:
+        handicap_diff = None
+        if stat.avg_gross and stat.avg_net:
+            handicap_diff = stat.avg_gross - stat.avg_net
+
+        results.append({
+            "player_id": stat.player_id,
+            "player_name": f"{first_name} {last_name}",
+            "team_name": player_teams.get(stat.player_id, "Unknown Team"),
+            "rounds_played": stat.rounds_played,
+            "avg_gross_score": float(stat.avg_gross) if stat.avg_gross else None,
+            "avg_net_score": float(stat.avg_net) if stat.avg_net else None,
+            "lowest_gross_score": stat.lowest_gross,
+            "lowest_net_score": stat.lowest_net,
+            "handicap_differential": round(handicap_diff, 1) if handicap_diff else None
+        })
+    return results
+
+def _top_player_scores(season: SeasonData, score_field: str, limit: int) -> List[Dict[str, Any]]:
+    """Same rows as GET /player-stats/league/{league_id}/top-scores"""
+    scored = [row for row in season.rounds if getattr(row, score_field) is not None]
+    scored.sort(key=lambda row: (getattr(row, score_field), season.matches_by_id[row.match_id].match_date))
+
+    results = []
+    for row in scored[:limit]:
+        match = season.matches_by_id[row.match_id]
+        results.append({
+            "player_id": row.player_id,
+            "player_name": _player_name(row),
+            "score": getattr(row, score_field),
+            "date": match.match_date,
+            "course_name": season.courses.get(match.course_id)
+        })
+    return results
+
+def _top_team_scores(season: SeasonData, score_type: str, limit: int) -> List[Dict[str, Any]]:
+    """Same rows as GET /team-stats/league/{league_id}/top-scores"""
+    scored = []
+    for match in season.matches:
+        for side in ("home", "away"):
+            score = getattr(match, f"{side}_team_{score_type}_score")
+            if score is None:
+                continue
+            team_id = getattr(match, f"{side}_team_id")
+            scored.append({
+                "team_id": team_id,
+                "team_name": season.teams.get(team_id),
+                "score": score,
+                "date": match.match_date,
+                "course_name": season.courses.get(match.course_id),
+                "team_type": side
+            })
+    scored.sort(key=lambda row: (row["score"], row["date"]))
+    return scored[:limit]
+
+def _most_improved(season: SeasonData, limit: int) -> List[Dict[str, Any]]:
+    """Same rows as GET /player-stats/league/{league_id}/most-improved"""
+    names = {row.player_id: _player_name(row) for row in season.rounds}
+    frame = analytics.SeasonFrame.from_rows(
+        (row.player_id, row.team_id, row.match_id, season.matches_by_id[row.match_id].match_date,
+         row.gross_score, row.net_score, None)
+        for row in season.rounds
+    )
+    improvements = analytics.to_records(analytics.most_improved(frame, min_rounds=4, initial_rounds=3))
+    improvements.sort(key=lambda x: round(x["improvement"], 1), reverse=True)
+
+    results = []
+    for row in improvements[:limit]:
+        improvement = row["improvement"]
+        results.append({
+            "player_id": row["player_id"],
+            "player_name": names[row["player_id"]],
+            "total_rounds": row["total_rounds"],
+            "initial_avg": round(row["initial_avg"], 1),
+            "overall_avg": round(row["overall_avg"], 1),
+            "improvement": round(improvement, 1),
+            "improvement_display": f"+{improvement:.1f}" if improvement > 0 else f"{improvement:.1f}"
+        })
+    return results
+
+def _most_valuable(season: SeasonData, player_teams: Dict[int, str], limit: int) -> List[Dict[str, Any]]:
+    """Same rows as GET /player-stats/league/{league_id}/mvp"""
+    rows = [row for row in season.player_stats if row.PlayerLeagueStats.points_rounds > 0]
+    rows.sort(key=lambda row: row.PlayerLeagueStats.points_total, reverse=True)
+
+    results = []
+    for rank, (stat, first_name, last_name) in enumerate(rows[:limit], 1):
+        results.append({
+            "rank": rank,
+            "player_id": stat.player_id,
+            "player_name": f"{first_name} {last_name}",
+            "team_name": player_teams.get(stat.player_id, "Unknown Team"),
+            "total_points": float(stat.points_total) if stat.points_total else 0.0,
+            "rounds_played": stat.points_rounds,
+            "avg_points_per_round": round(float(stat.avg_points), 2) if stat.avg_points else 0.0
+        })
+    return results
+
+def build_league_summary(season: SeasonData, week_id: Optional[int] = None, today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Compute every section of the printable league report from one loaded season.
+    week_id selects the report week (defaults to the latest week); the previous
+    week is the one before it by week number.
+    """
+    today = today or date.today()
+
+    selected_week = None
+    if week_id is not None:
+        selected_week = season.weeks_by_id.get(week_id)
+    elif season.weeks:
+        selected_week = season.weeks[-1]
+
+    previous_week = None
+    if selected_week is not None:
+        earlier = [week for week in season.weeks if week.week_number < selected_week.week_number]
+        previous_week = earlier[-1] if earlier else None
+
+    matches_by_week = defaultdict(list)
+    for match in season.matches:
+        matches_by_week[match.week_id].append(match)
+
+    # Unfinished matches from weeks that have already ended
+    makeup_matches = []
+    for match in season.matches:
+        week = season.weeks_by_id[match.week_id]
+        if match.is_completed or (selected_week and week.id == selected_week.id) or week.end_date >= today:
+            continue
+        summary = _match_summary(season, match)
+        summary["week_number"] = week.week_number
+        makeup_matches.append(summary)
+
+    player_teams = _latest_team_names(season)
+    league = season.league
+
+    return {
+        "league": {
+            "id": league.id,
+            "name": league.name,
+            "description": league.description,
+            "teams": [{"id": team.id, "name": team.name} for team in league.teams],
+            "courses": [{"id": course.id, "name": course.name} for course in league.courses]
+        },
+        "weeks": [_week_summary(week) for week in season.weeks],
+        "selected_week": _week_summary(selected_week),
+        "previous_week": _week_summary(previous_week),
+        "week_matches": [_match_summary(season, match) for match in matches_by_week.get(selected_week.id, [])] if selected_week else [],
+        "previous_week_matches": [_match_summary(season, match) for match in matches_by_week.get(previous_week.id, [])] if previous_week else [],
+        "makeup_matches": makeup_matches,
+        "leaderboard": season.leaderboard,
+        "player_stats": _player_stats(season, player_teams),
+        "rankings": {
+            "top_individual_gross": _top_player_scores(season, "gross_score", 5),
+            "top_individual_net": _top_player_scores(season, "net_score", 5),
+            "top_team_gross": _top_team_scores(season, "gross", 5),
+            "top_team_net": _top_team_scores(season, "net", 5)
+        },
+        "most_improved": _most_improved(season, 5),
+        "mvp": _most_valuable(season, player_teams, 5)
+    }
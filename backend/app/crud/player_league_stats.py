@@ -0,0 +1,164 @@
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+
+from app.models.match import Match
+from app.models.match_player import MatchPlayer
+from app.models.player import Player
+from app.models.player_league_stats import PlayerLeagueStats
+from app.models.team import Team
+from app.models.week import Week
+
+def get_league_id_for_match(db: Session, match: Match) -> Optional[int]:
+    return db.query(Week.league_id).filter(Week.id == match.week_id).scalar()
+
+def refresh_player_league_stats(db: Session, league_id: int, player_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute the rollup rows for the given players (or every player) in a league.
+    Runs one grouped query over the affected players' MatchPlayer rows and
+    writes the result into the caller's transaction without committing.
+    Returns the number of rollup rows written.
+    """
+    if player_ids is not None:
+        player_ids = list(set(player_ids))
+        if not player_ids:
+            return 0
+
+    # Pending MatchPlayer changes must be visible to the aggregate
+    db.flush()
+
+    has_gross = MatchPlayer.gross_score.isnot(None)
+    net_when_gross = case((has_gross, MatchPlayer.net_score), else_=None)
+
+    query = db.query(
+        MatchPlayer.player_id,
+        func.count(MatchPlayer.gross_score).label("rounds_played"),
+        func.sum(MatchPlayer.gross_score).label("gross_total"),
+        func.min(MatchPlayer.gross_score).label("lowest_gross"),
+        func.count(net_when_gross).label("net_rounds"),
+        func.sum(net_when_gross).label("net_total"),
+        func.min(net_when_gross).label("lowest_net"),
+        func.count(MatchPlayer.points).label("points_rounds"),
+        func.sum(MatchPlayer.points).label("points_total"),
+        func.max(MatchPlayer.points).label("best_points")
+    ).join(
+        Match, MatchPlayer.match_id == Match.id
+    ).join(
+        Week, Match.week_id == Week.id
+    ).filter(
+        Week.league_id == league_id
+    )
+
+    existing_query = db.query(PlayerLeagueStats).filter(PlayerLeagueStats.league_id == league_id)
+    if player_ids is not None:
+        query = query.filter(MatchPlayer.player_id.in_(player_ids))
+        existing_query = existing_query.filter(PlayerLeagueStats.player_id.in_(player_ids))
+
+    aggregates = {row.player_id: row for row in query.group_by(MatchPlayer.player_id).all()}
+    existing = {row.player_id: row for row in existing_query.all()}
+
+    # Players who no longer have any match in the league lose their row
+    for player_id, stats in existing.items():
+        if player_id not in aggregates:
+            db.delete(stats)
+
+    for player_id, row in aggregates.items():
+        stats = existing.get(player_id)
+        if stats is None:
+            stats = PlayerLeagueStats(league_id=league_id, player_id=player_id)
+            db.add(stats)
+
+        stats.rounds_played = row.rounds_played or 0
+        stats.gross_total = int(row.gross_total or 0)
+        stats.lowest_gross = row.lowest_gross
+        stats.net_rounds = row.net_rounds or 0
+        stats.net_total = int(row.net_total or 0)
+        stats.lowest_net = row.lowest_net
+        stats.points_rounds = row.points_rounds or 0
+        stats.points_total = float(row.points_total or 0.0)
+        stats.best_points = float(row.best_points) if row.best_points is not None else None
+
+    return len(aggregates)
+
+def refresh_for_match(db: Session, match: Match, extra_player_ids: Iterable[int] = ()) -> int:
+    """Refresh rollups for every player recorded on a match"""
+    league_id = get_league_id_for_match(db, match)
+    if league_id is None:
+        return 0
+
+    db.flush()
+    player_ids = {
+        player_id for (player_id,) in
+        db.query(MatchPlayer.player_id).filter(MatchPlayer.match_id == match.id).all()
+    }
+    player_ids.update(extra_player_ids)
+    return refresh_player_league_stats(db, league_id, player_ids)
+
+def rebuild_league_player_stats(db: Session, league_id: int) -> int:
+    """Backfill every rollup row for a league"""
+    return refresh_player_league_stats(db, league_id)
+
+def get_league_player_stats(db: Session, league_id: int) -> List[PlayerLeagueStats]:
+    return db.query(PlayerLeagueStats).filter(PlayerLeagueStats.league_id == league_id).all()
+
+def get_league_top_scores(db: Session, league_id: int, limit: int = 5) -> Dict[str, List[Dict]]:
+    """The players with the league's lowest gross and lowest net rounds, from the season rollups"""
+    top_scores = {}
+    for key in ("lowest_gross", "lowest_net"):
+        column = getattr(PlayerLeagueStats, key)
+        rows = db.query(
+            PlayerLeagueStats.player_id, Player.first_name, Player.last_name, column
+        ).join(
+            Player, Player.id == PlayerLeagueStats.player_id
+        ).filter(
+            PlayerLeagueStats.league_id == league_id,
+            column.isnot(None)
+        ).order_by(column, PlayerLeagueStats.player_id).limit(limit).all()
+        top_scores[key] = [
+            {"player_id": row.player_id, "player_name": f"{row.first_name} {row.last_name}", "score": row[3]}
+            for row in rows
+        ]
+    return top_scores
+
+def get_latest_team_names(db: Session, league_id: int, player_ids: Optional[Iterable[int]] = None) -> Dict[int, str]:
+    """
+    Map each player to the name of the team they most recently played for in a league.
+    Resolved for every requested player in one query by ranking each player's
+    matches newest-first and keeping the top row.
+    """
+    if player_ids is not None:
+        player_ids = list(set(player_ids))
+        if not player_ids:
+            return {}
+
+    recency = func.row_number().over(
+        partition_by=MatchPlayer.player_id,
+        order_by=(Match.match_date.desc(), Match.id.desc())
+    ).label("recency")
+
+    ranked = db.query(
+        MatchPlayer.player_id,
+        MatchPlayer.team_id,
+        recency
+    ).join(
+        Match, MatchPlayer.match_id == Match.id
+    ).join(
+        Week, Match.week_id == Week.id
+    ).filter(
+        Week.league_id == league_id
+    )
+    if player_ids is not None:
+        ranked = ranked.filter(MatchPlayer.player_id.in_(player_ids))
+    ranked = ranked.subquery()
+
+    rows = db.query(
+        ranked.c.player_id,
+        Team.name
+    ).join(
+        Team, ranked.c.team_id == Team.id
+    ).filter(
+        ranked.c.recency == 1
+    ).all()
+
+    return {player_id: team_name for player_id, team_name in rows}
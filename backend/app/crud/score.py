@@ -0,0 +1,155 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.score import PlayerScore
+from app.models.score_sync import ScoreSyncOperation
+
+ScoreKey = Tuple[int, int]
+
+def get_match_scores(db: Session, match_id: int, player_ids: Optional[Iterable[int]] = None) -> Dict[ScoreKey, Tuple[int, int]]:
+    """Stored hole scores for a match as {(player_id, hole_id): (score id, strokes)}"""
+    query = select(PlayerScore.id, PlayerScore.player_id, PlayerScore.hole_id, PlayerScore.strokes).where(
+        PlayerScore.match_id == match_id
+    )
+    if player_ids is not None:
+        query = query.where(PlayerScore.player_id.in_(set(player_ids)))
+    return {(row.player_id, row.hole_id): (row.id, row.strokes) for row in db.execute(query).all()}
+
+def lock_scores(db: Session, match_ids: Iterable[int]) -> Dict[int, Dict[ScoreKey, Tuple[int, int, Optional[datetime]]]]:
+    """
+    Stored hole scores of several matches as {match_id: {(player_id, hole_id):
+    (score id, strokes, date_recorded)}}, read with FOR UPDATE so concurrent
+    writers to these matches wait for the caller's transaction.
+    """
+    query = select(
+        PlayerScore.id, PlayerScore.match_id, PlayerScore.player_id, PlayerScore.hole_id,
+        PlayerScore.strokes, PlayerScore.date_recorded
+    ).where(PlayerScore.match_id.in_(set(match_ids))).order_by(PlayerScore.id).with_for_update()
+    scores: Dict[int, Dict[ScoreKey, Tuple[int, int, Optional[datetime]]]] = {}
+    for row in db.execute(query).all():
+        scores.setdefault(row.match_id, {})[(row.player_id, row.hole_id)] = (row.id, row.strokes, row.date_recorded)
+    return scores
+
+def _upsert_statement(db: Session):
+    """
+    INSERT of player_scores rows that updates the strokes of a row already
+    stored for the same (match_id, player_id, hole_id), in the database's own
+    upsert syntax.
+    """
+    table = PlayerScore.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert
+        statement = insert(table)
+        return statement.on_duplicate_key_update(
+            strokes=statement.inserted.strokes,
+            date_recorded=statement.inserted.date_recorded
+        )
+
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    statement = insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=["match_id", "player_id", "hole_id"],
+        set_={"strokes": statement.excluded.strokes, "date_recorded": statement.excluded.date_recorded}
+    )
+
+def upsert_scores(
+    db: Session,
+    match_id: int,
+    strokes: Mapping[ScoreKey, int],
+    recorded: Optional[Mapping[ScoreKey, datetime]] = None
+) -> int:
+    """
+    Insert or update the given {(player_id, hole_id): strokes} cells with a
+    single executemany upsert, without committing. Cells are stamped with
+    their time in recorded, if any, or now. Returns the number of cells.
+
+    Rows are written in key order, so concurrent saves to the same match take
+    their row locks in the same order and wait for each other rather than
+    deadlocking.
+    """
+    if not strokes:
+        return 0
+    now = datetime.utcnow()
+    recorded = recorded or {}
+    db.connection().execute(_upsert_statement(db), [
+        {
+            "match_id": match_id, "player_id": player_id, "hole_id": hole_id, "strokes": value,
+            "date_recorded": recorded.get((player_id, hole_id), now)
+        }
+        for (player_id, hole_id), value in sorted(strokes.items())
+    ])
+    return len(strokes)
+
+def delete_scores(db: Session, score_ids: Iterable[int]) -> int:
+    """Delete hole scores by id with one statement, without committing"""
+    score_ids = list(score_ids)
+    if score_ids:
+        db.execute(delete(PlayerScore).where(PlayerScore.id.in_(score_ids)))
+    return len(score_ids)
+
+def sync_match_scores(
+    db: Session,
+    match_id: int,
+    strokes: Mapping[ScoreKey, int],
+    player_ids: Optional[Iterable[int]] = None
+) -> Dict[ScoreKey, Optional[int]]:
+    """
+    Make the match's stored hole scores (or those of player_ids only) equal to
+    strokes, writing only the difference: one upsert for new and changed cells
+    and one DELETE for cells no longer present. Does not commit; the bulk
+    statements bypass the stats cache's flush listener, so callers mark the
+    league changed. Returns the cells that changed, with None for deletions.
+    """
+    existing = get_match_scores(db, match_id, player_ids)
+    changed = {
+        key: value for key, value in strokes.items()
+        if key not in existing or existing[key][1] != value
+    }
+    removed = {key: score_id for key, (score_id, _) in existing.items() if key not in strokes}
+
+    upsert_scores(db, match_id, changed)
+    delete_scores(db, removed.values())
+    return {**changed, **dict.fromkeys(removed)}
+
+def get_sync_statuses(db: Session, idempotency_keys: Iterable[str]) -> Dict[str, str]:
+    """Status of the sync operations already received, by idempotency key"""
+    idempotency_keys = set(idempotency_keys)
+    if not idempotency_keys:
+        return {}
+    rows = db.execute(
+        select(ScoreSyncOperation.idempotency_key, ScoreSyncOperation.status).where(
+            ScoreSyncOperation.idempotency_key.in_(idempotency_keys)
+        )
+    ).all()
+    return {row.idempotency_key: row.status for row in rows}
+
+def get_sync_clear_times(db: Session, match_ids: Iterable[int]) -> Dict[Tuple[int, int, int], datetime]:
+    """
+    When each hole of these matches was last cleared through sync, as
+    {(match_id, player_id, hole_id): client timestamp}. A cleared hole has no
+    stored score left to carry its time.
+    """
+    rows = db.execute(
+        select(
+            ScoreSyncOperation.match_id, ScoreSyncOperation.player_id, ScoreSyncOperation.hole_id,
+            func.max(ScoreSyncOperation.client_timestamp).label("cleared_at")
+        ).where(
+            ScoreSyncOperation.match_id.in_(set(match_ids)),
+            ScoreSyncOperation.status == "applied",
+            ScoreSyncOperation.strokes.is_(None)
+        ).group_by(ScoreSyncOperation.match_id, ScoreSyncOperation.player_id, ScoreSyncOperation.hole_id)
+    ).all()
+    return {(row.match_id, row.player_id, row.hole_id): row.cleared_at for row in rows}
+
+def record_sync_operations(db: Session, operations: List[Dict[str, Any]]) -> int:
+    """Store received sync operations with one executemany INSERT, without committing"""
+    if operations:
+        db.execute(insert(ScoreSyncOperation), operations)
+    return len(operations)
@@ -0,0 +1,187 @@
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import and_, case, func, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core import live
+from app.crud import player_league_stats as player_league_stats_crud
+from app.models.association_tables import league_teams
+from app.models.match import Match
+from app.models.team import Team
+from app.models.team_league_standings import TeamLeagueStandings
+from app.models.week import Week
+
+def _team_results(league_id: int, team_ids: Optional[Set[int]]):
+    """
+    Unpivot completed league matches into one (team_id, gross, net,
+    points_for, points_against, has_points) row per side with UNION ALL.
+    A side is kept when both teams' points are recorded (standings) or when
+    its own gross score is (team stats).
+    """
+    has_points = and_(Match.home_team_points.isnot(None), Match.away_team_points.isnot(None))
+    
+    def side(team_id, gross, net, points_for, points_against):
+        query = select(
+            team_id.label("team_id"),
+            gross.label("gross"),
+            net.label("net"),
+            points_for.label("points_for"),
+            points_against.label("points_against"),
+            case((has_points, 1), else_=0).label("has_points")
+        ).join_from(
+            Match, Week, Match.week_id == Week.id
+        ).where(
+            Week.league_id == league_id,
+            Match.is_completed == True,
+            or_(has_points, gross.isnot(None))
+        )
+        if team_ids is not None:
+            query = query.where(team_id.in_(team_ids))
+        return query
+    
+    return union_all(
+        side(Match.home_team_id, Match.home_team_gross_score, Match.home_team_net_score,
+             Match.home_team_points, Match.away_team_points),
+        side(Match.away_team_id, Match.away_team_gross_score, Match.away_team_net_score,
+             Match.away_team_points, Match.home_team_points)
+    ).subquery("team_results")
+
+def refresh_team_league_standings(db: Session, league_id: int, team_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute standings rows for the given teams (or every team) in a league.
+    Aggregates the affected teams' completed matches in a single grouped query
+    and writes the result into the caller's transaction without committing.
+    Returns the number of standings rows written.
+    """
+    if team_ids is not None:
+        team_ids = {team_id for team_id in team_ids if team_id is not None}
+        if not team_ids:
+            return 0
+    
+    # Pending Match changes must be visible to the aggregate
+    db.flush()
+    
+    results = _team_results(league_id, team_ids)
+    
+    def if_points(column):
+        return case((results.c.has_points == 1, column), else_=None)
+    
+    def if_gross(column):
+        return case((results.c.gross.isnot(None), column), else_=None)
+    
+    query = db.query(
+        results.c.team_id,
+        func.sum(results.c.has_points).label("matches_played"),
+        func.sum(if_points(results.c.points_for)).label("points_won"),
+        func.sum(if_points(results.c.points_against)).label("points_lost"),
+        func.count(if_points(results.c.gross)).label("gross_rounds"),
+        func.sum(if_points(results.c.gross)).label("gross_total"),
+        func.min(if_points(results.c.gross)).label("lowest_gross"),
+        func.count(if_points(results.c.net)).label("net_rounds"),
+        func.sum(if_points(results.c.net)).label("net_total"),
+        func.min(if_points(results.c.net)).label("lowest_net"),
+        func.count(results.c.gross).label("scored_matches"),
+        func.sum(if_gross(results.c.points_for)).label("scored_points_won"),
+        func.sum(if_gross(results.c.points_against)).label("scored_points_lost"),
+        func.sum(results.c.gross).label("scored_gross_total"),
+        func.min(results.c.gross).label("scored_lowest_gross"),
+        func.count(if_gross(results.c.net)).label("scored_net_rounds"),
+        func.sum(if_gross(results.c.net)).label("scored_net_total"),
+        func.min(if_gross(results.c.net)).label("scored_lowest_net")
+    ).group_by(results.c.team_id)
+    
+    existing_query = db.query(TeamLeagueStandings).filter(TeamLeagueStandings.league_id == league_id)
+    if team_ids is not None:
+        existing_query = existing_query.filter(TeamLeagueStandings.team_id.in_(team_ids))
+    
+    aggregates = {row.team_id: row for row in query.all()}
+    existing = {row.team_id: row for row in existing_query.all()}
+    
+    # Teams with no counted matches left lose their row
+    for team_id, standings in existing.items():
+        if team_id not in aggregates:
+            db.delete(standings)
+    
+    for team_id, row in aggregates.items():
+        standings = existing.get(team_id)
+        if standings is None:
+            standings = TeamLeagueStandings(league_id=league_id, team_id=team_id)
+            db.add(standings)
+        
+        standings.matches_played = int(row.matches_played or 0)
+        standings.points_won = float(row.points_won or 0.0)
+        standings.points_lost = float(row.points_lost or 0.0)
+        standings.gross_rounds = row.gross_rounds or 0
+        standings.gross_total = int(row.gross_total or 0)
+        standings.lowest_gross = row.lowest_gross
+        standings.net_rounds = row.net_rounds or 0
+        standings.net_total = int(row.net_total or 0)
+        standings.lowest_net = row.lowest_net
+        standings.scored_matches = row.scored_matches or 0
+        standings.scored_points_won = float(row.scored_points_won or 0.0)
+        standings.scored_points_lost = float(row.scored_points_lost or 0.0)
+        standings.scored_gross_total = int(row.scored_gross_total or 0)
+        standings.scored_lowest_gross = row.scored_lowest_gross
+        standings.scored_net_rounds = row.scored_net_rounds or 0
+        standings.scored_net_total = int(row.scored_net_total or 0)
+        standings.scored_lowest_net = row.scored_lowest_net
+    
+    return len(aggregates)
+
+def refresh_for_match(db: Session, match: Match, extra_team_ids: Iterable[int] = ()) -> int:
+    """Refresh standings for both teams of a match (plus any teams it was moved away from)"""
+    league_id = db.query(Week.league_id).filter(Week.id == match.week_id).scalar()
+    if league_id is None:
+        return 0
+    
+    team_ids = {match.home_team_id, match.away_team_id}
+    team_ids.update(extra_team_ids)
+    return refresh_team_league_standings(db, league_id, team_ids)
+
+def rebuild_league_team_standings(db: Session, league_id: int) -> int:
+    """Backfill every standings row for a league"""
+    return refresh_team_league_standings(db, league_id)
+
+def get_league_team_standings(db: Session, league_id: int) -> List[TeamLeagueStandings]:
+    return db.query(TeamLeagueStandings).filter(TeamLeagueStandings.league_id == league_id).all()
+
+def get_league_leaderboard(db: Session, league_id: int) -> List[Dict[str, Any]]:
+    """Every league team with its standings, best win percentage first (teams without results get an empty row)"""
+    rows = (db.query(Team.id, Team.name, TeamLeagueStandings)
+        .join(league_teams, league_teams.c.team_id == Team.id)
+        .outerjoin(TeamLeagueStandings, and_(
+            TeamLeagueStandings.team_id == Team.id,
+            TeamLeagueStandings.league_id == league_id
+        ))
+        .filter(league_teams.c.league_id == league_id)
+        .all())
+    
+    result = []
+    for team_id, team_name, standings in rows:
+        result.append({
+            "id": team_id,
+            "name": team_name,
+            "matches_played": standings.matches_played if standings else 0,
+            "points_won": standings.points_won if standings else 0,
+            "points_lost": standings.points_lost if standings else 0,
+            "win_percentage": standings.win_percentage if standings else 0,
+            "lowest_gross": standings.lowest_gross if standings else None,
+            "lowest_net": standings.lowest_net if standings else None
+        })
+    
+    # Sort by win percentage (descending)
+    result.sort(key=lambda x: x["win_percentage"], reverse=True)
+    return result
+
+def queue_standings_update(db: Session, league_id: int):
+    """
+    Compute the league's standings and top scores once, from the rollups as
+    this transaction leaves them, and publish them to the league's live stream
+    when it commits. Viewers receive the snapshot instead of each reloading it.
+    """
+    db.flush()
+    live.publish_on_commit(db, live.league_channel(league_id), "standings", {
+        "league_id": league_id,
+        "standings": get_league_leaderboard(db, league_id),
+        "top_scores": player_league_stats_crud.get_league_top_scores(db, league_id),
+    })
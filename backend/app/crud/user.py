@@ -1,8 +1,11 @@
 from typing import Any, Dict, Optional, Union
 
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash, verify_password_async
+from app.core.settings import settings
+from app.core.user_cache import user_principals
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
@@ -36,6 +39,7 @@ def update(db: Session, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]])
     else:
         update_data = obj_in.dict(exclude_unset=True)
     
+    revoke = bool(update_data.get("password")) or (update_data.get("is_active") is False and db_obj.is_active)
     if update_data.get("password"):
         hashed_password = get_password_hash(update_data["password"])
         del update_data["password"]
@@ -47,15 +51,34 @@ def update(db: Session, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]])
     
     db.add(db_obj)
     db.commit()
+    # Requests already authenticated as this user must see the change
+    if revoke and settings.AUTH_TOKEN_REVOCATION:
+        user_principals.revoke(db_obj.id)
+    else:
+        user_principals.invalidate_user(db_obj.id)
     db.refresh(db_obj)
     return db_obj
 
-def authenticate(db: Session, username: str, password: str) -> Optional[User]:
-    user = get_by_username(db, username)
+def _store_password_hash(db: Session, user: User, hashed_password: str):
+    user.hashed_password = hashed_password
+    db.commit()
+    db.refresh(user)
+
+async def authenticate(db: Session, username: str, password: str) -> Optional[User]:
+    """
+    The user with these credentials, or None. Database work runs on the
+    request threadpool and the password check on the password hashing pool,
+    so no request thread waits on bcrypt. A hash made with outdated settings
+    is replaced.
+    """
+    user = await run_in_threadpool(get_by_username, db, username)
     if not user:
         return None
-    if not verify_password(password, str(user.hashed_password)):
+    valid, new_hash = await verify_password_async(password, str(user.hashed_password))
+    if not valid:
         return None
+    if new_hash:
+        await run_in_threadpool(_store_password_hash, db, user, new_hash)
     return user
 
 def is_active(user: User) -> bool:
@@ -5,6 +5,8 @@ from app.models.score import PlayerScore
 from app.schemas.week import WeekCreate, WeekUpdate
 from sqlalchemy import text
 from typing import List
+from app.crud import player_league_stats as player_league_stats_crud
+from app.crud import team_league_standings as team_league_standings_crud
 
 def create_week(db: Session, week_data: WeekCreate, league_id: int) -> Week:
     db_week = Week(
@@ -43,6 +45,9 @@ def delete_week(db: Session, week_id: int) -> bool:
     if not db_week:
         return False
     
+    league_id = db_week.league_id
     db.delete(db_week)
+    player_league_stats_crud.rebuild_league_player_stats(db, league_id)
+    team_league_standings_crud.rebuild_league_team_standings(db, league_id)
     db.commit()
     return True
\ No newline at end of file
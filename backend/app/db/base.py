@@ -1,6 +1,5 @@
-from sqlalchemy import create_engine, text, inspect
-from sqlalchemy.orm import sessionmaker, declarative_base
-from app.core.settings import settings
+from sqlalchemy import text, inspect
+from sqlalchemy.orm import declarative_base
 Base = declarative_base()
 # Import all models here for Alembic autodiscovery
 from app.db.base import Base
@@ -26,16 +25,9 @@ from app.models.tournament import (
     ParticipantType
 )
 
-# Create engine and session factory
-engine = create_engine(settings.database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Engine and session factory are shared with app.db.session so every
+# endpoint draws from the same connection pool
+from app.db.session import engine, SessionLocal, get_db
 
 def init_db():
     """Initialize the database with all tables."""
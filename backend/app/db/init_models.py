@@ -13,5 +13,10 @@ from app.models.tournament import Tournament, TournamentFlight, TournamentPlayer
 from app.models.week import Week
 from app.models.match import Match
 from app.models.score import PlayerScore
+from app.models.score_sync import ScoreSyncOperation
+from app.models.match_player import MatchPlayer
+from app.models.player_league_stats import PlayerLeagueStats
+from app.models.team_league_standings import TeamLeagueStandings
+from app.models.player_handicap_history import PlayerHandicapHistory
 
 # This file doesn't need any functions, its purpose is just to import all models
\ No newline at end of file
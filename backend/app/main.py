@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 import sys
 from pathlib import Path
 from fastapi.middleware.cors import CORSMiddleware
@@ -7,6 +8,15 @@ from fastapi.middleware.cors import CORSMiddleware
 sys.path.append(str(Path(__file__).resolve().parent))
 
 from app.db.base import init_db
+from app.db.session import get_pool_stats
+from app.core.stats_cache import get_cache_stats
+from app.core.live import get_live_stats
+from app.core import metrics
+from app.core.query_budget import QueryBudgetMiddleware
+from app.core.security import get_password_hash_stats
+from app.core.settings import settings
+from app.core.token_cache import TokenReaper
+from app.crud.access_token import reap_expired_tokens
 import app.db.init_models  # This import ensures all models are loaded
 
 # Import all routers
@@ -30,6 +40,11 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+# Does nothing unless QUERY_BUDGET_MODE is "warn" or "raise"
+app.add_middleware(QueryBudgetMiddleware)
+
 # Register all API routers with /api prefix
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
@@ -43,9 +58,16 @@ app.include_router(player_stats.router, prefix="/api/player-stats", tags=["playe
 app.include_router(team_stats.router, prefix="/api/team-stats", tags=["team-stats"])
 app.include_router(tournaments.router, prefix="/api/tournaments", tags=["tournaments"])
 
+token_reaper = TokenReaper(reap_expired_tokens, settings.ACCESS_TOKEN_REAP_INTERVAL_SECONDS)
+
 @app.on_event("startup")
 def startup_event():
     init_db()
+    token_reaper.start()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    token_reaper.stop()
 
 @app.get("/")
 def read_root():
@@ -55,3 +77,30 @@ def read_root():
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/db")
+def db_pool_health():
+    """Live connection pool statistics (checked out, overflow, checkout wait)"""
+    return get_pool_stats()
+
+@app.get("/health/cache")
+def stats_cache_health():
+    """League stats response cache counters (hit ratio, evictions, entries)"""
+    return get_cache_stats()
+
+@app.get("/health/live")
+def live_stream_health():
+    """Live score stream broker counters (channels, subscribers, published events)"""
+    return get_live_stats()
+
+@app.get("/health/auth")
+def password_hash_health():
+    """Login password hashing pool counters (queue depth, waits, rejections)"""
+    return get_password_hash_stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Per-route latency and SQL metrics, pool and threadpool gauges, for Prometheus"""
+    return PlainTextResponse(
+        metrics.render(get_pool_stats(), metrics.threadpool_stats(), get_password_hash_stats()),
+        media_type="text/plain; version=0.0.4"
+    )
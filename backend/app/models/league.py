@@ -17,6 +17,8 @@ class League(Base):
     handicap_required_scores = Column(Integer, nullable=True, default=3)
     handicap_recent_scores_used = Column(Integer, nullable=True, default=10)
     handicap_perecentage_to_par = Column(Integer, nullable=True, default=85)
+    # Bumped by every committed write to the league's data; keys the stats response cache
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationships
     teams = relationship("Team", secondary=league_teams, back_populates="leagues")
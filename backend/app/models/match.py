@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Date, ForeignKey, DateTime, Float
+from sqlalchemy import Column, Integer, String, Boolean, Date, ForeignKey, DateTime, Float, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import Base
@@ -32,6 +32,11 @@ class Match(Base):
     match_players = relationship("MatchPlayer", back_populates="match", cascade="all, delete-orphan")
     access_tokens = relationship("MatchAccessToken", back_populates="match", cascade="all, delete-orphan")
     
+    __table_args__ = (
+        # League stats join Week -> Match and usually only want completed matches
+        Index('ix_matches_week_id_is_completed', 'week_id', 'is_completed'),
+    )
+    
     def __repr__(self):
         return f"<Match(id={self.id}, date={self.match_date}, home={self.home_team_id}, away={self.away_team_id})>"
 
@@ -46,4 +51,9 @@ class MatchAccessToken(Base):
     created_at = Column(DateTime, default=datetime.now)
     
     match = relationship("Match", back_populates="access_tokens")
-    team = relationship("Team")
\ No newline at end of file
+    team = relationship("Team")
+    
+    __table_args__ = (
+        # The token reaper deletes by expiry
+        Index('ix_match_access_tokens_expires_at', 'expires_at'),
+    )
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Boolean, ForeignKey, UniqueConstraint, Float
+from sqlalchemy import Column, Integer, Boolean, ForeignKey, UniqueConstraint, Float, Index
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -27,6 +27,11 @@ class MatchPlayer(Base):
     # Ensure unique combination of match, team, and player
     __table_args__ = (
         UniqueConstraint('match_id', 'team_id', 'player_id', name='_match_team_player_uc'),
+        # Per-player stats (averages, lows, handicap windows) read only these two columns
+        Index('ix_match_players_player_id_gross_score', 'player_id', 'gross_score'),
+        # Top-score listings order by score and join back to the match
+        Index('ix_match_players_gross_score_match_id', 'gross_score', 'match_id'),
+        Index('ix_match_players_net_score_match_id', 'net_score', 'match_id'),
     )
     
     def __repr__(self):
@@ -0,0 +1,33 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, Float, String, Date, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+
+class PlayerHandicapHistory(Base):
+    """
+    One row per change to Player.handicap, so a player's handicap on any date
+    is the latest row effective on or before it.
+    Written by app.crud.handicap for recalculations and for direct edits.
+    """
+    __tablename__ = "player_handicap_history"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    player_id = Column(Integer, ForeignKey("players.id", ondelete="CASCADE"), nullable=False)
+    # League whose scores produced the handicap; empty for manual edits
+    league_id = Column(Integer, ForeignKey("leagues.id", ondelete="SET NULL"), nullable=True)
+    handicap = Column(Float, nullable=True)
+    effective_date = Column(Date, nullable=False)
+    # "recalculation", "scores", "manual" or "baseline"
+    source = Column(String(20), nullable=False)
+    created_at = Column(DateTime, default=datetime.now)
+    
+    # Relationships
+    player = relationship("Player")
+    league = relationship("League")
+    
+    __table_args__ = (
+        Index('ix_player_handicap_history_player_id_effective_date', 'player_id', 'effective_date'),
+    )
+    
+    def __repr__(self):
+        return f"<PlayerHandicapHistory(player={self.player_id}, handicap={self.handicap}, effective={self.effective_date})>"
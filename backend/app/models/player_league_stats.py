@@ -0,0 +1,52 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+
+class PlayerLeagueStats(Base):
+    """
+    Per-player season rollup of MatchPlayer rows for one league.
+    Maintained by app.crud.player_league_stats whenever match scores change.
+    """
+    __tablename__ = "player_league_stats"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    league_id = Column(Integer, ForeignKey("leagues.id", ondelete="CASCADE"), nullable=False)
+    player_id = Column(Integer, ForeignKey("players.id", ondelete="CASCADE"), nullable=False)
+    
+    # Rounds with a gross score recorded
+    rounds_played = Column(Integer, nullable=False, default=0)
+    gross_total = Column(Integer, nullable=False, default=0)
+    lowest_gross = Column(Integer, nullable=True)
+    
+    # Net scores from the same rounds (net may be missing on older data)
+    net_rounds = Column(Integer, nullable=False, default=0)
+    net_total = Column(Integer, nullable=False, default=0)
+    lowest_net = Column(Integer, nullable=True)
+    
+    # Rounds with points recorded
+    points_rounds = Column(Integer, nullable=False, default=0)
+    points_total = Column(Float, nullable=False, default=0.0)
+    best_points = Column(Float, nullable=True)
+    
+    # Relationships
+    player = relationship("Player")
+    league = relationship("League")
+    
+    __table_args__ = (
+        UniqueConstraint('league_id', 'player_id', name='_league_player_stats_uc'),
+    )
+    
+    @property
+    def avg_gross(self):
+        return self.gross_total / self.rounds_played if self.rounds_played else None
+    
+    @property
+    def avg_net(self):
+        return self.net_total / self.net_rounds if self.net_rounds else None
+    
+    @property
+    def avg_points(self):
+        return self.points_total / self.points_rounds if self.points_rounds else None
+    
+    def __repr__(self):
+        return f"<PlayerLeagueStats(league={self.league_id}, player={self.player_id}, rounds={self.rounds_played}, points={self.points_total})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import Base
@@ -20,5 +20,12 @@ class PlayerScore(Base):
     player = relationship("Player", back_populates="player_scores")
     hole = relationship("Hole", back_populates="player_scores")
     
+    __table_args__ = (
+        # Scorecards are always loaded by match, then grouped by player
+        Index('ix_player_scores_match_id_player_id', 'match_id', 'player_id'),
+        # One score per player per hole, which score saves upsert against
+        UniqueConstraint('match_id', 'player_id', 'hole_id', name='uq_player_scores_match_id_player_id_hole_id'),
+    )
+    
     def __repr__(self):
         return f"<PlayerScore(player_id={self.player_id}, match_id={self.match_id}, hole_id={self.hole_id}, strokes={self.strokes})>"
\ No newline at end of file
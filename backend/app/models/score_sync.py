@@ -0,0 +1,26 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from app.db.base import Base
+
+class ScoreSyncOperation(Base):
+    """
+    One hole-score operation received through POST /matches/sync, kept by its
+    client idempotency key so that a replayed batch is recognised and answered
+    with the original outcome instead of being applied again.
+    """
+    __tablename__ = "score_sync_operations"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    idempotency_key = Column(String(64), nullable=False, unique=True, index=True)
+    match_id = Column(Integer, ForeignKey("matches.id", ondelete="CASCADE"), nullable=False)
+    player_id = Column(Integer, nullable=False)
+    hole_id = Column(Integer, nullable=False)
+    # None clears the hole
+    strokes = Column(Integer, nullable=True)
+    client_timestamp = Column(DateTime, nullable=False)
+    # "applied", "superseded", "stale" or "rejected"
+    status = Column(String(20), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<ScoreSyncOperation(key={self.idempotency_key}, match={self.match_id}, status={self.status})>"
@@ -0,0 +1,75 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+
+class TeamLeagueStandings(Base):
+    """
+    Per-team season standings for one league, folded from completed matches.
+    Maintained by app.crud.team_league_standings whenever match results change.
+    """
+    __tablename__ = "team_league_standings"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    league_id = Column(Integer, ForeignKey("leagues.id", ondelete="CASCADE"), nullable=False)
+    team_id = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
+    
+    # Completed matches with both teams' points recorded
+    matches_played = Column(Integer, nullable=False, default=0)
+    points_won = Column(Float, nullable=False, default=0.0)
+    points_lost = Column(Float, nullable=False, default=0.0)
+    
+    # Team scores from those matches (may be missing on older data)
+    gross_rounds = Column(Integer, nullable=False, default=0)
+    gross_total = Column(Integer, nullable=False, default=0)
+    lowest_gross = Column(Integer, nullable=True)
+    net_rounds = Column(Integer, nullable=False, default=0)
+    net_total = Column(Integer, nullable=False, default=0)
+    lowest_net = Column(Integer, nullable=True)
+    
+    # Team stats count every completed match with the team's gross score,
+    # recorded points or not
+    scored_matches = Column(Integer, nullable=False, default=0)
+    scored_points_won = Column(Float, nullable=False, default=0.0)
+    scored_points_lost = Column(Float, nullable=False, default=0.0)
+    scored_gross_total = Column(Integer, nullable=False, default=0)
+    scored_lowest_gross = Column(Integer, nullable=True)
+    scored_net_rounds = Column(Integer, nullable=False, default=0)
+    scored_net_total = Column(Integer, nullable=False, default=0)
+    scored_lowest_net = Column(Integer, nullable=True)
+    
+    # Relationships
+    team = relationship("Team")
+    league = relationship("League")
+    
+    __table_args__ = (
+        UniqueConstraint('league_id', 'team_id', name='_league_team_standings_uc'),
+    )
+    
+    @property
+    def avg_gross(self):
+        return self.gross_total / self.gross_rounds if self.gross_rounds else None
+    
+    @property
+    def avg_net(self):
+        return self.net_total / self.net_rounds if self.net_rounds else None
+    
+    @property
+    def win_percentage(self):
+        total_points = (self.points_won or 0) + (self.points_lost or 0)
+        return (self.points_won / total_points * 100) if total_points > 0 else 0
+    
+    @property
+    def scored_avg_gross(self):
+        return self.scored_gross_total / self.scored_matches if self.scored_matches else None
+    
+    @property
+    def scored_avg_net(self):
+        return self.scored_net_total / self.scored_net_rounds if self.scored_net_rounds else None
+    
+    @property
+    def scored_win_percentage(self):
+        total_points = (self.scored_points_won or 0) + (self.scored_points_lost or 0)
+        return (self.scored_points_won / total_points * 100) if total_points > 0 else 0
+    
+    def __repr__(self):
+        return f"<TeamLeagueStandings(league={self.league_id}, team={self.team_id}, won={self.points_won}, lost={self.points_lost})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Date, ForeignKey
+from sqlalchemy import Column, Integer, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -19,5 +19,10 @@ class Week(Base):
     # Relationship to matches
     matches = relationship("Match", back_populates="week", cascade="all, delete-orphan")
     
+    __table_args__ = (
+        # Every league-scoped stats query filters on league_id and joins on id
+        Index('ix_league_weeks_league_id_id', 'league_id', 'id'),
+    )
+    
     def __repr__(self):
         return f"<Week(id={self.id}, week_number={self.week_number})>"
\ No newline at end of file
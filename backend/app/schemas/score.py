@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -26,4 +26,25 @@ class PlayerScoreResponse(PlayerScoreBase):
     hole_par: Optional[int] = None
     
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class HoleScoreUpdate(BaseModel):
+    # None clears the hole
+    strokes: Optional[int] = Field(None, ge=1)
+
+class HoleScoreCell(HoleScoreUpdate):
+    player_id: int
+    hole_id: int
+
+class HoleScoresUpdate(BaseModel):
+    scores: List[HoleScoreCell] = Field(..., min_length=1, max_length=72)
+
+class ScoreSyncOperation(HoleScoreCell):
+    # Chosen by the client, unique per operation, so resent batches are recognised
+    idempotency_key: str = Field(..., min_length=1, max_length=64)
+    match_id: int
+    # When the score was entered on the device; the latest entry of a hole wins
+    client_timestamp: datetime
+
+class ScoreSyncRequest(BaseModel):
+    operations: List[ScoreSyncOperation] = Field(..., min_length=1, max_length=500)
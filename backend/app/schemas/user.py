@@ -40,6 +40,7 @@ class Token(BaseModel):
     
 class TokenPayload(BaseModel):
     sub: Optional[int] = None
+    iat: Optional[float] = None
 
 class LoginRequest(BaseModel):
     username: str
@@ -0,0 +1,13 @@
+"""
+Match scoring: pops, net scores by hole, player and team totals, and points,
+computed from hole-by-hole strokes with NumPy across every player and hole.
+"""
+from app.scoring.match import (
+    allocate_strokes,
+    apply_match_scoring,
+    calculate_pops,
+    load_match_holes,
+    round_strokes,
+    score_match,
+)
+from app.scoring.rescore import load_league_scorecards, rescore_league, rescore_scorecard
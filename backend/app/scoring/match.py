@@ -0,0 +1,203 @@
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.crud.handicap import round_half_up
+from app.models.hole import Hole
+from app.models.match import Match
+from app.models.match_player import MatchPlayer
+
+def calculate_pops(handicaps: Sequence[Optional[float]]) -> np.ndarray:
+    """
+    Strokes each player receives: their handicap minus the lowest handicap of
+    everyone in the match. Players without a handicap get none.
+    """
+    handicaps = np.asarray(handicaps, dtype=np.float64)
+    known = ~np.isnan(handicaps)
+    if not known.any():
+        return np.zeros(len(handicaps))
+    lowest = handicaps[known].min()
+    return np.where(known, np.maximum(handicaps - lowest, 0.0), 0.0)
+
+def allocate_strokes(pops: np.ndarray, hole_handicaps: Sequence[Optional[int]]) -> np.ndarray:
+    """
+    Strokes given to each player on each hole, shape (players, holes).
+    Every hole gets pops // holes strokes; the remaining pops go to the hardest
+    holes by hole handicap, so on a 9-hole course 11 pops is one stroke
+    everywhere plus one more on the two hardest holes. Holes without a
+    handicap never receive strokes.
+    """
+    hole_handicaps = np.asarray(hole_handicaps, dtype=np.float64)
+    hole_count = len(hole_handicaps)
+    if not hole_count:
+        return np.zeros((len(pops), 0))
+
+    rated = ~np.isnan(hole_handicaps)
+    # Position of each rated hole from hardest to easiest; ties keep course order
+    position = np.full(hole_count, np.inf)
+    rated_holes = np.flatnonzero(rated)
+    position[rated_holes[np.argsort(hole_handicaps[rated], kind="stable")]] = np.arange(len(rated_holes))
+
+    pops = np.asarray(pops, dtype=np.float64)[:, None]
+    strokes = np.floor(pops / hole_count) + (position[None, :] < pops % hole_count)
+    return np.where(rated[None, :], strokes, 0.0)
+
+def _hole_points(net: np.ndarray, home_count: int) -> np.ndarray:
+    """
+    Individual points by hole for paired players (home rows first, then away).
+    The lowest net score on a hole wins a point; several players from the same
+    team sharing it get half a point each; a tie across teams scores nothing.
+    """
+    scored = ~np.isnan(net)
+    any_scored = scored.any(axis=0)
+    lowest = np.min(np.where(scored, net, np.inf), axis=0)
+    is_lowest = scored & (net == lowest[None, :])
+
+    home_lowest = is_lowest[:home_count].sum(axis=0)
+    away_lowest = is_lowest[home_count:].sum(axis=0)
+    one_team = any_scored & ((home_lowest == 0) | (away_lowest == 0))
+    share = np.where((home_lowest + away_lowest) == 1, 1.0, 0.5)
+    return np.where(is_lowest & one_team[None, :], share[None, :], 0.0)
+
+def score_match(
+    holes: Sequence[Tuple[int, Optional[int]]],
+    home_players: Sequence[Tuple[int, Optional[float]]],
+    away_players: Sequence[Tuple[int, Optional[float]]],
+    strokes: Mapping[Tuple[int, int], int]
+) -> Dict[str, Any]:
+    """
+    Score a match from its hole-by-hole strokes.
+
+    holes are (hole_id, hole handicap) in course order; home_players and
+    away_players are (player_id, match handicap) in scorecard order, and players
+    at the same position are paired for individual points; strokes maps
+    (player_id, hole_id) to the strokes taken.
+
+    Each hole awards individual points (see _hole_points) and, when every
+    player on both teams has a score, a team point to the lower team net
+    total. Player net scores are gross minus handicap.
+    """
+    hole_ids = [hole_id for hole_id, _ in holes]
+    players = list(home_players) + list(away_players)
+    player_count, hole_count = len(players), len(hole_ids)
+    home_count, away_count = len(home_players), len(away_players)
+    pairs = min(home_count, away_count)
+
+    player_rows = {player_id: row for row, (player_id, _) in enumerate(players)}
+    hole_columns = {hole_id: column for column, hole_id in enumerate(hole_ids)}
+    cells = [
+        (player_rows[player_id], hole_columns[hole_id], value)
+        for (player_id, hole_id), value in strokes.items()
+        if player_id in player_rows and hole_id in hole_columns and value is not None
+    ]
+    gross = np.full((player_count, hole_count), np.nan)
+    if cells:
+        cell_rows, cell_columns, values = zip(*cells)
+        gross[list(cell_rows), list(cell_columns)] = values
+    scored = ~np.isnan(gross)
+
+    handicaps = np.array([np.nan if h is None else h for _, h in players], dtype=np.float64)
+    pops = calculate_pops(handicaps)
+    net = gross - allocate_strokes(pops, [handicap for _, handicap in holes])
+
+    # Only paired players compete for individual and team hole points
+    paired = np.r_[np.arange(pairs), home_count + np.arange(pairs)].astype(np.int64)
+    points = np.zeros((player_count, hole_count))
+    if pairs:
+        points[paired] = _hole_points(net[paired], pairs)
+
+    home_rows, away_rows = paired[:pairs], paired[pairs:]
+    complete = (
+        (scored[home_rows].sum(axis=0) == home_count) & (home_count > 0) &
+        (scored[away_rows].sum(axis=0) == away_count) & (away_count > 0)
+    )
+    home_hole_net = np.nansum(net[home_rows], axis=0)
+    away_hole_net = np.nansum(net[away_rows], axis=0)
+    team_hole_points = {
+        "home": np.where(complete, (home_hole_net < away_hole_net).astype(np.float64), np.nan),
+        "away": np.where(complete, (away_hole_net < home_hole_net).astype(np.float64), np.nan),
+    }
+
+    played = scored.any(axis=1)
+    player_gross = np.nansum(gross, axis=1)
+    player_net = player_gross - np.nan_to_num(handicaps)
+    player_points = points.sum(axis=1)
+
+    results: Dict[str, Any] = {"players": {}}
+    for row, (player_id, handicap) in enumerate(players):
+        results["players"][player_id] = {
+            "team": "home" if row < home_count else "away",
+            "handicap": handicap,
+            "pops": pops[row].item(),
+            "gross_score": int(player_gross[row]) if played[row] else None,
+            "net_score": player_net[row].item() if played[row] else None,
+            "points": player_points[row].item(),
+            "net_by_hole": [None if np.isnan(v) else v for v in net[row].tolist()],
+            "points_by_hole": [p if s else None for p, s in zip(points[row].tolist(), scored[row].tolist())],
+        }
+
+    for team, rows in (("home", home_rows), ("away", away_rows)):
+        team_played = rows[played[rows]]
+        hole_points = team_hole_points[team]
+        results[f"{team}_team"] = {
+            "gross_score": int(gross[rows][:, complete].sum()) if complete.any() else None,
+            "net_score": player_net[team_played].sum().item() if len(team_played) else None,
+            "points": (player_points[rows].sum() + np.nansum(hole_points)).item(),
+            "points_by_hole": [None if np.isnan(v) else v for v in hole_points.tolist()],
+        }
+    return results
+
+def round_strokes(value: Optional[float]) -> Optional[int]:
+    """Integer columns (pops, net scores) store fractional handicap results rounded half up"""
+    return None if value is None else int(round_half_up(value))
+
+def load_match_holes(db: Session, match: Match):
+    """(hole_id, hole handicap) for the match's course in hole order"""
+    return db.query(Hole.id, Hole.handicap).filter(
+        Hole.course_id == match.course_id
+    ).order_by(Hole.number, Hole.id).all()
+
+def apply_match_scoring(
+    db: Session,
+    match: Match,
+    strokes: Mapping[Tuple[int, int], int],
+    match_players: Optional[Sequence[MatchPlayer]] = None,
+    holes: Optional[Sequence[Tuple[int, Optional[int]]]] = None
+) -> Dict[str, Any]:
+    """
+    Score a match from its strokes and write pops, gross, net and points to its
+    active MatchPlayer rows and the team totals to the Match, without committing.
+    Players are paired in MatchPlayer id order on every path (score saves,
+    hole edits, sync and rescoring), so a card always scores the same. Callers
+    that already loaded the active match players or the holes can pass them in.
+    """
+    if match_players is None:
+        db.flush()
+        match_players = db.query(MatchPlayer).filter(
+            MatchPlayer.match_id == match.id,
+            MatchPlayer.is_active == True
+        ).order_by(MatchPlayer.id).all()
+    match_players = sorted(match_players, key=lambda mp: mp.id)
+    home = [mp for mp in match_players if mp.team_id == match.home_team_id]
+    away = [mp for mp in match_players if mp.team_id == match.away_team_id]
+
+    results = score_match(
+        holes if holes is not None else load_match_holes(db, match),
+        [(mp.player_id, mp.handicap) for mp in home],
+        [(mp.player_id, mp.handicap) for mp in away],
+        strokes
+    )
+
+    for match_player in home + away:
+        player = results["players"][match_player.player_id]
+        match_player.pops = round_strokes(player["pops"])
+        match_player.gross_score = player["gross_score"]
+        match_player.net_score = round_strokes(player["net_score"])
+        match_player.points = player["points"]
+
+    for team in ("home", "away"):
+        setattr(match, f"{team}_team_gross_score", results[f"{team}_team"]["gross_score"])
+        setattr(match, f"{team}_team_net_score", round_strokes(results[f"{team}_team"]["net_score"]))
+        setattr(match, f"{team}_team_points", results[f"{team}_team"]["points"])
+    return results
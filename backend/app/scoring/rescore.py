@@ -0,0 +1,237 @@
+"""
+League-wide rescoring: recompute every scored match of a league from its hole
+scores, e.g. after handicaps or scoring rules change.
+
+The league's scorecards are read with a handful of bulk queries, scored in a
+process pool (score_match is pure NumPy, so matches score independently), and
+only the rows whose values changed are written back with batched executemany
+UPDATEs. Running it again on an unchanged league writes nothing.
+"""
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from app.core import stats_cache
+from app.core.settings import settings
+from app.crud import handicap as handicap_crud
+from app.crud import player_league_stats as player_league_stats_crud
+from app.crud import team_league_standings as team_league_standings_crud
+from app.models.hole import Hole
+from app.models.match import Match
+from app.models.match_player import MatchPlayer
+from app.models.score import PlayerScore
+from app.models.week import Week
+from app.scoring.match import round_strokes, score_match
+
+MATCH_PLAYER_FIELDS = ("handicap", "pops", "gross_score", "net_score", "points")
+MATCH_FIELDS = (
+    "home_team_gross_score", "home_team_net_score", "home_team_points",
+    "away_team_gross_score", "away_team_net_score", "away_team_points",
+)
+
+# Below this many matches the pool's startup costs more than it saves
+MIN_PARALLEL_MATCHES = 50
+
+def load_league_scorecards(db: Session, league_id: int, handicaps_from_history: bool = False) -> List[Dict[str, Any]]:
+    """
+    Every match in the league that has hole scores, as plain picklable scorecards.
+    Four queries: matches, holes, active match players and hole scores. With
+    handicaps_from_history, each player's match handicap is reset to their
+    handicap history going into the match date (one more query per match date).
+    """
+    matches = db.execute(
+        select(
+            Match.id, Match.match_date, Match.course_id, Match.home_team_id, Match.away_team_id,
+            *(getattr(Match, field) for field in MATCH_FIELDS)
+        ).join(
+            Week, Match.week_id == Week.id
+        ).where(
+            Week.league_id == league_id,
+            Match.id.in_(select(PlayerScore.match_id).distinct())
+        ).order_by(Match.id)
+    ).all()
+    if not matches:
+        return []
+    match_ids = [match.id for match in matches]
+
+    holes = defaultdict(list)
+    for hole in db.execute(
+        select(Hole.id, Hole.handicap, Hole.course_id).where(
+            Hole.course_id.in_({match.course_id for match in matches})
+        ).order_by(Hole.number, Hole.id)
+    ).all():
+        holes[hole.course_id].append((hole.id, hole.handicap))
+
+    players = defaultdict(list)
+    for row in db.execute(
+        select(
+            MatchPlayer.id, MatchPlayer.match_id, MatchPlayer.team_id, MatchPlayer.player_id,
+            *(getattr(MatchPlayer, field) for field in MATCH_PLAYER_FIELDS)
+        ).where(
+            MatchPlayer.match_id.in_(match_ids),
+            MatchPlayer.is_active == True
+        ).order_by(MatchPlayer.id)
+    ).all():
+        players[row.match_id].append(row)
+
+    strokes = defaultdict(dict)
+    for row in db.execute(
+        select(PlayerScore.match_id, PlayerScore.player_id, PlayerScore.hole_id, PlayerScore.strokes).where(
+            PlayerScore.match_id.in_(match_ids)
+        )
+    ).all():
+        strokes[row.match_id][(row.player_id, row.hole_id)] = row.strokes
+
+    history: Dict[Any, Dict[int, Optional[float]]] = {}
+    if handicaps_from_history:
+        for match_date in {match.match_date for match in matches}:
+            # A change effective on the match date came from that night's scores,
+            # not the handicap the match was played with
+            history[match_date] = {
+                row["player_id"]: row["handicap"]
+                for row in handicap_crud.get_league_handicaps_as_of(db, league_id, match_date, inclusive=False)
+            }
+
+    scorecards = []
+    for match in matches:
+        card_players = []
+        for row in players[match.id]:
+            handicap = row.handicap
+            as_of = history.get(match.match_date, {}).get(row.player_id)
+            if as_of is not None:
+                handicap = handicap_crud.round_half_up(as_of, 0)
+            card_players.append({
+                "id": row.id,
+                "player_id": row.player_id,
+                "team_id": row.team_id,
+                "handicap": handicap,
+                "current": {field: getattr(row, field) for field in MATCH_PLAYER_FIELDS},
+            })
+        scorecards.append({
+            "match_id": match.id,
+            "home_team_id": match.home_team_id,
+            "away_team_id": match.away_team_id,
+            "holes": holes[match.course_id],
+            "players": card_players,
+            "strokes": strokes[match.id],
+            "current": {field: getattr(match, field) for field in MATCH_FIELDS},
+        })
+    return scorecards
+
+def rescore_scorecard(card: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Score one scorecard and return (match update or None, match player updates),
+    containing only the rows whose stored values differ from the new results.
+    """
+    home = [p for p in card["players"] if p["team_id"] == card["home_team_id"]]
+    away = [p for p in card["players"] if p["team_id"] == card["away_team_id"]]
+    results = score_match(
+        card["holes"],
+        [(p["player_id"], p["handicap"]) for p in home],
+        [(p["player_id"], p["handicap"]) for p in away],
+        card["strokes"]
+    )
+
+    player_updates = []
+    for player in home + away:
+        result = results["players"][player["player_id"]]
+        values = {
+            "handicap": player["handicap"],
+            "pops": round_strokes(result["pops"]),
+            "gross_score": result["gross_score"],
+            "net_score": round_strokes(result["net_score"]),
+            "points": result["points"],
+        }
+        if values != player["current"]:
+            player_updates.append({
+                "id": player["id"],
+                "player_id": player["player_id"],
+                "gross_changed": values["gross_score"] != player["current"]["gross_score"],
+                **values
+            })
+
+    match_values = {}
+    for team in ("home", "away"):
+        team_result = results[f"{team}_team"]
+        match_values[f"{team}_team_gross_score"] = team_result["gross_score"]
+        match_values[f"{team}_team_net_score"] = round_strokes(team_result["net_score"])
+        match_values[f"{team}_team_points"] = team_result["points"]
+    match_update = {"id": card["match_id"], **match_values} if match_values != card["current"] else None
+
+    return match_update, player_updates
+
+def _write_batches(db: Session, table, fields, rows: List[Dict[str, Any]], batch_size: int):
+    """UPDATE rows by id, batch_size rows per executemany"""
+    statement = update(table).where(table.c.id == bindparam("b_id")).values(
+        **{field: bindparam(f"b_{field}") for field in fields}
+    )
+    connection = db.connection()
+    for start in range(0, len(rows), batch_size):
+        connection.execute(statement, [
+            {"b_id": row["id"], **{f"b_{field}": row[field] for field in fields}}
+            for row in rows[start:start + batch_size]
+        ])
+
+def rescore_league(
+    db: Session,
+    league_id: int,
+    workers: Optional[int] = None,
+    batch_size: int = 500,
+    handicaps_from_history: bool = False,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> Dict[str, Any]:
+    """
+    Rescore every match of a league with hole scores and refresh the league's
+    rollups, without committing. workers=None uses one process per CPU;
+    workers=1 scores in this process. progress(done, total) is called as
+    matches are scored.
+    """
+    started = time.perf_counter()
+    scorecards = load_league_scorecards(db, league_id, handicaps_from_history)
+    total = len(scorecards)
+
+    match_updates, player_updates = [], []
+    if workers == 1 or total < MIN_PARALLEL_MATCHES:
+        results = map(rescore_scorecard, scorecards)
+        pool = None
+    else:
+        workers = workers or os.cpu_count() or 1
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(rescore_scorecard, scorecards, chunksize=max(1, total // (4 * workers)))
+
+    try:
+        for done, (match_update, updates) in enumerate(results, start=1):
+            if match_update:
+                match_updates.append(match_update)
+            player_updates.extend(updates)
+            if progress:
+                progress(done, total)
+    finally:
+        if pool:
+            pool.shutdown()
+
+    _write_batches(db, MatchPlayer.__table__, MATCH_PLAYER_FIELDS, player_updates, batch_size)
+    _write_batches(db, Match.__table__, MATCH_FIELDS, match_updates, batch_size)
+
+    if match_updates or player_updates:
+        player_league_stats_crud.rebuild_league_player_stats(db, league_id)
+        team_league_standings_crud.rebuild_league_team_standings(db, league_id)
+        # Bulk UPDATEs bypass the flush listener
+        stats_cache.mark_league_changed(db, league_id)
+
+    rescored_players = {update["player_id"] for update in player_updates if update["gross_changed"]}
+    if settings.HANDICAP_AUTO_UPDATE and rescored_players:
+        handicap_crud.update_player_handicaps(db, league_id, rescored_players)
+
+    return {
+        "league_id": league_id,
+        "matches": total,
+        "matches_updated": len(match_updates),
+        "match_players_updated": len(player_updates),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
@@ -1,15 +1,22 @@
 import os
+from contextlib import contextmanager
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy_utils import database_exists, create_database, drop_database
 
 # Set testing mode BEFORE importing anything else
 os.environ["TESTING"] = "1"
+# Fail any request that goes over its endpoint's query budget
+os.environ.setdefault("QUERY_BUDGET_MODE", "raise")
 
 # Import after setting testing mode
 from app.db.session import get_db
+from app.api.deps import get_current_active_user
+from app.core.stats_cache import response_cache
+from app.core.token_cache import access_tokens
+from app.core.user_cache import user_principals
 from app.main import app
 
 # Create a test database URL - use in-memory SQLite for tests
@@ -62,6 +69,140 @@ def client(db):
             pass
     
     app.dependency_overrides[get_db] = override_get_db
+    # Rolled-back test data reuses ids, so never serve a previous test's responses
+    response_cache.clear()
+    access_tokens.clear()
+    user_principals.clear()
     with TestClient(app) as client:
         yield client
-    app.dependency_overrides.clear()
\ No newline at end of file
+    app.dependency_overrides.clear()
+
+@pytest.fixture
+def count_queries():
+    """Context manager collecting every SQL statement run on the test engine"""
+    @contextmanager
+    def counter():
+        statements = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        event.listen(test_engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(test_engine, "before_cursor_execute", record)
+    
+    return counter
+
+@pytest.fixture
+def auth_client(client, db):
+    """TestClient whose requests run as an active superuser"""
+    from app.models.user import User
+    
+    user = User(
+        email="tester@example.com",
+        username="tester",
+        hashed_password="not-used",
+        is_active=True,
+        is_superuser=True
+    )
+    db.add(user)
+    db.commit()
+    
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    yield client
+
+def seed_league_season(db):
+    """League with a 9-hole course, four two-player teams and two weeks of scheduled matches"""
+    from datetime import date, timedelta
+    from app.models.course import Course
+    from app.models.hole import Hole
+    from app.models.league import League
+    from app.models.team import Team
+    from app.models.player import Player
+    from app.models.week import Week
+    from app.models.match import Match
+    from app.models.match_player import MatchPlayer
+    
+    course = Course(name="Season Course", total_par=36)
+    db.add(course)
+    db.flush()
+    holes = [
+        Hole(number=number, par=4, handicap=((number * 5) % 9) + 1, course_id=course.id)
+        for number in range(1, 10)
+    ]
+    db.add_all(holes)
+    
+    teams = []
+    for team_number in range(4):
+        team = Team(name=f"Season Team {team_number + 1}")
+        team.players = [
+            Player(first_name=f"Team{team_number + 1}", last_name=f"Player{player_number + 1}", handicap=float(4 * team_number + player_number))
+            for player_number in range(2)
+        ]
+        teams.append(team)
+    
+    league = League(
+        name="Season League",
+        handicap_required_scores=1,
+        handicap_recent_scores_used=5,
+        handicap_perecentage_to_par=80
+    )
+    league.teams = teams
+    league.courses = [course]
+    db.add(league)
+    db.flush()
+    
+    weeks = []
+    matches = []
+    start = date(2025, 5, 6)
+    for week_number in range(2):
+        week = Week(
+            week_number=week_number + 1,
+            start_date=start + timedelta(days=7 * week_number),
+            end_date=start + timedelta(days=7 * week_number + 6),
+            league_id=league.id
+        )
+        db.add(week)
+        db.flush()
+        weeks.append(week)
+        
+        pairings = [(0, 1), (2, 3)] if week_number == 0 else [(0, 2), (1, 3)]
+        for home_index, away_index in pairings:
+            home_team, away_team = teams[home_index], teams[away_index]
+            match = Match(
+                match_date=week.start_date,
+                week_id=week.id,
+                course_id=course.id,
+                home_team_id=home_team.id,
+                away_team_id=away_team.id,
+                is_completed=False
+            )
+            db.add(match)
+            db.flush()
+            for team in (home_team, away_team):
+                for player in team.players:
+                    db.add(MatchPlayer(
+                        match_id=match.id,
+                        team_id=team.id,
+                        player_id=player.id,
+                        handicap=round(player.handicap),
+                        is_substitute=False,
+                        is_active=True
+                    ))
+            matches.append(match)
+    
+    db.commit()
+    return {
+        "course": course,
+        "holes": holes,
+        "league": league,
+        "teams": teams,
+        "weeks": weeks,
+        "matches": matches
+    }
+
+@pytest.fixture
+def setup_league_season(db):
+    return seed_league_season(db)
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+from app.core.token_cache import AccessTokenCache, CachedAccessToken, access_tokens
+from app.crud import access_token as access_token_crud
+from app.models.match import MatchAccessToken
+from app.tests.test_match_scores import add_access_tokens, team_card
+
+def test_validated_tokens_are_cached_until_rotated(auth_client, db, setup_league_season, count_queries):
+    season = setup_league_season
+    match = season["matches"][0]
+    tokens = add_access_tokens(db, match)
+
+    first = auth_client.get(f"/api/matches/validate-token/{tokens['home']}")
+    assert first.status_code == 200
+    assert first.json()["team_name"] == season["teams"][0].name
+    with count_queries() as statements:
+        again = auth_client.get(f"/api/matches/validate-token/{tokens['home']}")
+    assert again.json() == first.json()
+    assert statements == []
+
+    # Saving team scores reuses the cached token: roster, upsert, league lookup
+    # and the league's version bump
+    card = team_card(db, match, match.home_team_id, season["holes"][:1], 4)
+    with count_queries() as statements:
+        auth_client.post(f"/api/matches/{match.id}/team-scores", params={"token": tokens["home"]}, json={"scores": card})
+    assert len([s for s in statements if not s.startswith(("SAVEPOINT", "RELEASE"))]) == 4
+
+    # Regenerating the match's tokens retires the cached ones at once
+    rotated = auth_client.post(f"/api/matches/{match.id}/access-tokens").json()
+    assert auth_client.get(f"/api/matches/validate-token/{tokens['home']}").status_code == 404
+    response = auth_client.post(f"/api/matches/{match.id}/team-scores", params={"token": tokens["home"]}, json={"scores": card})
+    assert response.status_code == 403
+    assert auth_client.get(f"/api/matches/validate-token/{rotated[0]['token']}").status_code == 200
+
+def test_expired_tokens_are_refused_and_reaped(auth_client, db, setup_league_season):
+    match = setup_league_season["matches"][0]
+    now = datetime.now()
+    db.add_all([
+        MatchAccessToken(match_id=match.id, team_id=match.home_team_id, token="expiring", expires_at=now + timedelta(seconds=60)),
+        MatchAccessToken(match_id=match.id, team_id=match.away_team_id, token="expired", expires_at=now - timedelta(days=1)),
+    ])
+    db.commit()
+
+    assert auth_client.get("/api/matches/validate-token/expiring").status_code == 200
+    assert auth_client.get("/api/matches/validate-token/expired").status_code == 403
+    # A cached token still expires on time
+    assert access_tokens.get("expiring").is_expired(now + timedelta(seconds=61))
+
+    assert access_token_crud.delete_expired_tokens(db, now) == 1
+    db.commit()
+    assert [token.token for token in db.query(MatchAccessToken).all()] == ["expiring"]
+
+def test_token_cache_is_bounded(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("app.core.ttl_cache.time.monotonic", lambda: clock[0])
+    cache = AccessTokenCache(max_entries=2, ttl_seconds=30)
+    for n in range(3):
+        cache.put(f"t{n}", CachedAccessToken(n % 2, n, None, None, None))
+    # The least recently used entry made room
+    assert cache.get("t0") is None and len(cache) == 2
+
+    clock[0] += 31
+    assert cache.get("t1") is None
+    cache.put("t1", CachedAccessToken(1, 1, None, None, None))
+    cache.invalidate_match(1)
+    assert cache.get("t1") is None
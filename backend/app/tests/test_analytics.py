@@ -0,0 +1,123 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app import analytics
+from app.models.match_player import MatchPlayer
+
+def random_rounds(count, players=12, seed=3):
+    """(player_id, team_id, match_id, match_date, gross, net, points) rows with some missing scores"""
+    rng = random.Random(seed)
+    rows = []
+    for match_id in range(1, count + 1):
+        gross = rng.randint(35, 55) if rng.random() > 0.1 else None
+        rows.append((
+            rng.randint(1, players),
+            rng.randint(1, 4),
+            match_id,
+            date(2025, 4, 1) + timedelta(days=rng.randint(0, 120)),
+            gross,
+            (gross - rng.randint(0, 9)) if gross is not None and rng.random() > 0.05 else None,
+            rng.choice([0.0, 0.5, 1.0, 2.0, None])
+        ))
+    return rows
+
+def reference_player_metrics(rows):
+    """Straightforward per-row Python version of analytics.player_metrics"""
+    by_player = {}
+    for row in sorted(rows, key=lambda r: (r[0], r[3], r[2])):
+        by_player.setdefault(row[0], []).append(row)
+    
+    metrics = {}
+    for player_id, player_rows in by_player.items():
+        gross = [r[4] for r in player_rows if r[4] is not None]
+        net = [r[5] for r in player_rows if r[4] is not None and r[5] is not None]
+        points = [r[6] for r in player_rows if r[6] is not None]
+        metrics[player_id] = {
+            "latest_team_id": player_rows[-1][1],
+            "rounds_played": len(gross),
+            "avg_gross": sum(gross) / len(gross) if gross else None,
+            "lowest_gross": min(gross, default=None),
+            "avg_net": sum(net) / len(net) if net else None,
+            "lowest_net": min(net, default=None),
+            "total_points": sum(points),
+            "best_points": max(points, default=None),
+        }
+    return metrics
+
+def test_player_metrics_match_row_by_row_reference():
+    rows = random_rounds(2000)
+    expected = reference_player_metrics(rows)
+    actual = {row["player_id"]: row for row in analytics.to_records(analytics.player_metrics(analytics.SeasonFrame.from_rows(rows)))}
+    
+    assert set(actual) == set(expected)
+    for player_id, reference in expected.items():
+        for field, value in reference.items():
+            if value is None:
+                assert actual[player_id][field] is None, field
+            else:
+                assert actual[player_id][field] == pytest.approx(value), field
+
+def test_most_improved_uses_first_rounds_in_date_order():
+    start = date(2025, 4, 1)
+    rows = [
+        # Player 1 starts at 50 and settles at 40; inserted out of date order on purpose
+        (1, 1, 4, start + timedelta(days=21), 40, None, None),
+        (1, 1, 1, start, 50, None, None),
+        (1, 1, 3, start + timedelta(days=14), 44, None, None),
+        (1, 1, 2, start + timedelta(days=7), 47, None, None),
+        (1, 1, 5, start + timedelta(days=28), None, None, None),
+        # Player 2 has too few gross rounds
+        (2, 2, 1, start, 45, None, None),
+        (2, 2, 2, start + timedelta(days=7), 45, None, None),
+    ]
+    improved = analytics.to_records(analytics.most_improved(analytics.SeasonFrame.from_rows(rows)))
+    
+    assert len(improved) == 1
+    assert improved[0]["player_id"] == 1
+    assert improved[0]["total_rounds"] == 4
+    assert improved[0]["initial_avg"] == pytest.approx(47.0)
+    assert improved[0]["overall_avg"] == pytest.approx(45.25)
+    assert improved[0]["improvement"] == pytest.approx(1.75)
+
+def test_empty_season():
+    frame = analytics.SeasonFrame.from_rows([])
+    assert len(frame) == 0
+    assert analytics.to_records(analytics.player_metrics(frame)) == []
+    assert analytics.to_records(analytics.team_metrics(frame)) == []
+    assert analytics.to_records(analytics.most_improved(frame)) == []
+
+def test_most_improved_endpoint(auth_client, db, setup_league_season):
+    """Players need four gross rounds; the endpoint ranks them by improvement"""
+    season = setup_league_season
+    league_id = season["league"].id
+    match = season["matches"][0]
+    match_players = db.query(MatchPlayer).filter(MatchPlayer.match_id == match.id).all()
+    
+    # Three more rounds for each week-one player on fresh matches in later weeks
+    from app.models.match import Match
+    for offset, week in enumerate([season["weeks"][1]] * 3, start=1):
+        extra = Match(
+            match_date=week.start_date + timedelta(days=offset), week_id=week.id,
+            course_id=season["course"].id, home_team_id=match.home_team_id, away_team_id=match.away_team_id
+        )
+        db.add(extra)
+        db.flush()
+        for index, match_player in enumerate(match_players):
+            db.add(MatchPlayer(
+                match_id=extra.id, player_id=match_player.player_id, team_id=match_player.team_id,
+                handicap=10.0, gross_score=45 - offset * index
+            ))
+    for index, match_player in enumerate(match_players):
+        match_player.gross_score = 45
+    db.commit()
+    
+    response = auth_client.get(f"/api/player-stats/league/{league_id}/most-improved?limit=2")
+    assert response.status_code == 200
+    improved = response.json()
+    assert len(improved) == 2
+    assert [row["total_rounds"] for row in improved] == [4, 4]
+    assert improved[0]["improvement"] >= improved[1]["improvement"]
+    assert improved[0]["improvement_display"].startswith("+")
+    assert improved[0]["player_name"]
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.api.deps import get_current_user
+from app.core import security
+from app.core.security import PasswordHashPool, PasswordHashPoolFull, create_access_token
+from app.core.settings import settings
+from app.core.user_cache import user_principals
+from app.crud import user as user_crud
+from app.models.user import User
+
+@pytest.fixture
+def member(db):
+    user = User(email="member@example.com", username="member", hashed_password="not-used", is_active=True)
+    db.add(user)
+    db.commit()
+    user_principals.clear()
+    yield user
+    user_principals.clear()
+
+def test_authenticated_users_are_cached_per_token(db, member, count_queries):
+    token = create_access_token(member.id)
+    assert get_current_user(db, token).username == "member"
+
+    with count_queries() as statements:
+        cached = get_current_user(db, token)
+    assert statements == []
+    assert (cached.id, cached.username, cached.is_active) == (member.id, "member", True)
+    # Each request gets its own instance, outside any session
+    assert cached is not get_current_user(db, token) and cached not in db
+
+    # Updates and deactivation are seen by the next request
+    user_crud.update(db, member, {"first_name": "Renamed", "is_active": False})
+    with count_queries() as statements:
+        current = get_current_user(db, token)
+    assert len(statements) == 1
+    assert (current.first_name, current.is_active) == ("Renamed", False)
+    assert not user_crud.is_active(current)
+
+def test_token_revocation(db, member, monkeypatch):
+    token = create_access_token(member.id)
+    get_current_user(db, token)
+
+    # Off by default: deactivating leaves tokens to the is_active check
+    user_crud.update(db, member, {"is_active": False})
+    user_crud.update(db, member, {"is_active": True})
+    assert get_current_user(db, token).is_active
+
+    monkeypatch.setattr(settings, "AUTH_TOKEN_REVOCATION", True)
+    user_crud.update(db, member, {"is_active": False})
+    user_crud.update(db, member, {"is_active": True})
+    with pytest.raises(HTTPException) as refused:
+        get_current_user(db, token)
+    assert refused.value.status_code == 403
+
+    # Tokens issued later are accepted again
+    user_principals.revoke(member.id, issued_before=0)
+    assert get_current_user(db, create_access_token(member.id)).id == member.id
+
+def test_login_in_the_same_second_as_a_revocation(db, member, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_TOKEN_REVOCATION", True)
+    now = 1_750_000_000.25
+    monkeypatch.setattr(time, "time", lambda: now)
+    old_token = create_access_token(member.id)
+
+    now += 0.5
+    user_crud.update(db, member, {"is_active": False})
+    user_crud.update(db, member, {"is_active": True})
+    with pytest.raises(HTTPException):
+        get_current_user(db, old_token)
+
+    # Logging in again straight away, in the same second or even millisecond
+    assert get_current_user(db, create_access_token(member.id)).id == member.id
+    now += 0.2
+    assert get_current_user(db, create_access_token(member.id)).id == member.id
+
+def test_login_verifies_on_the_hashing_pool_and_upgrades_hashes(client, db, member, monkeypatch, capsys):
+    # A cheap scheme keeps the test fast; raising bcrypt rounds upgrades hashes the same way
+    monkeypatch.setattr(security, "pwd_context", CryptContext(schemes=["pbkdf2_sha256"], pbkdf2_sha256__rounds=1000))
+    member.hashed_password = security.pwd_context.hash("secret")
+    db.commit()
+    before = security.get_password_hash_stats()["completed"]
+
+    monkeypatch.setattr(security, "pwd_context", CryptContext(
+        schemes=["pbkdf2_sha256"], deprecated="auto", pbkdf2_sha256__rounds=2000
+    ))
+    assert client.post("/api/auth/login/json", json={"username": "member", "password": "wrong"}).status_code == 401
+    response = client.post("/api/auth/login/json", json={"username": "member", "password": "secret"})
+    assert response.status_code == 200
+    assert get_current_user(db, response.json()["access_token"]).id == member.id
+
+    db.refresh(member)
+    assert member.hashed_password.startswith("$pbkdf2-sha256$2000$")
+    assert security.pwd_context.verify("secret", member.hashed_password)
+    assert client.get("/health/auth").json()["completed"] == before + 2
+    # Nothing about the login is printed
+    assert capsys.readouterr().out == ""
+
+def test_hashing_pool_is_bounded():
+    release = threading.Event()
+
+    async def scenario():
+        pool = PasswordHashPool(max_workers=1, max_queued=2)
+        running = asyncio.ensure_future(pool.run(release.wait))
+        while pool.get_stats()["running"] == 0:
+            await asyncio.sleep(0.001)
+        waiting = [asyncio.ensure_future(pool.run(len, "pw")) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordHashPoolFull):
+            await pool.run(len, "pw")
+        stats = pool.get_stats()
+        release.set()
+        assert await asyncio.gather(running, *waiting) == [True, 2, 2]
+        return stats, pool.get_stats()
+
+    busy, done = asyncio.run(scenario())
+    assert (busy["running"], busy["queued"], busy["rejected"]) == (1, 2, 1)
+    assert (done["completed"], done["queued"], done["max_queue_depth"]) == (3, 0, 2)
@@ -0,0 +1,238 @@
+import statistics
+from datetime import date
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.settings import settings
+from app.crud import handicap as handicap_crud
+from app.models.league import League
+from app.models.match import Match
+from app.models.match_player import MatchPlayer
+from app.models.player import Player
+from app.models.player_handicap_history import PlayerHandicapHistory
+from app.tests.test_match_scores import scorecard
+from app.tests.test_player_stats import post_match_scores
+
+def reference_handicap(db, player_id, scores_to_use, percentage, exclude_highest=None):
+    """The per-player calculation the update-handicaps task used to run"""
+    rounds = db.query(MatchPlayer).join(Match).filter(
+        MatchPlayer.player_id == player_id,
+        MatchPlayer.gross_score.isnot(None)
+    ).order_by(Match.match_date.desc()).limit(scores_to_use).all()
+    differentials = sorted(mp.gross_score - 36 for mp in rounds)
+    if exclude_highest:
+        differentials = differentials[:-exclude_highest]
+    return round(statistics.mean(differentials) * percentage, 1)
+
+def test_update_handicaps_endpoint(auth_client, db, setup_league_season):
+    season = setup_league_season
+    league_id = season["league"].id
+    post_match_scores(auth_client, db, season["matches"][0], season["holes"], 5, 1.0)
+    post_match_scores(auth_client, db, season["matches"][2], season["holes"], 4, 0.5)
+
+    original = {player.id: player.handicap for team in season["teams"] for player in team.players}
+
+    response = auth_client.post(f"/api/players/leagues/{league_id}/update-handicaps")
+    assert response.status_code == 200
+    assert response.json()["scores_to_use"] == 5
+    assert response.json()["handicap_percentage"] == 0.8
+
+    # The background task ran on its own session once the response was sent
+    db.expire_all()
+    played = {player.id for team in season["teams"][:3] for player in team.players}
+    for team in season["teams"]:
+        for player in team.players:
+            if player.id in played:
+                assert player.handicap == reference_handicap(db, player.id, 5, 0.8)
+            else:
+                assert player.handicap == original[player.id]
+
+    # Unplayed matches pick up the new handicap, rounded to whole strokes
+    for match_player in db.query(MatchPlayer).filter(MatchPlayer.match_id == season["matches"][3].id).all():
+        player = db.get(Player, match_player.player_id)
+        if player.id in played:
+            assert match_player.handicap == handicap_crud.round_half_up(player.handicap, 0)
+
+def test_update_handicaps_rejects_negative_exclusion(auth_client, setup_league_season):
+    league_id = setup_league_season["league"].id
+    response = auth_client.post(f"/api/players/leagues/{league_id}/update-handicaps?exclude_highest=-1")
+    assert response.status_code == 400
+
+def test_batch_recalculation_matches_reference(auth_client, db, setup_league_season, count_queries):
+    season = setup_league_season
+    league_id = season["league"].id
+    for index, match in enumerate(season["matches"]):
+        post_match_scores(auth_client, db, match, season["holes"], 4 + index % 3, 1.0)
+
+    with count_queries() as statements:
+        result = handicap_crud.recalculate_league_handicaps(
+            sessionmaker(bind=db.get_bind()), league_id,
+            min_scores_required=2, scores_to_use=1, handicap_percentage=0.9
+        )
+    # The ranked read, the previous handicaps, one history INSERT, one UPDATE
+    # per table and the league's version bump, however many players there are
+    assert len([s for s in statements if not s.startswith(("SAVEPOINT", "RELEASE"))]) == 6
+    assert result == {"updated": 8, "skipped": 0, "match_players_updated": 0}
+
+    db.expire_all()
+    for team in season["teams"]:
+        for player in team.players:
+            assert player.handicap == reference_handicap(db, player.id, 1, 0.9)
+
+def test_exclusions_and_minimum_scores(auth_client, db, setup_league_season):
+    season = setup_league_season
+    league_id = season["league"].id
+    post_match_scores(auth_client, db, season["matches"][0], season["holes"], 5, 1.0)
+    post_match_scores(auth_client, db, season["matches"][2], season["holes"], 4, 0.5)
+
+    handicaps, skipped = handicap_crud.compute_league_handicaps(
+        db, league_id, min_scores_required=2, scores_to_use=10, handicap_percentage=1.0, exclude_highest=1
+    )
+    # Only team 1 has two rounds; teams 2 and 3 have one round, below the minimum
+    assert set(handicaps) == {player.id for player in season["teams"][0].players}
+    assert skipped == 4
+    for player_id, handicap in handicaps.items():
+        assert handicap == reference_handicap(db, player_id, 10, 1.0, exclude_highest=1)
+
+    # Excluding every round leaves nothing to average
+    handicaps, skipped = handicap_crud.compute_league_handicaps(
+        db, league_id, min_scores_required=1, scores_to_use=10, handicap_percentage=1.0, exclude_highest=2
+    )
+    assert handicaps == {}
+    assert skipped == 6
+
+def assert_matches_full_recompute(db, league_id):
+    league = db.get(League, league_id)
+    expected, _ = handicap_crud.compute_league_handicaps(
+        db, league_id, **handicap_crud.get_league_handicap_settings(league)
+    )
+    assert expected
+    db.expire_all()
+    for player_id, handicap in expected.items():
+        assert db.get(Player, player_id).handicap == handicap
+        pending = db.query(MatchPlayer).filter(
+            MatchPlayer.player_id == player_id,
+            MatchPlayer.gross_score.is_(None)
+        ).all()
+        assert all(mp.handicap == handicap_crud.round_half_up(handicap, 0) for mp in pending)
+
+def test_saving_scores_updates_handicaps_incrementally(auth_client, db, setup_league_season):
+    season = setup_league_season
+    league_id = season["league"].id
+
+    post_match_scores(auth_client, db, season["matches"][0], season["holes"], 6, 1.0)
+    assert_matches_full_recompute(db, league_id)
+
+    post_match_scores(auth_client, db, season["matches"][2], season["holes"], 4, 1.0)
+    post_match_scores(auth_client, db, season["matches"][1], season["holes"], 5, 1.0)
+    assert_matches_full_recompute(db, league_id)
+
+    # Rescoring replaces the round in the window rather than adding to it
+    post_match_scores(auth_client, db, season["matches"][0], season["holes"], 3, 1.0)
+    assert_matches_full_recompute(db, league_id)
+
+def test_scores_for_a_match_in_progress_leave_handicaps_alone(auth_client, db, setup_league_season):
+    season = setup_league_season
+    league_id = season["league"].id
+    match = season["matches"][0]
+    original = {player.id: player.handicap for team in season["teams"] for player in team.players}
+    history = db.query(PlayerHandicapHistory).count()
+
+    # A first hole entered live, then a full card saved mid-round
+    cell = scorecard(db, match, season["holes"][:1], 4)[0]
+    assert auth_client.patch(f"/api/matches/{match.id}/scores", json={"scores": [cell]}).status_code == 200
+    scores = scorecard(db, match, season["holes"], 6)
+    assert auth_client.post(f"/api/matches/{match.id}/scores", json={"scores": scores}).status_code == 200
+
+    db.expire_all()
+    assert not db.get(Match, match.id).is_completed
+    for player_id, handicap in original.items():
+        assert db.get(Player, player_id).handicap == handicap
+    assert db.query(PlayerHandicapHistory).count() == history
+
+    # Completing the match counts the round
+    response = auth_client.post(f"/api/matches/{match.id}/scores", json={"scores": scores, "is_completed": True})
+    assert response.status_code == 200
+    assert_matches_full_recompute(db, league_id)
+
+def test_untouched_players_keep_their_handicap(auth_client, db, setup_league_season, monkeypatch):
+    season = setup_league_season
+    original = {player.id: player.handicap for team in season["teams"] for player in team.players}
+
+    post_match_scores(auth_client, db, season["matches"][0], season["holes"], 6, 1.0)
+    db.expire_all()
+    for team in season["teams"][2:]:
+        for player in team.players:
+            assert player.handicap == original[player.id]
+
+    monkeypatch.setattr(settings, "HANDICAP_AUTO_UPDATE", False)
+    post_match_scores(auth_client, db, season["matches"][1], season["holes"], 6, 1.0)
+    db.expire_all()
+    for team in season["teams"][2:]:
+        for player in team.players:
+            assert player.handicap == original[player.id]
+
+def history_for(db, player_id):
+    return db.query(PlayerHandicapHistory).filter(
+        PlayerHandicapHistory.player_id == player_id
+    ).order_by(PlayerHandicapHistory.id).all()
+
+def test_handicap_changes_are_recorded(auth_client, db, setup_league_season):
+    season = setup_league_season
+    league_id = season["league"].id
+    player = season["teams"][0].players[0]
+    # Creating the roster recorded each starting handicap
+    assert [row.source for row in history_for(db, player.id)] == ["manual"]
+
+    response = auth_client.put(f"/api/players/{player.id}", json={"handicap": 12.5})
+    assert response.status_code == 200
+    # Saving the same value again is not a change
+    auth_client.put(f"/api/players/{player.id}", json={"handicap": 12.5})
+    rows = history_for(db, player.id)
+    assert [(row.handicap, row.source, row.league_id) for row in rows[1:]] == [(12.5, "manual", None)]
+
+    post_match_scores(auth_client, db, season["matches"][0], season["holes"], 6, 1.0)
+    db.expire_all()
+    rows = history_for(db, player.id)
+    assert rows[-1].source == "scores"
+    assert rows[-1].league_id == league_id
+    assert rows[-1].handicap == db.get(Player, player.id).handicap
+
+    # A full recalculation with the same result adds nothing
+    count = len(rows)
+    handicap_crud.recalculate_league_handicaps(
+        sessionmaker(bind=db.get_bind()), league_id, **handicap_crud.get_league_handicap_settings(season["league"])
+    )
+    assert len(history_for(db, player.id)) == count
+
+def test_league_handicaps_as_of_date(auth_client, db, setup_league_season, count_queries):
+    season = setup_league_season
+    league_id = season["league"].id
+    first, second = season["teams"][0].players
+    handicap_crud.record_handicap_changes(db, {first.id: 10.0, second.id: 4.0}, "recalculation", league_id, date(2025, 5, 1))
+    handicap_crud.record_handicap_changes(db, {first.id: 8.5}, "recalculation", league_id, date(2025, 5, 8))
+    handicap_crud.record_handicap_changes(db, {first.id: 7.0}, "manual", None, date(2025, 5, 8))
+    db.commit()
+
+    with count_queries() as statements:
+        players = handicap_crud.get_league_handicaps_as_of(db, league_id, date(2025, 5, 7))
+    assert len(statements) == 1
+    by_id = {row["player_id"]: row for row in players}
+    assert len(by_id) == 8
+    assert by_id[first.id]["handicap"] == 10.0
+    assert by_id[second.id]["handicap"] == 4.0
+    # Other players' history starts today
+    assert by_id[season["teams"][1].players[0].id]["handicap"] is None
+
+    response = auth_client.get(f"/api/players/leagues/{league_id}/handicaps", params={"as_of": "2025-05-08"})
+    assert response.status_code == 200
+    by_id = {row["player_id"]: row for row in response.json()["players"]}
+    # The later of two same-day changes wins
+    assert by_id[first.id]["handicap"] == 7.0
+    assert by_id[first.id]["effective_date"] == "2025-05-08"
+
+    response = auth_client.get(f"/api/players/leagues/{league_id}/handicaps")
+    by_id = {row["player_id"]: row for row in response.json()["players"]}
+    assert all(row["handicap"] is not None for row in by_id.values())
+
+    assert auth_client.get("/api/players/leagues/999999/handicaps").status_code == 404
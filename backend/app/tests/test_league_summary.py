@@ -0,0 +1,84 @@
+from datetime import date, timedelta
+
+from app.core import stats_cache
+from app.crud import league_summary as league_summary_crud
+from app.tests.test_player_stats import post_match_scores
+
+def test_summary_matches_individual_endpoints(auth_client, db, setup_league_season, count_queries):
+    """Each summary section equals the response of the endpoint the report used to call"""
+    season = setup_league_season
+    league_id = season["league"].id
+    weeks = season["weeks"]
+    
+    post_match_scores(auth_client, db, season["matches"][0], season["holes"], 5, 1.0)
+    post_match_scores(auth_client, db, season["matches"][1], season["holes"], 4, 0.5)
+    
+    with count_queries() as statements:
+        response = auth_client.get(f"/api/leagues/{league_id}/summary")
+    assert response.status_code == 200
+    summary = response.json()
+    assert len(statements) <= 11
+    
+    def get(path):
+        result = auth_client.get(f"/api{path}")
+        assert result.status_code == 200
+        return result.json()
+    
+    assert summary["selected_week"]["id"] == weeks[-1].id
+    assert summary["previous_week"]["id"] == weeks[0].id
+    assert summary["weeks"] == get(f"/leagues/{league_id}/weeks")
+    assert summary["week_matches"] == get(f"/matches/weeks/{weeks[-1].id}/matches")
+    assert summary["previous_week_matches"] == get(f"/matches/weeks/{weeks[0].id}/matches")
+    assert summary["leaderboard"] == get(f"/leagues/{league_id}/leaderboard")
+    assert summary["player_stats"] == get(f"/player-stats/league/{league_id}/player-stats")
+    assert summary["mvp"] == get(f"/player-stats/league/{league_id}/mvp?limit=5")
+    assert summary["most_improved"] == get(f"/player-stats/league/{league_id}/most-improved?limit=5")
+    
+    rankings = summary["rankings"]
+    for score_type in ("gross", "net"):
+        team_scores = get(f"/team-stats/league/{league_id}/top-scores?limit=5&score_type={score_type}")
+        assert [row["score"] for row in rankings[f"top_team_{score_type}"]] == [row["score"] for row in team_scores]
+        player_scores = get(f"/player-stats/league/{league_id}/top-scores?limit=5&score_type={score_type}")
+        assert [row["score"] for row in rankings[f"top_individual_{score_type}"]] == [row["score"] for row in player_scores]
+
+def test_summary_selected_week_and_makeup_matches(auth_client, db, setup_league_season):
+    season = setup_league_season
+    league_id = season["league"].id
+    first_week = season["weeks"][0]
+    
+    response = auth_client.get(f"/api/leagues/{league_id}/summary?week_id={first_week.id}")
+    assert response.status_code == 200
+    summary = response.json()
+    assert summary["selected_week"]["id"] == first_week.id
+    assert summary["previous_week"] is None
+    assert {match["week_id"] for match in summary["week_matches"]} == {first_week.id}
+    # Makeup matches never include the report week itself
+    assert all(match["week_id"] != first_week.id for match in summary["makeup_matches"])
+    
+    assert auth_client.get(f"/api/leagues/{league_id}/summary?week_id=999999").status_code == 404
+    assert auth_client.get("/api/leagues/999999/summary").status_code == 404
+
+def test_makeup_matches_follow_the_date_when_cached(auth_client, db, setup_league_season, monkeypatch):
+    season = setup_league_season
+    first_week = season["weeks"][0]
+    url = f"/api/leagues/{season['league'].id}/summary"
+    
+    class Today(date):
+        current = first_week.end_date
+        
+        @classmethod
+        def today(cls):
+            return cls.current
+    
+    monkeypatch.setattr(stats_cache, "date", Today)
+    monkeypatch.setattr(league_summary_crud, "date", Today)
+    
+    during = auth_client.get(url)
+    assert all(match["week_id"] != first_week.id for match in during.json()["makeup_matches"])
+    
+    # Nothing was written, but the week is over the next day
+    Today.current = first_week.end_date + timedelta(days=1)
+    after = auth_client.get(url, headers={"If-None-Match": during.headers["etag"]})
+    assert after.status_code == 200
+    assert after.headers["etag"] != during.headers["etag"]
+    assert {match["week_id"] for match in after.json()["makeup_matches"]} == {first_week.id}
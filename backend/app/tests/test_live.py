@@ -0,0 +1,207 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import text
+
+from app.api.endpoints.matches import stream_match_scores
+from app.core import live
+from app.core.security import create_access_token
+from app.core.settings import settings
+from app.tests.conftest import TestSessionLocal
+from app.models.match_player import MatchPlayer
+from app.tests.test_auth import member
+from app.tests.test_match_scores import add_access_tokens, scorecard
+from app.tests.test_player_stats import post_match_scores
+
+@pytest.fixture
+def broker():
+    broker = live.MemoryBroker()
+    live.set_broker(broker)
+    yield broker
+    live.set_broker(None)
+
+def parse(message):
+    fields = dict(line.split(": ", 1) for line in message.strip().split("\n"))
+    return int(fields["id"]), fields["event"], json.loads(fields["data"])
+
+def test_score_saves_are_broadcast_once_committed(auth_client, db, setup_league_season, broker):
+    season = setup_league_season
+    match = season["matches"][0]
+    scores = scorecard(db, match, season["holes"], 5)
+    channel = live.match_channel(match.id)
+
+    async def watch():
+        spectators = [broker.subscribe(channel) for _ in range(3)]
+        await asyncio.to_thread(auth_client.post, f"/api/matches/{match.id}/scores", json={"scores": scores})
+        player_id, hole_id = scores[0]["player_id"], scores[0]["hole_id"]
+        await asyncio.to_thread(
+            auth_client.patch, f"/api/matches/{match.id}/holes/{hole_id}/players/{player_id}", json={"strokes": 3}
+        )
+        received = [[await spectator.get() for _ in range(2)] for spectator in spectators]
+        for spectator in spectators:
+            broker.unsubscribe(spectator)
+        return received
+
+    received = asyncio.run(watch())
+    # Every subscriber gets the very same serialized message
+    assert all(messages[1] is received[0][1] for messages in received)
+
+    event_id, event_type, full_card = parse(received[0][0])
+    assert (event_id, event_type) == (1, "scores")
+    assert len(full_card["scores"]) == 36
+
+    event_id, _, update = parse(received[0][1])
+    assert event_id == 2
+    assert update["scores"] == [{"player_id": scores[0]["player_id"], "hole_id": scores[0]["hole_id"], "strokes": 3}]
+    db.refresh(match)
+    assert update["home_team"]["points"] == match.home_team_points
+    player = next(p for p in update["players"] if p["player_id"] == scores[0]["player_id"])
+    assert player["gross_score"] == 5 * len(season["holes"]) - 2
+    assert broker.subscriber_count() == 0
+
+def test_rolled_back_writes_publish_nothing(broker):
+    async def scenario():
+        subscription = broker.subscribe("match:1")
+        with TestSessionLocal() as session:
+            session.execute(text("SELECT 1"))
+            live.publish_on_commit(session, "match:1", "scores", {"n": 1})
+            session.rollback()
+            session.execute(text("SELECT 1"))
+            live.publish_on_commit(session, "match:1", "scores", {"n": 2})
+            session.commit()
+        message = await asyncio.wait_for(subscription.get(), 1)
+        broker.unsubscribe(subscription)
+        return message
+
+    assert parse(asyncio.run(scenario()))[2] == {"n": 2}
+    assert broker.published == 1
+
+def test_event_stream_keepalive_and_slow_subscribers(broker, monkeypatch):
+    monkeypatch.setattr(settings, "LIVE_KEEPALIVE_SECONDS", 0.01)
+
+    async def scenario():
+        stream = live.stream_events("match:7")
+        assert (await anext(stream)).startswith("retry: ")
+        assert await anext(stream) == ": keepalive\n\n"
+        await asyncio.to_thread(broker.publish, "match:7", "scores", {"match_id": 7})
+        assert parse(await anext(stream))[2] == {"match_id": 7}
+        await stream.aclose()
+        assert broker.subscriber_count("match:7") == 0
+
+        # A subscriber that stops reading is cut off instead of queueing forever
+        slow = live.MemoryBroker(max_queued=2)
+        subscription = slow.subscribe("match:7")
+        for n in range(5):
+            slow.publish("match:7", "scores", {"n": n})
+        await asyncio.sleep(0)
+        assert await subscription.get() is None
+        slow.unsubscribe(subscription)
+        return slow.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["dropped_subscribers"] == 1
+    assert stats["published"] == 5
+
+def test_stream_takes_its_token_from_the_query(client, db, setup_league_season, member):
+    match = setup_league_season["matches"][0]
+    url = f"/api/matches/{match.id}/live"
+    assert client.get(url).status_code == 401
+    assert client.get(url, params={"access_token": "not-a-token"}).status_code == 403
+    assert client.get(url, params={"token": "not-a-token"}).status_code == 403
+
+    # EventSource can only pass credentials in the URL: the user's token or a team's match token
+    user_token = create_access_token(member.id)
+    assert client.get("/api/matches/999999/live", params={"access_token": user_token}).status_code == 404
+    assert client.get("/api/matches/999999/live", headers={"Authorization": f"Bearer {user_token}"}).status_code == 404
+    # A team's token opens its own match's stream, and no other
+    tokens = add_access_tokens(db, match)
+    other_match = setup_league_season["matches"][1]
+    assert client.get(f"/api/matches/{other_match.id}/live", params={"token": tokens["home"]}).status_code == 403
+    response = stream_match_scores(
+        match.id, cursor=None, last_event_id=None, token=tokens["home"],
+        db=TestSessionLocal(bind=db.connection()), current_user=None
+    )
+    assert response.media_type == "text/event-stream"
+
+def test_league_standings_broadcast_on_completion(auth_client, db, setup_league_season, broker):
+    season = setup_league_season
+    league_id = season["league"].id
+    first, second = season["matches"][0], season["matches"][1]
+    channel = live.league_channel(league_id)
+
+    async def watch():
+        viewer = broker.subscribe(channel)
+        # Completing a match publishes the standings once
+        await asyncio.to_thread(post_match_scores, auth_client, db, first, season["holes"], 5, 0)
+        completed = await asyncio.wait_for(viewer.get(), 1)
+        leaderboard = await asyncio.to_thread(auth_client.get, f"/api/leagues/{league_id}/leaderboard")
+
+        # Live scoring of a match that is still in progress leaves the standings alone
+        cells = scorecard(db, second, season["holes"][:1], 4)
+        await asyncio.to_thread(auth_client.patch, f"/api/matches/{second.id}/scores", json={"scores": cells})
+
+        # A correction that moves a completed match's points publishes again
+        home_player = db.query(MatchPlayer).filter(
+            MatchPlayer.match_id == first.id, MatchPlayer.team_id == first.home_team_id
+        ).first().player_id
+        await asyncio.to_thread(
+            auth_client.patch, f"/api/matches/{first.id}/scores",
+            json={"scores": [{"player_id": home_player, "hole_id": hole.id, "strokes": 1} for hole in season["holes"]]}
+        )
+        corrected = await asyncio.wait_for(viewer.get(), 1)
+        broker.unsubscribe(viewer)
+        return completed, leaderboard.json(), corrected
+
+    completed, leaderboard, corrected = asyncio.run(watch())
+    event_id, event_type, snapshot = parse(completed)
+    assert (event_id, event_type) == (1, "standings")
+    assert snapshot["standings"] == leaderboard
+    assert [row["score"] for row in snapshot["top_scores"]["lowest_gross"]] == sorted(
+        row["score"] for row in snapshot["top_scores"]["lowest_gross"]
+    )
+
+    event_id, _, snapshot = parse(corrected)
+    assert event_id == 2
+    assert snapshot["standings"] == auth_client.get(f"/api/leagues/{league_id}/leaderboard").json()
+    assert len(season["holes"]) in [row["score"] for row in snapshot["top_scores"]["lowest_gross"]]
+
+def test_reconnect_cursor_replays_missed_events():
+    broker = live.MemoryBroker(replay_size=3)
+    for n in range(1, 5):
+        broker.publish("league:1", "standings", {"n": n})
+
+    async def resume(last_event_id):
+        subscription = broker.subscribe("league:1", last_event_id)
+        messages = []
+        while not subscription._queue.empty():
+            messages.append(await subscription.get())
+        broker.unsubscribe(subscription)
+        return messages
+
+    assert [parse(m)[0] for m in asyncio.run(resume(2))] == [3, 4]
+    assert asyncio.run(resume(4)) == []
+    assert len(asyncio.run(resume(1))) == 3
+    # Event 1 has already left the buffer, and 9 was never sent (a restart)
+    assert asyncio.run(resume(0)) == [live.RESET_EVENT]
+    assert asyncio.run(resume(9)) == [live.RESET_EVENT]
+
+def test_concurrent_publishes_keep_id_order():
+    broker = live.MemoryBroker(max_queued=1000, replay_size=1000)
+
+    async def scenario():
+        subscription = broker.subscribe("match:1")
+        await asyncio.gather(*(
+            asyncio.to_thread(lambda: [broker.publish("match:1", "scores", {"n": n}) for n in range(50)])
+            for _ in range(8)
+        ))
+        received = [await subscription.get() for _ in range(400)]
+        broker.unsubscribe(subscription)
+        return received
+
+    ids = [parse(message)[0] for message in asyncio.run(scenario())]
+    assert ids == list(range(1, 401))
+    assert [parse(message)[0] for message in broker._replay("match:1", 0)] == ids
+
+def test_league_stream_requires_a_known_league(client):
+    assert client.get("/api/leagues/999999/live").status_code == 404
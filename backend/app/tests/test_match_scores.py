@@ -0,0 +1,419 @@
+import threading
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.api.deps import get_current_active_user
+from app.crud import score as score_crud
+from app.db.base import Base
+from app.db.session import get_db
+from app.main import app
+from app.models.match import MatchAccessToken
+from app.models.match_player import MatchPlayer
+from app.models.score import PlayerScore
+from app.scoring.rescore import load_league_scorecards, rescore_scorecard
+from app.tests.conftest import seed_league_season
+from app.tests.test_player_stats import post_match_scores
+
+def stored_scores(db, match_id):
+    db.expire_all()
+    return {
+        (score.player_id, score.hole_id): score
+        for score in db.query(PlayerScore).filter(PlayerScore.match_id == match_id).all()
+    }
+
+def score_writes(statements):
+    return [
+        statement for statement in statements
+        if statement.startswith(("INSERT", "UPDATE", "DELETE")) and "player_scores" in statement
+    ]
+
+def scorecard(db, match, holes, strokes):
+    return [
+        {"player_id": mp.player_id, "hole_id": hole.id, "strokes": strokes}
+        for mp in db.query(MatchPlayer).filter(MatchPlayer.match_id == match.id).order_by(MatchPlayer.id).all()
+        for hole in holes
+    ]
+
+def test_saving_one_changed_hole_writes_one_row(auth_client, db, setup_league_season, count_queries):
+    season = setup_league_season
+    match = season["matches"][0]
+    scores = scorecard(db, match, season["holes"], 5)
+    assert auth_client.post(f"/api/matches/{match.id}/scores", json={"scores": scores}).status_code == 200
+    before = {key: (score.id, score.strokes) for key, score in stored_scores(db, match.id).items()}
+    assert len(before) == 36
+
+    scores[7]["strokes"] = 3
+    with count_queries() as statements:
+        response = auth_client.post(f"/api/matches/{match.id}/scores", json={"scores": scores})
+    assert response.status_code == 200
+
+    writes = score_writes(statements)
+    assert len(writes) == 1 and writes[0].startswith("INSERT")
+    changed = (scores[7]["player_id"], scores[7]["hole_id"])
+    after = {key: (score.id, score.strokes) for key, score in stored_scores(db, match.id).items()}
+    assert after == {**before, changed: (before[changed][0], 3)}
+
+    # The results are derived from the updated card
+    match_player = db.query(MatchPlayer).filter(
+        MatchPlayer.match_id == match.id, MatchPlayer.player_id == changed[0]
+    ).one()
+    assert match_player.gross_score == 5 * len(season["holes"]) - 2
+
+    # Resubmitting the same card writes no scores at all
+    with count_queries() as statements:
+        auth_client.post(f"/api/matches/{match.id}/scores", json={"scores": scores})
+    assert score_writes(statements) == []
+
+def test_saving_a_card_adds_and_removes_holes(auth_client, db, setup_league_season):
+    season = setup_league_season
+    match = season["matches"][1]
+    post_match_scores(auth_client, db, match, season["holes"], 5, 0)
+    scores = scorecard(db, match, season["holes"], 5)
+
+    # The last hole was entered by mistake
+    last_hole = max(season["holes"], key=lambda hole: hole.number)
+    trimmed = [score for score in scores if score["hole_id"] != last_hole.id]
+    assert auth_client.post(f"/api/matches/{match.id}/scores", json={"scores": trimmed}).status_code == 200
+    assert set(stored_scores(db, match.id)) == {(s["player_id"], s["hole_id"]) for s in trimmed}
+
+    result = score_crud.sync_match_scores(db, match.id, {(s["player_id"], s["hole_id"]): 6 for s in scores})
+    assert len(result) == 36 and set(result.values()) == {6}
+    assert {score.strokes for score in stored_scores(db, match.id).values()} == {6}
+
+    # Limited to some players, other players' scores are left alone
+    player_id = scores[0]["player_id"]
+    result = score_crud.sync_match_scores(db, match.id, {}, player_ids=[player_id])
+    assert result == {(player_id, hole.id): None for hole in season["holes"]}
+    assert len(stored_scores(db, match.id)) == 27
+
+def test_saving_scores_for_a_missing_match_is_not_found(auth_client):
+    response = auth_client.post("/api/matches/999999/scores", json={"scores": []})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Match not found"
+
+def add_access_tokens(db, match):
+    tokens = {}
+    for side, team_id in (("home", match.home_team_id), ("away", match.away_team_id)):
+        tokens[side] = f"{side}-{match.id}"
+        db.add(MatchAccessToken(match_id=match.id, team_id=team_id, token=tokens[side]))
+    db.commit()
+    return tokens
+
+def team_card(db, match, team_id, holes, strokes):
+    return [
+        {"player_id": mp.player_id, "hole_id": hole.id, "strokes": strokes}
+        for mp in db.query(MatchPlayer).filter(
+            MatchPlayer.match_id == match.id, MatchPlayer.team_id == team_id
+        ).order_by(MatchPlayer.id).all()
+        for hole in holes
+    ]
+
+def test_team_scores_are_set_based(auth_client, db, setup_league_season, count_queries):
+    season = setup_league_season
+    match = season["matches"][0]
+    tokens = add_access_tokens(db, match)
+    card = team_card(db, match, match.home_team_id, season["holes"], 5)
+    # The away team's players are not this token's to score
+    intruder = scorecard(db, match, season["holes"][:1], 1)[-1]
+
+    with count_queries() as statements:
+        response = auth_client.post(
+            f"/api/matches/{match.id}/team-scores", params={"token": tokens["home"]},
+            json={"scores": card + [intruder]}
+        )
+    assert response.status_code == 200
+    # Token, roster, one upsert, the league lookup and its version bump, however many holes
+    assert len([s for s in statements if not s.startswith(("SAVEPOINT", "RELEASE"))]) == 5
+
+    stored = stored_scores(db, match.id)
+    assert set(stored) == {(s["player_id"], s["hole_id"]) for s in card}
+
+    card[0]["strokes"] = 8
+    auth_client.post(f"/api/matches/{match.id}/team-scores", params={"token": tokens["home"]}, json={"scores": card})
+    stored = stored_scores(db, match.id)
+    assert stored[(card[0]["player_id"], card[0]["hole_id"])].strokes == 8
+    assert len(stored) == len(card)
+
+def test_concurrent_team_submissions(tmp_path):
+    """Both teams save the same match at once, repeatedly, on separate connections"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'concurrent.db'}", connect_args={"check_same_thread": False, "timeout": 30}
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with Session() as db:
+        season = seed_league_season(db)
+        match = season["matches"][0]
+        tokens = add_access_tokens(db, match)
+        cards = {
+            "home": team_card(db, match, match.home_team_id, season["holes"], 0),
+            "away": team_card(db, match, match.away_team_id, season["holes"], 0),
+        }
+        match_id = match.id
+
+    def session_per_request():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = session_per_request
+    app.dependency_overrides[get_current_active_user] = lambda: None
+    rounds = 10
+    start = threading.Barrier(2)
+    failures = []
+
+    def submit(client, side, offset):
+        for round_number in range(rounds):
+            scores = [{**score, "strokes": offset + round_number} for score in cards[side]]
+            start.wait()
+            response = client.post(f"/api/matches/{match_id}/team-scores", params={"token": tokens[side]}, json={"scores": scores})
+            if response.status_code != 200:
+                failures.append((side, round_number, response.text))
+
+    try:
+        with TestClient(app) as client:
+            threads = [
+                threading.Thread(target=submit, args=(client, "home", 10)),
+                threading.Thread(target=submit, args=(client, "away", 50)),
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    finally:
+        app.dependency_overrides.clear()
+
+    assert failures == []
+    with Session() as db:
+        stored = stored_scores(db, match_id)
+        # Each team's last submission survives in full, and nothing else was written
+        assert len(stored) == len(cards["home"]) + len(cards["away"])
+        for side, offset in (("home", 10), ("away", 50)):
+            assert {stored[(s["player_id"], s["hole_id"])].strokes for s in cards[side]} == {offset + rounds - 1}
+    engine.dispose()
+
+def emulate_row_locks(engine):
+    """
+    SQLite ignores FOR UPDATE, so have a connection that reads with it hold one
+    lock until it is returned to the pool, after its transaction has ended
+    """
+    lock = threading.Lock()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def acquire(conn, cursor, statement, parameters, context, executemany):
+        compiled = getattr(context, "compiled", None)
+        if getattr(getattr(compiled, "statement", None), "_for_update_arg", None) is not None and not conn.info.get("locked"):
+            lock.acquire()
+            conn.info["locked"] = True
+
+    @event.listens_for(engine, "checkin")
+    def release(dbapi_connection, connection_record):
+        if connection_record.info.pop("locked", False):
+            lock.release()
+
+def test_concurrent_team_hole_edits(tmp_path):
+    """Both teams PATCH holes of the same match at once; the match totals always fit the stored card"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'concurrent.db'}", connect_args={"check_same_thread": False, "timeout": 30}
+    )
+    Base.metadata.create_all(bind=engine)
+    emulate_row_locks(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with Session() as db:
+        season = seed_league_season(db)
+        match = season["matches"][0]
+        tokens = add_access_tokens(db, match)
+        cards = {
+            "home": team_card(db, match, match.home_team_id, season["holes"][:3], 0),
+            "away": team_card(db, match, match.away_team_id, season["holes"][:3], 0),
+        }
+        match_id, league_id = match.id, season["league"].id
+
+    def session_per_request():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    inconsistent = []
+
+    def check_totals():
+        with Session() as db:
+            for card in load_league_scorecards(db, league_id):
+                if card["match_id"] == match_id and rescore_scorecard(card) != (None, []):
+                    inconsistent.append(card["strokes"])
+
+    app.dependency_overrides[get_db] = session_per_request
+    app.dependency_overrides[get_current_active_user] = lambda: None
+    rounds = 10
+    start = threading.Barrier(2)
+    done = threading.Barrier(2, action=check_totals)
+    failures = []
+
+    def submit(client, side, strokes):
+        for round_number in range(rounds):
+            # The teams trade holes every round, so both teams' cells move the points
+            scores = [{**score, "strokes": strokes + round_number % 2} for score in cards[side]]
+            start.wait()
+            response = client.patch(f"/api/matches/{match_id}/scores", params={"token": tokens[side]}, json={"scores": scores})
+            if response.status_code != 200:
+                failures.append((side, round_number, response.text))
+            done.wait()
+
+    try:
+        with TestClient(app) as client:
+            threads = [
+                threading.Thread(target=submit, args=(client, "home", 4)),
+                threading.Thread(target=submit, args=(client, "away", 5)),
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    finally:
+        app.dependency_overrides.clear()
+
+    assert failures == []
+    assert inconsistent == []
+    engine.dispose()
+
+def test_patch_one_hole_returns_running_totals(auth_client, db, setup_league_season, count_queries):
+    season = setup_league_season
+    match = season["matches"][0]
+    scores = scorecard(db, match, season["holes"], 5)
+    auth_client.post(f"/api/matches/{match.id}/scores", json={"scores": scores})
+    player_id, hole_id = scores[0]["player_id"], scores[0]["hole_id"]
+
+    with count_queries() as statements:
+        response = auth_client.patch(f"/api/matches/{match.id}/holes/{hole_id}/players/{player_id}", json={"strokes": 3})
+    assert response.status_code == 200
+    assert len(score_writes(statements)) == 1
+
+    body = response.json()
+    match_player = db.query(MatchPlayer).filter(
+        MatchPlayer.match_id == match.id, MatchPlayer.player_id == player_id
+    ).one()
+    db.refresh(match_player)
+    assert body["player"]["gross_score"] == match_player.gross_score == 5 * len(season["holes"]) - 2
+    assert body["player"]["points"] == match_player.points
+    assert body["player"]["holes_played"] == len(season["holes"])
+    db.refresh(match)
+    assert body["team"] == {
+        "team_id": match.home_team_id,
+        "gross_score": match.home_team_gross_score,
+        "net_score": match.home_team_net_score,
+        "points": match.home_team_points,
+    }
+
+    # Clearing the hole removes the score
+    response = auth_client.patch(f"/api/matches/{match.id}/holes/{hole_id}/players/{player_id}", json={"strokes": None})
+    assert response.json()["player"]["holes_played"] == len(season["holes"]) - 1
+    assert (player_id, hole_id) not in stored_scores(db, match.id)
+
+def test_patch_scores_validates_cells(auth_client, db, setup_league_season):
+    season = setup_league_season
+    match = season["matches"][0]
+    tokens = add_access_tokens(db, match)
+    home = team_card(db, match, match.home_team_id, season["holes"][:2], 4)
+    away = team_card(db, match, match.away_team_id, season["holes"][:1], 4)
+
+    response = auth_client.patch(f"/api/matches/{match.id}/scores", json={"scores": home})
+    assert response.status_code == 200
+    body = response.json()
+    assert [player["holes_played"] for player in body["players"]] == [2, 2]
+    assert [team["team_id"] for team in body["teams"]] == [match.home_team_id]
+    assert len(stored_scores(db, match.id)) == 4
+
+    # A team's token only covers its own players
+    url = f"/api/matches/{match.id}/scores"
+    assert auth_client.patch(url, params={"token": tokens["home"]}, json={"scores": away}).status_code == 403
+    assert auth_client.patch(url, params={"token": tokens["away"]}, json={"scores": away}).status_code == 200
+    assert auth_client.patch(url, params={"token": "nope"}, json={"scores": away}).status_code == 403
+
+    other_course_hole = {**away[0], "hole_id": 999999}
+    assert auth_client.patch(url, json={"scores": [other_course_hole]}).status_code == 404
+    bench_player = {**away[0], "player_id": season["teams"][3].players[0].id}
+    assert auth_client.patch(url, json={"scores": [bench_player]}).status_code == 404
+    assert len(stored_scores(db, match.id)) == 6
+
+def sync_operation(key, match, cell, strokes, minute):
+    return {
+        "idempotency_key": key, "match_id": match.id, "player_id": cell["player_id"], "hole_id": cell["hole_id"],
+        "strokes": strokes, "client_timestamp": f"2026-10-17T12:{minute:02d}:00Z",
+    }
+
+def test_sync_applies_batches_across_matches(auth_client, db, setup_league_season, count_queries):
+    season = setup_league_season
+    first, second = season["matches"][0], season["matches"][1]
+    first_cells = scorecard(db, first, season["holes"][:2], 0)
+    second_cells = scorecard(db, second, season["holes"][:1], 0)
+    operations = [
+        sync_operation(f"a{n}", first, cell, 4, 1) for n, cell in enumerate(first_cells)
+    ] + [
+        sync_operation(f"b{n}", second, cell, 5, 1) for n, cell in enumerate(second_cells)
+    ]
+
+    with count_queries() as statements:
+        response = auth_client.post("/api/matches/sync", json={"operations": operations})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["counts"] == {"applied": len(operations)}
+    assert [result["idempotency_key"] for result in body["results"]] == [op["idempotency_key"] for op in operations]
+    # One upsert per match, whatever the number of holes
+    assert len(score_writes(statements)) == 2
+    assert {score.strokes for score in stored_scores(db, first.id).values()} == {4}
+    assert len(stored_scores(db, second.id)) == len(second_cells)
+
+    # A resent batch is recognised and changes nothing
+    operations[0]["strokes"] = 9
+    with count_queries() as statements:
+        replay = auth_client.post("/api/matches/sync", json={"operations": operations}).json()
+    assert replay["counts"] == {"duplicate": len(operations)}
+    assert replay["results"][0]["original_status"] == "applied"
+    assert score_writes(statements) == []
+    assert {score.strokes for score in stored_scores(db, first.id).values()} == {4}
+
+def test_sync_resolves_conflicts_last_writer_wins(auth_client, db, setup_league_season):
+    season = setup_league_season
+    match = season["matches"][0]
+    cell, other = scorecard(db, match, season["holes"][:2], 0)[:2]
+    key = (cell["player_id"], cell["hole_id"])
+
+    response = auth_client.post("/api/matches/sync", json={"operations": [
+        sync_operation("late", match, cell, 6, 30),
+        sync_operation("early", match, cell, 3, 10),
+        sync_operation("again", match, cell, 7, 30),
+        sync_operation("again", match, other, 7, 30),
+        sync_operation("ghost", match, {**cell, "hole_id": 999999}, 4, 30),
+    ]})
+    statuses = [(result["status"], result.get("original_status")) for result in response.json()["results"]]
+    # Equal timestamps go to the later operation; a repeated key counts once
+    assert statuses == [
+        ("superseded", None), ("superseded", None), ("applied", None), ("duplicate", "applied"), ("rejected", None)
+    ]
+    assert stored_scores(db, match.id)[key].strokes == 7
+    # The match was rescored from the synced card
+    match_player = db.query(MatchPlayer).filter(
+        MatchPlayer.match_id == match.id, MatchPlayer.player_id == cell["player_id"]
+    ).one()
+    db.refresh(match_player)
+    assert match_player.gross_score == 7
+
+    # An older offline entry loses to the stored score, a newer one replaces it
+    older = auth_client.post("/api/matches/sync", json={"operations": [sync_operation("old", match, cell, 2, 20)]})
+    assert older.json()["results"][0]["status"] == "stale"
+    newer = auth_client.post("/api/matches/sync", json={"operations": [sync_operation("clear", match, cell, None, 40)]})
+    assert newer.json()["results"][0]["status"] == "applied"
+    assert key not in stored_scores(db, match.id)
+
+    # Clearing a hole is a write too: entries made before it stay out
+    older = auth_client.post("/api/matches/sync", json={"operations": [sync_operation("older", match, cell, 5, 35)]})
+    assert older.json()["results"][0]["status"] == "stale"
+    assert key not in stored_scores(db, match.id)
@@ -0,0 +1,41 @@
+import re
+
+from app.core import metrics
+
+def sample(text, name, **labels):
+    """The value of one sample in Prometheus text output"""
+    wanted = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf"^{name}{{{re.escape(wanted)}}} (\S+)$" if labels else rf"^{name} (\S+)$", text, re.M)
+    return float(match.group(1)) if match else None
+
+def test_metrics_are_recorded_per_route_template(auth_client, setup_league_season, count_queries):
+    season = setup_league_season
+    metrics.registry.clear()
+    for match_id in [match.id for match in season["matches"][:3]]:
+        with count_queries() as statements:
+            assert auth_client.get(f"/api/matches/{match_id}").status_code == 200
+    auth_client.get("/api/matches/999999")
+    auth_client.get("/no/such/route")
+
+    response = auth_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+
+    route = {"method": "GET", "route": "/api/matches/{match_id}"}
+    # Ids are folded into the template; the per-id URLs never appear
+    assert f"/api/matches/{season['matches'][0].id}" not in text
+    assert sample(text, "http_request_duration_seconds_count", **route) == 4
+    assert sample(text, "http_request_duration_seconds_bucket", **route, le="+Inf") == 4
+    assert sample(text, "http_requests_total", **route, status=200) == 3
+    assert sample(text, "http_requests_total", **route, status=404) == 1
+    assert sample(text, "http_requests_total", method="GET", route="unmatched", status=404) == 1
+
+    # Every statement of the three reads, plus the one for the unknown match
+    assert sample(text, "db_statements_total", **route) == 3 * len(statements) + 1
+    assert sample(text, "db_statement_seconds_total", **route) > 0
+    assert sample(text, "http_response_bytes_total", **route) > 0
+
+    assert sample(text, "threadpool_total") == 40
+    assert sample(text, "threadpool_queued") == 0
+    assert sample(text, "password_hash_pool_max_workers") is not None
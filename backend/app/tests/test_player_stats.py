@@ -0,0 +1,163 @@
+import pytest
+from app.models.match_player import MatchPlayer
+from app.models.player_league_stats import PlayerLeagueStats
+
+def post_match_scores(client, db, match, holes, base_strokes, points):
+    """Submit a completed scorecard where every player shoots base_strokes (+1 per player index)"""
+    match_players = db.query(MatchPlayer).filter(MatchPlayer.match_id == match.id).all()
+    scores = []
+    summaries = []
+    for index, match_player in enumerate(match_players):
+        strokes = base_strokes + index % 2
+        scores.extend(
+            {"player_id": match_player.player_id, "hole_id": hole.id, "strokes": strokes}
+            for hole in holes
+        )
+        gross = strokes * len(holes)
+        summaries.append({
+            "player_id": match_player.player_id,
+            "team_id": match_player.team_id,
+            "handicap": match_player.handicap,
+            "pops": 2,
+            "gross_score": gross,
+            "net_score": gross - 2,
+            "points": points
+        })
+    
+    response = client.post(
+        f"/api/matches/{match.id}/scores",
+        json={"scores": scores, "player_summaries": summaries, "is_completed": True}
+    )
+    assert response.status_code == 200
+    return match_players
+
+def assert_rollup_matches_rounds(db, league_id):
+    rows = db.query(PlayerLeagueStats).filter(PlayerLeagueStats.league_id == league_id).all()
+    assert rows
+    for stats in rows:
+        played = db.query(MatchPlayer).filter(
+            MatchPlayer.player_id == stats.player_id,
+            MatchPlayer.gross_score.isnot(None)
+        ).all()
+        assert stats.rounds_played == len(played)
+        assert stats.gross_total == sum(mp.gross_score for mp in played)
+        assert stats.lowest_gross == min((mp.gross_score for mp in played), default=None)
+        assert stats.points_total == pytest.approx(sum(mp.points for mp in played))
+
+def test_rollup_tracks_saved_scores(auth_client, db, setup_league_season):
+    """Saving scores keeps the season rollup equal to the raw MatchPlayer aggregates"""
+    season = setup_league_season
+    league_id = season["league"].id
+    
+    post_match_scores(auth_client, db, season["matches"][0], season["holes"], 5, 1.0)
+    post_match_scores(auth_client, db, season["matches"][2], season["holes"], 4, 0.5)
+    assert_rollup_matches_rounds(db, league_id)
+    
+    # Rescoring a match replaces its contribution rather than adding to it
+    post_match_scores(auth_client, db, season["matches"][0], season["holes"], 6, 2.0)
+    assert_rollup_matches_rounds(db, league_id)
+    
+    response = auth_client.get(f"/api/player-stats/league/{league_id}/player-stats")
+    assert response.status_code == 200
+    by_player = {row["player_id"]: row for row in response.json()}
+    
+    first_player = season["teams"][0].players[0].id
+    assert by_player[first_player]["rounds_played"] == 2
+    assert by_player[first_player]["lowest_gross_score"] in (36, 45)
+
+def test_mvp_reads_points_from_rollup(auth_client, db, setup_league_season):
+    season = setup_league_season
+    league_id = season["league"].id
+    
+    post_match_scores(auth_client, db, season["matches"][0], season["holes"], 5, 1.5)
+    
+    response = auth_client.get(f"/api/player-stats/league/{league_id}/mvp")
+    assert response.status_code == 200
+    leaders = response.json()
+    assert len(leaders) == 4
+    # Points are scored server-side from the hole scores
+    points = {
+        mp.player_id: mp.points
+        for mp in db.query(MatchPlayer).filter(MatchPlayer.match_id == season["matches"][0].id).all()
+    }
+    assert sum(points.values()) > 0
+    assert all(leader["total_points"] == points[leader["player_id"]] for leader in leaders)
+    assert all(leader["rounds_played"] == 1 for leader in leaders)
+
+def test_deleting_match_removes_its_rounds(auth_client, db, setup_league_season):
+    season = setup_league_season
+    league_id = season["league"].id
+    match = season["matches"][0]
+    
+    match_players = post_match_scores(auth_client, db, match, season["holes"], 5, 1.0)
+    player_ids = [mp.player_id for mp in match_players]
+    
+    response = auth_client.delete(f"/api/matches/{match.id}")
+    assert response.status_code == 204
+    
+    remaining = db.query(PlayerLeagueStats).filter(
+        PlayerLeagueStats.league_id == league_id,
+        PlayerLeagueStats.player_id.in_(player_ids)
+    ).all()
+    # The players still have a scheduled week-two match, just no rounds
+    assert all(stats.rounds_played == 0 for stats in remaining)
+
+def add_league_players(db, season, count):
+    """Give every week-one match extra rostered players so per-player lookups would show up"""
+    from app.models.player import Player
+    
+    for index in range(count):
+        match = season["matches"][index % 2]
+        player = Player(first_name="Extra", last_name=str(index), handicap=10.0)
+        db.add(player)
+        db.flush()
+        db.add(MatchPlayer(
+            match_id=match.id, player_id=player.id, team_id=match.home_team_id,
+            handicap=10.0, gross_score=40 + index, net_score=35 + index, points=1.0
+        ))
+    db.commit()
+    from app.crud import player_league_stats as player_league_stats_crud
+    player_league_stats_crud.rebuild_league_player_stats(db, season["league"].id)
+    db.commit()
+
+@pytest.mark.parametrize("path", ["player-stats", "mvp?limit=50"])
+def test_player_endpoints_resolve_teams_in_constant_queries(auth_client, db, setup_league_season, count_queries, path):
+    """Query count must not grow with the number of players listed"""
+    season = setup_league_season
+    league_id = season["league"].id
+    url = f"/api/player-stats/league/{league_id}/{path}"
+    
+    add_league_players(db, season, 2)
+    with count_queries() as small:
+        response = auth_client.get(url)
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    
+    add_league_players(db, season, 20)
+    with count_queries() as large:
+        response = auth_client.get(url)
+    assert response.status_code == 200
+    rows = response.json()
+    assert len(rows) == 22
+    assert len(large) == len(small)
+    assert len(large) <= 4
+    assert all(row["team_name"] != "Unknown Team" for row in rows)
+
+def test_latest_team_names_prefers_newest_match(db, setup_league_season):
+    """A player who changed teams is listed under the team of their latest match"""
+    from app.crud import player_league_stats as player_league_stats_crud
+    
+    season = setup_league_season
+    league_id = season["league"].id
+    week_two_match = season["matches"][3]
+    moved = db.query(MatchPlayer).filter(MatchPlayer.match_id == week_two_match.id).first()
+    original_team_id = moved.team_id
+    new_team = season["teams"][0] if original_team_id != season["teams"][0].id else season["teams"][1]
+    moved.team_id = new_team.id
+    db.commit()
+    
+    teams = player_league_stats_crud.get_latest_team_names(db, league_id)
+    assert teams[moved.player_id] == new_team.name
+    assert len(teams) == 8
+    
+    assert player_league_stats_crud.get_latest_team_names(db, league_id, []) == {}
@@ -0,0 +1,25 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.db.session import InstrumentedQueuePool
+
+def test_only_pool_timeouts_count_as_checkout_timeouts():
+    engine = create_engine(
+        "sqlite://", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.01
+    )
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    assert engine.pool.checkout_timeouts == 1
+    engine.dispose()
+
+    def refuse():
+        raise sqlite3.OperationalError("unable to open database file")
+
+    broken = create_engine("sqlite://", poolclass=InstrumentedQueuePool, creator=refuse)
+    with pytest.raises(exc.OperationalError):
+        broken.connect()
+    assert broken.pool.checkout_timeouts == 0
+    assert broken.pool.checkout_count == 1
@@ -0,0 +1,208 @@
+import importlib
+import pkgutil
+from collections import Counter
+from datetime import date
+
+import pytest
+from fastapi.routing import APIRoute
+
+from app.api import endpoints
+from app.core.query_budget import check_request, get_query_budget
+from app.core.settings import settings
+from app.db.session import get_db
+from app.main import app
+from app.models.tournament import Tournament, TournamentPlayer, ParticipantType
+from app.tests.conftest import TestSessionLocal
+from app.tests.test_match_scores import add_access_tokens
+from app.tests.test_player_stats import post_match_scores
+
+@pytest.fixture
+def enforce_budgets(client, db, monkeypatch):
+    """Raise on budget violations, and give each request its own session, so nothing is loaded in advance"""
+    monkeypatch.setattr(settings, "QUERY_BUDGET_MODE", "raise")
+
+    def override_get_db():
+        session = TestSessionLocal(bind=db.connection())
+        try:
+            yield session
+        finally:
+            session.close()
+
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+
+@pytest.fixture
+def budget_season(auth_client, db, setup_league_season):
+    """The league season with two completed matches, access tokens and a team tournament"""
+    season = setup_league_season
+    for match in season["matches"][:2]:
+        post_match_scores(auth_client, db, match, season["holes"], 5, 1.0)
+    tokens = add_access_tokens(db, season["matches"][2])
+    tournament = Tournament(
+        name="Budget Open", start_date=date(2025, 6, 1), end_date=date(2025, 6, 1), format="stroke_play",
+        scoring_type="g", participant_type=ParticipantType.TEAM, team_size=2
+    )
+    tournament.teams = list(season["teams"])
+    tournament.courses = [season["course"]]
+    db.add(tournament)
+    db.flush()
+    for team in season["teams"]:
+        db.add_all(TournamentPlayer(tournament_id=tournament.id, player_id=player.id) for player in team.players)
+    db.commit()
+    return {**season, "tournament": tournament, "token": tokens["home"]}
+
+def endpoint_routes():
+    """Every route of every router module in app/api/endpoints"""
+    routes = []
+    for module_info in pkgutil.iter_modules(endpoints.__path__):
+        module = importlib.import_module(f"{endpoints.__name__}.{module_info.name}")
+        routes.extend((module_info.name, route) for route in module.router.routes if isinstance(route, APIRoute))
+    return routes
+
+def test_every_endpoint_has_a_query_budget():
+    routes = endpoint_routes()
+    assert {name for name, _ in routes} == {
+        "auth", "users", "teams", "courses", "leagues", "weeks", "matches",
+        "players", "player_stats", "team_stats", "tournaments"
+    }
+    missing = [f"{name}.{route.endpoint.__name__}" for name, route in routes if get_query_budget(route.endpoint) is None]
+    assert missing == []
+
+def read_requests(season):
+    league_id = season["league"].id
+    match = season["matches"][0]
+    player = season["teams"][0].players[0]
+    team = season["teams"][0]
+    tournament_id = season["tournament"].id
+    course_id = season["course"].id
+    return {
+        "auth": [("post", "/api/auth/login/json", {"json": {"username": "nobody", "password": "x"}}, 401)],
+        "users": [("get", "/api/users/me", {}, 200)],
+        "teams": [
+            ("get", "/api/teams", {}, 200),
+            ("get", f"/api/teams/{team.id}", {}, 200),
+            ("get", "/api/teams/check-email", {"params": {"email": "nobody@example.com"}}, 200),
+        ],
+        "courses": [
+            ("get", "/api/courses/", {}, 200),
+            ("get", f"/api/courses/{course_id}", {}, 200),
+            ("get", f"/api/courses/{course_id}/stats", {}, 200),
+        ],
+        "leagues": [
+            ("get", "/api/leagues/", {}, 200),
+            ("get", f"/api/leagues/{league_id}", {}, 200),
+            ("get", f"/api/leagues/{league_id}/weeks", {}, 200),
+            ("get", f"/api/leagues/weeks/{season['weeks'][0].id}", {}, 200),
+            ("get", f"/api/leagues/{league_id}/leaderboard", {}, 200),
+            ("get", f"/api/leagues/{league_id}/summary", {}, 200),
+            ("get", f"/api/leagues/{league_id}/matches", {}, 200),
+            ("get", f"/api/leagues/{league_id}/teams", {}, 200),
+            ("get", f"/api/leagues/{league_id}/players/{player.id}", {}, 200),
+        ],
+        "weeks": [
+            ("get", f"/api/weeks/{league_id}/weeks", {}, 200),
+        ],
+        "matches": [
+            ("get", f"/api/matches/weeks/{season['weeks'][0].id}/matches", {}, 200),
+            ("get", f"/api/matches/{match.id}", {}, 200),
+            ("get", f"/api/matches/{match.id}/scores", {}, 200),
+            ("get", f"/api/matches/{match.id}/players", {}, 200),
+            ("get", f"/api/matches/{season['matches'][2].id}/access-tokens", {}, 200),
+            ("get", f"/api/matches/validate-token/{season['token']}", {}, 200),
+        ],
+        "players": [
+            ("get", "/api/players", {}, 200),
+            ("get", f"/api/players/{player.id}", {}, 200),
+            ("get", f"/api/players/leagues/{league_id}/handicaps", {}, 200),
+            ("get", f"/api/players/{player.id}/teams", {}, 200),
+        ],
+        "player_stats": [
+            ("get", "/api/player-stats/top-gross-scores", {}, 200),
+            ("get", "/api/player-stats/top-net-scores", {}, 200),
+            ("get", f"/api/player-stats/player/{player.id}/average", {}, 200),
+            ("get", f"/api/player-stats/league/{league_id}/player-stats", {}, 200),
+            ("get", f"/api/player-stats/league/{league_id}/top-scores", {}, 200),
+            ("get", f"/api/player-stats/league/{league_id}/most-improved", {}, 200),
+            ("get", f"/api/player-stats/league/{league_id}/mvp", {}, 200),
+            ("get", f"/api/player-stats/league/{league_id}/mvp-detailed", {}, 200),
+        ],
+        "team_stats": [
+            ("get", f"/api/team-stats/league/{league_id}", {}, 200),
+            ("get", f"/api/team-stats/league/{league_id}/top-scores", {}, 200),
+        ],
+        "tournaments": [
+            ("get", "/api/tournaments/", {}, 200),
+            ("get", f"/api/tournaments/{tournament_id}", {}, 200),
+            ("get", f"/api/tournaments/{tournament_id}/players", {}, 200),
+            ("get", f"/api/tournaments/{tournament_id}/courses", {}, 200),
+            ("get", f"/api/tournaments/{tournament_id}/teams", {}, 200),
+        ],
+    }
+
+def test_reads_stay_within_budget(auth_client, db, budget_season, enforce_budgets):
+    requests = read_requests(budget_season)
+    for router, calls in requests.items():
+        for method, url, kwargs, expected in calls:
+            response = getattr(auth_client, method)(url, **kwargs)
+            assert response.status_code == expected, (router, url, response.text)
+            assert int(response.headers["x-query-count"]) >= 1
+
+@pytest.mark.parametrize("url", [
+    "/api/teams",
+    "/api/teams/{team_id}",
+    "/api/players",
+    "/api/players/{player_id}/teams",
+    "/api/leagues/{league_id}/teams",
+    "/api/leagues/{league_id}/players/{player_id}",
+    "/api/matches/weeks/{week_id}/matches",
+    "/api/matches/{match_id}/access-tokens",
+    "/api/tournaments/{tournament_id}/teams",
+])
+def test_list_endpoints_do_not_query_per_row(auth_client, db, budget_season, enforce_budgets, monkeypatch, url):
+    monkeypatch.setattr(settings, "QUERY_REPEAT_LIMIT", 1)
+    url = url.format(
+        team_id=budget_season["teams"][0].id,
+        player_id=budget_season["teams"][0].players[0].id,
+        league_id=budget_season["league"].id,
+        week_id=budget_season["weeks"][0].id,
+        match_id=budget_season["matches"][2].id,
+        tournament_id=budget_season["tournament"].id
+    )
+    response = auth_client.get(url)
+    assert response.status_code == 200, response.text
+
+def test_generating_access_tokens_does_not_query_per_team(auth_client, budget_season, enforce_budgets, monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_REPEAT_LIMIT", 1)
+    response = auth_client.post(f"/api/matches/{budget_season['matches'][0].id}/access-tokens")
+    assert response.status_code == 200, response.text
+    assert all(token["team_name"] for token in response.json())
+
+def test_exceeding_a_budget_fails_the_request(auth_client, setup_league_season, enforce_budgets, monkeypatch):
+    from app.api.endpoints import leagues
+    league_id = setup_league_season["league"].id
+    monkeypatch.setattr(leagues, "QUERY_BUDGET", 2)
+    assert auth_client.get(f"/api/leagues/{league_id}/weeks").status_code == 200
+
+    # The league, then its teams and courses for the response
+    response = auth_client.get(f"/api/leagues/{league_id}")
+    assert response.status_code == 500
+    assert response.json()["detail"] == f"Query budget exceeded by GET /api/leagues/{league_id}: 3 SQL statements, over the budget of 2"
+    assert response.headers["x-query-count"] == "3"
+
+    # Warnings leave the response alone
+    monkeypatch.setattr(settings, "QUERY_BUDGET_MODE", "warn")
+    response = auth_client.get(f"/api/leagues/{league_id}")
+    assert response.status_code == 200
+    assert response.json()["id"] == league_id
+
+def test_repeated_statement_shapes_are_flagged():
+    shapes = Counter({f"SELECT * FROM teams WHERE teams.id IN (?{', ?' * n})": 1 for n in range(3)})
+    shapes["SELECT * FROM players WHERE players.id = ?"] = 3
+    # IN lists of any length are one shape
+    assert check_request(shapes, None, 3) == []
+    assert check_request(shapes, 6, 3) == []
+    violations = check_request(shapes, 5, 2)
+    assert violations[0] == "6 SQL statements, over the budget of 5"
+    assert violations[1:] == [
+        "3 runs of the same statement (N+1?): SELECT * FROM teams WHERE teams.id IN (...)",
+        "3 runs of the same statement (N+1?): SELECT * FROM players WHERE players.id = ?",
+    ]
@@ -0,0 +1,202 @@
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from app import scoring
+from app.crud import handicap as handicap_crud
+from app.models.match import Match
+from app.models.match_player import MatchPlayer
+from app.models.player_league_stats import PlayerLeagueStats
+from app.scoring import rescore
+from app.tests.test_player_stats import post_match_scores
+
+HOLES = [(1, 1), (2, 2), (3, 3)]
+HOME = [(10, 0.0), (11, 2.0)]
+AWAY = [(20, 1.0), (21, 0.0)]
+STROKES = {
+    (10, 1): 4, (11, 1): 5, (20, 1): 5, (21, 1): 5,
+    (10, 2): 4, (11, 2): 5, (20, 2): 4, (21, 2): 3,
+    (10, 3): 3, (11, 3): 3, (20, 3): 4, (21, 3): 4,
+}
+
+def test_pops_come_off_the_lowest_handicap():
+    assert scoring.calculate_pops([10.0, 4.0, None, 7.0]).tolist() == [6.0, 0.0, 0.0, 3.0]
+    assert scoring.calculate_pops([None, None]).tolist() == [0.0, 0.0]
+
+def test_strokes_wrap_around_short_courses():
+    nine_holes = [5, 1, 9, 3, 7, 2, 8, 4, 6]
+    strokes = scoring.allocate_strokes(np.array([0, 3, 11]), nine_holes)
+    assert strokes[0].tolist() == [0] * 9
+    # Three pops go to the holes rated 1, 2 and 3
+    assert strokes[1].tolist() == [0, 1, 0, 1, 0, 1, 0, 0, 0]
+    # Eleven pops: one on every hole, plus one more on the two hardest
+    assert strokes[2].tolist() == [1, 2, 1, 1, 1, 2, 1, 1, 1]
+
+    # Holes without a handicap never receive strokes
+    assert scoring.allocate_strokes(np.array([4]), [1, None, 2]).tolist() == [[2, 0, 1]]
+
+def test_score_match_points_and_totals():
+    results = scoring.score_match(HOLES, HOME, AWAY, STROKES)
+    players = results["players"]
+
+    assert [players[p]["pops"] for p in (10, 11, 20, 21)] == [0, 2, 1, 0]
+    assert players[11]["net_by_hole"] == [4, 4, 3]
+    assert players[20]["net_by_hole"] == [4, 4, 4]
+
+    # Hole 1 is tied across teams, hole 2 is won outright, hole 3 is shared by one team
+    assert [players[p]["points_by_hole"] for p in (10, 11, 20, 21)] == [
+        [0, 0, 0.5], [0, 0, 0.5], [0, 0, 0], [0, 1, 0]
+    ]
+    assert [players[p]["points"] for p in (10, 11, 20, 21)] == [0.5, 0.5, 0, 1]
+    assert [players[p]["gross_score"] for p in (10, 11, 20, 21)] == [11, 13, 13, 12]
+    assert [players[p]["net_score"] for p in (10, 11, 20, 21)] == [11, 11, 12, 12]
+
+    assert results["home_team"] == {"gross_score": 24, "net_score": 22, "points": 3, "points_by_hole": [1, 0, 1]}
+    assert results["away_team"] == {"gross_score": 25, "net_score": 24, "points": 2, "points_by_hole": [0, 1, 0]}
+
+def test_incomplete_holes_award_no_team_point():
+    strokes = {key: value for key, value in STROKES.items() if key != (21, 3)}
+    results = scoring.score_match(HOLES, HOME, AWAY, strokes)
+
+    assert results["home_team"]["points_by_hole"] == [1, 0, None]
+    assert results["home_team"]["gross_score"] == 18
+    assert results["players"][21]["points_by_hole"] == [0, 1, None]
+    # Individual points are still awarded among the players who scored
+    assert results["players"][10]["points_by_hole"][2] == 0.5
+
+    unplayed = scoring.score_match(HOLES, HOME, AWAY, {})
+    assert unplayed["players"][10]["gross_score"] is None
+    assert unplayed["home_team"] == {"gross_score": None, "net_score": None, "points": 0, "points_by_hole": [None] * 3}
+
+def test_unpaired_players_score_no_points():
+    results = scoring.score_match(HOLES, HOME + [(12, 0.0)], AWAY, {**STROKES, (12, 1): 1, (12, 2): 1, (12, 3): 1})
+    assert results["players"][12]["points"] == 0
+    assert results["players"][12]["gross_score"] == 3
+    # Home has a player without an opponent, so no hole is ever complete
+    assert results["home_team"]["points_by_hole"] == [None] * 3
+
+def test_save_match_scores_derives_results(auth_client, db, setup_league_season):
+    season = setup_league_season
+    match = season["matches"][0]
+    holes = season["holes"]
+    # A third home player, left unpaired
+    substitute = season["teams"][2].players[0]
+    db.add(MatchPlayer(
+        match_id=match.id, team_id=match.home_team_id, player_id=substitute.id,
+        handicap=round(substitute.handicap), is_substitute=True, is_active=True
+    ))
+    db.commit()
+    match_players = db.query(MatchPlayer).filter(MatchPlayer.match_id == match.id).order_by(MatchPlayer.id).all()
+
+    scores = [
+        {"player_id": mp.player_id, "hole_id": hole.id, "strokes": 4 + (index + hole.number) % 3}
+        for index, mp in enumerate(match_players) for hole in holes
+    ]
+    # The client's summaries, their order and team totals are ignored when hole scores are posted
+    summaries = [
+        {"player_id": mp.player_id, "team_id": mp.team_id, "handicap": mp.handicap,
+         "pops": 40, "gross_score": 1, "net_score": 1, "points": 99}
+        for mp in match_players[-1:] + match_players[:-1]
+    ]
+    response = auth_client.post(f"/api/matches/{match.id}/scores", json={
+        "scores": scores, "player_summaries": summaries, "is_completed": True,
+        "home_team_points": 50, "away_team_points": 50
+    })
+    assert response.status_code == 200
+
+    expected = scoring.score_match(
+        [(hole.id, hole.handicap) for hole in sorted(holes, key=lambda hole: hole.number)],
+        [(mp.player_id, mp.handicap) for mp in match_players if mp.team_id == match.home_team_id],
+        [(mp.player_id, mp.handicap) for mp in match_players if mp.team_id == match.away_team_id],
+        {(score["player_id"], score["hole_id"]): score["strokes"] for score in scores}
+    )
+    db.expire_all()
+    for mp in db.query(MatchPlayer).filter(MatchPlayer.match_id == match.id).all():
+        result = expected["players"][mp.player_id]
+        assert mp.gross_score == result["gross_score"]
+        assert mp.points == result["points"]
+        assert mp.pops == result["pops"]
+        assert mp.net_score == result["net_score"]
+
+    saved = db.get(Match, match.id)
+    assert saved.home_team_points == expected["home_team"]["points"]
+    assert saved.away_team_points == expected["away_team"]["points"]
+    assert saved.home_team_gross_score == expected["home_team"]["gross_score"]
+    assert saved.home_team_points + saved.away_team_points <= len(holes) * 2
+
+    # Rescoring pairs players the same way, so it changes nothing
+    rescored = scoring.rescore_league(db, season["league"].id, workers=1)
+    assert rescored["match_players_updated"] == 0
+    assert rescored["matches_updated"] == 0
+
+def stored_results(db, match_ids):
+    db.expire_all()
+    players = {
+        mp.id: (mp.handicap, mp.pops, mp.gross_score, mp.net_score, mp.points)
+        for mp in db.query(MatchPlayer).filter(MatchPlayer.match_id.in_(match_ids)).all()
+    }
+    matches = {
+        match.id: (match.home_team_gross_score, match.home_team_net_score, match.home_team_points,
+                   match.away_team_gross_score, match.away_team_net_score, match.away_team_points)
+        for match in db.query(Match).filter(Match.id.in_(match_ids)).all()
+    }
+    return players, matches
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_rescore_league_restores_and_is_idempotent(auth_client, db, setup_league_season, monkeypatch, workers):
+    season = setup_league_season
+    league_id = season["league"].id
+    match_ids = [match.id for match in season["matches"]]
+    for index, match in enumerate(season["matches"]):
+        post_match_scores(auth_client, db, match, season["holes"], 4 + index % 3, 0)
+    expected = stored_results(db, match_ids)
+
+    # Stale results, as if scored under different rules
+    db.query(MatchPlayer).filter(MatchPlayer.match_id.in_(match_ids)).update({"points": 7.0, "net_score": 1}, synchronize_session=False)
+    db.query(Match).filter(Match.id == match_ids[0]).update({"home_team_points": 99.0}, synchronize_session=False)
+    db.commit()
+
+    monkeypatch.setattr(rescore, "MIN_PARALLEL_MATCHES", 0)
+    progress = []
+    result = scoring.rescore_league(db, league_id, workers=workers, batch_size=3, progress=lambda done, total: progress.append((done, total)))
+    db.commit()
+
+    assert result["matches"] == 4
+    assert result["match_players_updated"] == 16
+    assert result["matches_updated"] == 1
+    assert progress[-1] == (4, 4)
+    assert stored_results(db, match_ids) == expected
+
+    # The season rollups are rebuilt from the rescored rows
+    for rollup in db.query(PlayerLeagueStats).filter(PlayerLeagueStats.league_id == league_id).all():
+        assert rollup.points_total == pytest.approx(sum(
+            mp.points for mp in db.query(MatchPlayer).filter(MatchPlayer.player_id == rollup.player_id).all()
+        ))
+
+    # Nothing left to change on a second run
+    again = scoring.rescore_league(db, league_id, workers=workers)
+    assert again["match_players_updated"] == 0
+    assert again["matches_updated"] == 0
+
+def test_rescore_with_historical_handicaps(auth_client, db, setup_league_season):
+    season = setup_league_season
+    league_id = season["league"].id
+    match = season["matches"][0]
+    post_match_scores(auth_client, db, match, season["holes"], 5, 0)
+
+    player = season["teams"][0].players[1]
+    handicap_crud.record_handicap_changes(db, {player.id: 17.6}, "manual", effective_date=match.match_date - timedelta(days=1))
+    # The handicap this match's own scores produced that night is not the one it was played with
+    handicap_crud.record_handicap_changes(db, {player.id: 3.2}, "scores", effective_date=match.match_date)
+    db.commit()
+
+    scoring.rescore_league(db, league_id, workers=1, handicaps_from_history=True)
+    db.commit()
+    match_player = db.query(MatchPlayer).filter(
+        MatchPlayer.match_id == match.id, MatchPlayer.player_id == player.id
+    ).one()
+    assert match_player.handicap == 18
+    assert match_player.pops == 18 - min(
+        mp.handicap for mp in db.query(MatchPlayer).filter(MatchPlayer.match_id == match.id).all()
+    )
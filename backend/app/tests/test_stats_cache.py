@@ -0,0 +1,86 @@
+from app.core import stats_cache
+from app.core.stats_cache import ResponseCache, response_cache
+from app.tests.test_team_stats import post_team_result
+
+def test_leaderboard_served_from_cache_until_league_changes(auth_client, db, setup_league_season, count_queries):
+    season = setup_league_season
+    url = f"/api/leagues/{season['league'].id}/leaderboard"
+    
+    first = auth_client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    
+    hits_before = response_cache.hits
+    with count_queries() as statements:
+        second = auth_client.get(url)
+    assert second.json() == first.json()
+    assert second.headers["etag"] == etag
+    assert response_cache.hits == hits_before + 1
+    # Only the league's version is read
+    assert len(statements) == 1
+    
+    # Revalidation answers 304 without running the endpoint
+    with count_queries() as statements:
+        not_modified = auth_client.get(url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert len(statements) == 1
+    
+    # A committed result for this league changes the version, the ETag and the data
+    post_team_result(auth_client, season["matches"][0], (80, 70, 3.0), (84, 72, 1.0))
+    changed = auth_client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()[0]["matches_played"] == 1
+
+def test_versions_are_shared_between_processes(auth_client, db, setup_league_season):
+    league_id = setup_league_season["league"].id
+    url = f"/api/leagues/{league_id}/leaderboard"
+    etag = auth_client.get(url).headers["etag"]
+    
+    # Another worker, with nothing cached, hands out the same ETag for the same data
+    response_cache.clear()
+    assert auth_client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    
+    # A script's commit only reaches this process through the database
+    stats_cache.bump_league_versions(db, [league_id])
+    db.commit()
+    changed = auth_client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+def test_query_parameters_and_renames_are_part_of_the_key(auth_client, db, setup_league_season):
+    season = setup_league_season
+    url = f"/api/team-stats/league/{season['league'].id}/top-scores"
+    post_team_result(auth_client, season["matches"][0], (80, 70, 3.0), (84, 72, 1.0))
+    
+    gross = auth_client.get(url, params={"score_type": "gross"})
+    net = auth_client.get(url, params={"score_type": "net"})
+    assert gross.headers["etag"] != net.headers["etag"]
+    assert gross.json()[0]["score"] == 80
+    assert net.json()[0]["score"] == 70
+    
+    # Team names show up in every league, so renaming one invalidates them all
+    team = season["teams"][0]
+    team.name = "Renamed"
+    db.commit()
+    renamed = auth_client.get(url, params={"score_type": "gross"})
+    assert renamed.headers["etag"] != gross.headers["etag"]
+    assert renamed.json()[0]["team_name"] == "Renamed"
+
+def test_response_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.put("c", b"3")
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+    stats = cache.get_stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.75
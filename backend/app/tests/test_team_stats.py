@@ -0,0 +1,161 @@
+import pytest
+from app.models.team_league_standings import TeamLeagueStandings
+
+def post_team_result(client, match, home, away):
+    """Record a completed match result as (gross, net, points) for each side"""
+    response = client.post(
+        f"/api/matches/{match.id}/scores",
+        json={
+            "scores": [],
+            "player_summaries": [],
+            "is_completed": True,
+            "home_team_gross_score": home[0],
+            "home_team_net_score": home[1],
+            "home_team_points": home[2],
+            "away_team_gross_score": away[0],
+            "away_team_net_score": away[1],
+            "away_team_points": away[2]
+        }
+    )
+    assert response.status_code == 200
+
+def get_standings(db, league_id):
+    db.expire_all()
+    rows = db.query(TeamLeagueStandings).filter(TeamLeagueStandings.league_id == league_id).all()
+    return {row.team_id: row for row in rows}
+
+def test_standings_follow_match_results(auth_client, db, setup_league_season):
+    """Completing, rescoring and deleting matches keeps the standings rows in step"""
+    season = setup_league_season
+    league_id = season["league"].id
+    team_a, team_b, team_c, _ = [team.id for team in season["teams"]]
+    
+    # Week 1: A vs B, week 2: A vs C
+    post_team_result(auth_client, season["matches"][0], (80, 70, 3.0), (84, 72, 1.0))
+    post_team_result(auth_client, season["matches"][2], (82, 71, 0.0), (78, 68, 4.0))
+    
+    standings = get_standings(db, league_id)
+    assert set(standings) == {team_a, team_b, team_c}
+    assert standings[team_a].matches_played == 2
+    assert standings[team_a].points_won == pytest.approx(3.0)
+    assert standings[team_a].points_lost == pytest.approx(5.0)
+    assert standings[team_a].lowest_gross == 80
+    assert standings[team_a].avg_net == pytest.approx(70.5)
+    assert standings[team_c].win_percentage == pytest.approx(100.0)
+    
+    # Rescoring replaces the earlier result rather than adding to it
+    post_team_result(auth_client, season["matches"][0], (79, 69, 2.0), (84, 72, 2.0))
+    standings = get_standings(db, league_id)
+    assert standings[team_a].matches_played == 2
+    assert standings[team_a].points_won == pytest.approx(2.0)
+    assert standings[team_a].lowest_gross == 79
+    assert standings[team_b].points_won == pytest.approx(2.0)
+    
+    # Deleting a match drops its contribution
+    response = auth_client.delete(f"/api/matches/{season['matches'][2].id}")
+    assert response.status_code == 204
+    standings = get_standings(db, league_id)
+    assert set(standings) == {team_a, team_b}
+    assert standings[team_a].matches_played == 1
+    assert standings[team_a].points_lost == pytest.approx(2.0)
+
+def test_leaderboard_and_team_stats_read_standings(auth_client, db, setup_league_season):
+    season = setup_league_season
+    league_id = season["league"].id
+    match = season["matches"][0]
+    post_team_result(auth_client, match, (80, 70, 3.0), (84, 72, 1.0))
+    
+    response = auth_client.get(f"/api/leagues/{league_id}/leaderboard")
+    assert response.status_code == 200
+    leaderboard = response.json()
+    # Every league team is listed, including those without results
+    assert len(leaderboard) == len(season["teams"])
+    assert leaderboard[0]["id"] == match.home_team_id
+    assert leaderboard[0]["win_percentage"] == pytest.approx(75.0)
+    assert leaderboard[0]["lowest_gross"] == 80
+    assert leaderboard[-1]["matches_played"] == 0
+    
+    response = auth_client.get(f"/api/team-stats/league/{league_id}")
+    assert response.status_code == 200
+    team_stats = response.json()
+    assert [row["team_id"] for row in team_stats] == [match.home_team_id, match.away_team_id]
+    assert team_stats[1]["win_percentage"] == 25
+    assert team_stats[1]["avg_gross_score"] == pytest.approx(84.0)
+    assert team_stats[1]["lowest_net_score"] == pytest.approx(72.0)
+    assert team_stats[0]["rank"] == 1
+
+def legacy_team_stats(db, league_id):
+    """The pre-rollup endpoint's per-team home/away aggregation, kept as a reference"""
+    from sqlalchemy import func
+    from app.models.match import Match
+    from app.models.week import Week
+    
+    def side_stats(team_id, team, opponent):
+        return db.query(
+            func.count(Match.id),
+            func.sum(getattr(Match, f"{team}_team_gross_score")),
+            func.min(getattr(Match, f"{team}_team_gross_score")),
+            func.sum(getattr(Match, f"{team}_team_net_score")),
+            func.min(getattr(Match, f"{team}_team_net_score")),
+            func.sum(getattr(Match, f"{team}_team_points")),
+            func.sum(getattr(Match, f"{opponent}_team_points"))
+        ).join(Week, Match.week_id == Week.id).filter(
+            Week.league_id == league_id,
+            getattr(Match, f"{team}_team_id") == team_id,
+            Match.is_completed == True,
+            getattr(Match, f"{team}_team_gross_score").isnot(None)
+        ).first()
+    
+    results = {}
+    for team_id in {team_id for match in db.query(Match).all() for team_id in (match.home_team_id, match.away_team_id)}:
+        sides = [side_stats(team_id, "home", "away"), side_stats(team_id, "away", "home")]
+        played = sum(side[0] for side in sides)
+        if not played:
+            continue
+        won = sum(side[5] or 0 for side in sides)
+        lost = sum(side[6] or 0 for side in sides)
+        results[team_id] = {
+            "matches_played": played,
+            "points_won": won,
+            "points_lost": lost,
+            "win_percentage": round(won / (won + lost) * 100) if won + lost else 0,
+            "avg_gross_score": sum(side[1] or 0 for side in sides) / played,
+            "avg_net_score": sum(side[3] or 0 for side in sides) / played,
+            "lowest_gross_score": min(side[2] for side in sides if side[2] is not None),
+            "lowest_net_score": min(side[4] for side in sides if side[4] is not None)
+        }
+    return results
+
+def test_team_stats_match_legacy_aggregation(auth_client, db, setup_league_season):
+    """The single grouped standings query reproduces the old per-team output"""
+    import random
+    
+    season = setup_league_season
+    league_id = season["league"].id
+    rng = random.Random(7)
+    for match in season["matches"]:
+        home_points = rng.choice([0.0, 1.5, 2.0, 3.5, 4.0])
+        post_team_result(
+            auth_client, match,
+            (rng.randint(70, 95), rng.randint(60, 80), home_points),
+            (rng.randint(70, 95), rng.randint(60, 80), 4.0 - home_points)
+        )
+    # Team stats count a side by its gross score, the leaderboard by both teams' points
+    no_gross, no_points = season["matches"][:2]
+    post_team_result(auth_client, no_gross, (None, None, 3.0), (81, 70, 1.0))
+    post_team_result(auth_client, no_points, (77, 66, None), (83, 71, None))
+    
+    expected = legacy_team_stats(db, league_id)
+    response = auth_client.get(f"/api/team-stats/league/{league_id}")
+    assert response.status_code == 200
+    actual = {row["team_id"]: row for row in response.json()}
+    
+    assert set(actual) == set(expected)
+    for team_id, legacy in expected.items():
+        for field, value in legacy.items():
+            assert actual[team_id][field] == pytest.approx(value), field
+    
+    leaderboard = {row["id"]: row for row in auth_client.get(f"/api/leagues/{league_id}/leaderboard").json()}
+    for team_id in (no_points.home_team_id, no_points.away_team_id):
+        played = sum(team_id in (match.home_team_id, match.away_team_id) for match in season["matches"][:1] + season["matches"][2:])
+        assert leaderboard[team_id]["matches_played"] == played
@@ -0,0 +1,118 @@
+"""
+Benchmark the league rescoring job.
+
+Seeds one league with the requested number of completed 4-vs-4 matches on a
+9-hole course (hole scores included, team results deliberately stale), then
+times rescore_league in this process and with the process pool, plus an
+idempotent second run that finds nothing to change.
+
+Usage (from the backend directory):
+    python -m benchmarks.rescore_league --url sqlite:///./bench_rescore.db
+    python -m benchmarks.rescore_league --matches 500 2000 --workers 4
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+import app.db.init_models  # Register every model before creating tables
+from app.scoring import rescore_league
+
+PLAYERS_PER_TEAM = 4
+HOLES = 9
+
+def seed(conn: Connection, matches: int, teams: int):
+    """One league whose matches all have hole scores but zeroed results"""
+    t = Base.metadata.tables
+    rng = random.Random(42)
+    weeks = max(1, -(-matches * 2 // teams))
+
+    conn.execute(t["courses"].insert(), [{"id": 1, "name": "Benchmark Nine", "total_par": 36}])
+    conn.execute(t["holes"].insert(), [
+        {"id": n, "number": n, "par": 4, "handicap": ((n * 5) % HOLES) + 1, "course_id": 1}
+        for n in range(1, HOLES + 1)
+    ])
+    conn.execute(t["leagues"].insert(), [{"id": 1, "name": "Benchmark League"}])
+    conn.execute(t["teams"].insert(), [{"id": i, "name": f"Team {i}"} for i in range(1, teams + 1)])
+    conn.execute(t["players"].insert(), [
+        {"id": i, "first_name": "Player", "last_name": str(i), "handicap": float(rng.randint(0, 20))}
+        for i in range(1, teams * PLAYERS_PER_TEAM + 1)
+    ])
+    start = date(2000, 1, 3)
+    conn.execute(t["league_weeks"].insert(), [
+        {"id": w, "week_number": w, "league_id": 1,
+         "start_date": start + timedelta(days=7 * (w - 1)), "end_date": start + timedelta(days=7 * w - 1)}
+        for w in range(1, weeks + 1)
+    ])
+
+    team_ids = list(range(1, teams + 1))
+    match_rows, player_rows, score_rows = [], [], []
+    match_id = match_player_id = 0
+    while match_id < matches:
+        week = match_id * 2 // teams + 1
+        rng.shuffle(team_ids)
+        for home_id, away_id in zip(team_ids[0::2], team_ids[1::2]):
+            if match_id >= matches:
+                break
+            match_id += 1
+            match_rows.append({
+                "id": match_id, "match_date": start + timedelta(days=7 * (week - 1)), "is_completed": True,
+                "week_id": week, "course_id": 1, "home_team_id": home_id, "away_team_id": away_id,
+                "home_team_points": 0.0, "away_team_points": 0.0,
+            })
+            for team_id in (home_id, away_id):
+                first_player = (team_id - 1) * PLAYERS_PER_TEAM + 1
+                for player_id in range(first_player, first_player + PLAYERS_PER_TEAM):
+                    match_player_id += 1
+                    player_rows.append({
+                        "id": match_player_id, "match_id": match_id, "team_id": team_id, "player_id": player_id,
+                        "is_substitute": False, "is_active": True, "handicap": float(rng.randint(0, 20)),
+                        "points": 0.0,
+                    })
+                    score_rows.extend(
+                        {"match_id": match_id, "player_id": player_id, "hole_id": hole, "strokes": rng.randint(3, 8)}
+                        for hole in range(1, HOLES + 1)
+                    )
+    conn.execute(t["matches"].insert(), match_rows)
+    conn.execute(t["match_players"].insert(), player_rows)
+    conn.execute(t["player_scores"].insert(), score_rows)
+
+def run(url: str, matches: int, teams: int, workers: int):
+    engine = create_engine(url)
+    print(f"\n=== {matches} matches ({matches * 2 * PLAYERS_PER_TEAM:,} players, {matches * 2 * PLAYERS_PER_TEAM * HOLES:,} hole scores) ===")
+    for label, pool_workers in (("in process", 1), (f"{workers or 'cpu'} workers", workers)):
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            seed(conn, matches, teams)
+
+        with Session(engine) as db:
+            started = time.perf_counter()
+            result = rescore_league(db, 1, workers=pool_workers)
+            db.commit()
+            elapsed = time.perf_counter() - started
+            print(f"{label:<14} {elapsed * 1000:>9.1f} ms  ({result['match_players_updated']} players, {result['matches_updated']} matches updated)")
+
+            started = time.perf_counter()
+            result = rescore_league(db, 1, workers=pool_workers)
+            db.commit()
+            print(f"{'  re-run':<14} {(time.perf_counter() - started) * 1000:>9.1f} ms  ({result['match_players_updated']} players updated)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite:///./bench_rescore.db", help="Database URL to seed (will be wiped)")
+    parser.add_argument("--matches", type=int, nargs="+", default=[500, 5000])
+    parser.add_argument("--teams", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    for matches in args.matches:
+        run(args.url, matches, args.teams, args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Benchmark the vectorized season analytics engine against the SQL/Python code
+paths the stats endpoints used before it.
+
+Seeds one league with the requested number of player rounds (MatchPlayer rows),
+then times, for each size:
+  most_improved      the old endpoint's ordered query + per-row Python loop
+                     vs load_season_frame + analytics.most_improved
+  player_metrics     a GROUP BY player aggregate query
+                     vs load_season_frame + analytics.player_metrics
+  team_metrics       a GROUP BY team aggregate query
+                     vs load_season_frame + analytics.team_metrics
+"engine ms" is compute only; "load+engine" adds the one load query, and the
+speedup compares legacy against compute only (the frame is loaded once and
+shared by every metric).
+
+Usage (from the backend directory):
+    python -m benchmarks.season_analytics --url sqlite:///./bench_analytics.db
+    python -m benchmarks.season_analytics --rounds 10000 1000000 --repeat 3
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+import app.models.match_player  # match_players is not registered by app.db.base
+from app import analytics
+from app.models.match import Match
+from app.models.match_player import MatchPlayer
+from app.models.player import Player
+from app.models.week import Week
+
+PLAYERS_PER_TEAM = 4
+BATCH_SIZE = 50000
+
+def seed(conn: Connection, rounds: int, teams: int):
+    """Insert one league with `teams` teams and enough weeks to reach `rounds` player rounds"""
+    t = Base.metadata.tables
+    rng = random.Random(42)
+    weeks = max(1, rounds // (teams * PLAYERS_PER_TEAM))
+
+    conn.execute(t["courses"].insert(), [{"id": 1, "name": "Benchmark Links", "total_par": 36}])
+    conn.execute(t["leagues"].insert(), [{"id": 1, "name": "Benchmark League"}])
+    conn.execute(t["teams"].insert(), [{"id": i, "name": f"Team {i}"} for i in range(1, teams + 1)])
+    conn.execute(t["league_teams"].insert(), [{"league_id": 1, "team_id": i} for i in range(1, teams + 1)])
+    conn.execute(t["players"].insert(), [
+        {"id": i, "first_name": "Player", "last_name": str(i), "handicap": rng.uniform(0, 20)}
+        for i in range(1, teams * PLAYERS_PER_TEAM + 1)
+    ])
+
+    start = date(2000, 1, 3)
+    conn.execute(t["league_weeks"].insert(), [
+        {"id": w, "week_number": w, "league_id": 1,
+         "start_date": start + timedelta(days=7 * (w - 1)), "end_date": start + timedelta(days=7 * w - 1)}
+        for w in range(1, weeks + 1)
+    ])
+
+    team_ids = list(range(1, teams + 1))
+    matches, match_players = [], []
+    match_id = match_player_id = 0
+
+    def flush():
+        if matches:
+            conn.execute(t["matches"].insert(), matches)
+        if match_players:
+            conn.execute(t["match_players"].insert(), match_players)
+        matches.clear()
+        match_players.clear()
+
+    for week in range(1, weeks + 1):
+        match_date = start + timedelta(days=7 * (week - 1))
+        rng.shuffle(team_ids)
+        for home_id, away_id in zip(team_ids[0::2], team_ids[1::2]):
+            match_id += 1
+            matches.append({
+                "id": match_id, "match_date": match_date, "is_completed": True, "week_id": week,
+                "course_id": 1, "home_team_id": home_id, "away_team_id": away_id,
+            })
+            for team_id in (home_id, away_id):
+                first_player = (team_id - 1) * PLAYERS_PER_TEAM + 1
+                for player_id in range(first_player, first_player + PLAYERS_PER_TEAM):
+                    gross = rng.randint(34, 56) if rng.random() > 0.05 else None
+                    match_player_id += 1
+                    match_players.append({
+                        "id": match_player_id, "match_id": match_id, "team_id": team_id,
+                        "player_id": player_id, "is_substitute": False, "is_active": True,
+                        "handicap": 10.0, "pops": 5,
+                        "gross_score": gross, "net_score": gross - 5 if gross else None,
+                        "points": rng.choice([0.0, 0.5, 1.0, 2.0]) if gross else None,
+                    })
+        if len(match_players) >= BATCH_SIZE:
+            flush()
+    flush()
+    return match_player_id
+
+def legacy_most_improved(db: Session, league_id: int, limit: int = 10):
+    """The per-row loop get_most_improved_players used before the analytics engine"""
+    player_rounds = db.query(
+        MatchPlayer.player_id, Player.first_name, Player.last_name,
+        MatchPlayer.gross_score, Match.match_date
+    ).join(Player, MatchPlayer.player_id == Player.id).join(
+        Match, MatchPlayer.match_id == Match.id
+    ).join(Week, Match.week_id == Week.id).filter(
+        Week.league_id == league_id, MatchPlayer.gross_score.isnot(None)
+    ).order_by(MatchPlayer.player_id, Match.match_date).all()
+
+    player_data = {}
+    for round_data in player_rounds:
+        if round_data.player_id not in player_data:
+            player_data[round_data.player_id] = {
+                "player_name": f"{round_data.first_name} {round_data.last_name}", "rounds": []
+            }
+        player_data[round_data.player_id]["rounds"].append(round_data.gross_score)
+
+    improvements = []
+    for player_id, data in player_data.items():
+        rounds = data["rounds"]
+        if len(rounds) >= 4:
+            initial_avg = sum(rounds[:3]) / 3
+            overall_avg = sum(rounds) / len(rounds)
+            improvements.append({"player_id": player_id, "improvement": round(initial_avg - overall_avg, 1)})
+    improvements.sort(key=lambda x: x["improvement"], reverse=True)
+    return improvements[:limit]
+
+def sql_player_metrics(db: Session, league_id: int):
+    return db.query(
+        MatchPlayer.player_id,
+        func.count(MatchPlayer.gross_score), func.avg(MatchPlayer.gross_score), func.min(MatchPlayer.gross_score),
+        func.avg(MatchPlayer.net_score), func.min(MatchPlayer.net_score),
+        func.sum(MatchPlayer.points), func.max(MatchPlayer.points)
+    ).join(Match, MatchPlayer.match_id == Match.id).join(Week, Match.week_id == Week.id).filter(
+        Week.league_id == league_id
+    ).group_by(MatchPlayer.player_id).all()
+
+def sql_team_metrics(db: Session, league_id: int):
+    return db.query(
+        MatchPlayer.team_id,
+        func.count(MatchPlayer.gross_score), func.avg(MatchPlayer.gross_score), func.min(MatchPlayer.gross_score),
+        func.avg(MatchPlayer.net_score), func.min(MatchPlayer.net_score), func.sum(MatchPlayer.points)
+    ).join(Match, MatchPlayer.match_id == Match.id).join(Week, Match.week_id == Week.id).filter(
+        Week.league_id == league_id
+    ).group_by(MatchPlayer.team_id).all()
+
+def time_call(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+def run(url: str, rounds: int, teams: int, repeat: int):
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        seeded = seed(conn, rounds, teams)
+
+    print(f"\n=== {seeded:,} rounds ({teams} teams, {teams * PLAYERS_PER_TEAM} players) ===")
+    with Session(engine) as db:
+        load_ms = time_call(lambda: analytics.load_season_frame(db, 1), repeat)
+        frame = analytics.load_season_frame(db, 1)
+
+        # Sanity check: both paths rank the same players first
+        expected = [row["improvement"] for row in legacy_most_improved(db, 1)]
+        improved = sorted((round(v, 1) for v in analytics.most_improved(frame)["improvement"].tolist()), reverse=True)
+        assert improved[:len(expected)] == expected, "engine and legacy most-improved disagree"
+
+        cases = {
+            "most_improved": (
+                lambda: legacy_most_improved(db, 1),
+                lambda: analytics.most_improved(frame),
+            ),
+            "player_metrics": (
+                lambda: sql_player_metrics(db, 1),
+                lambda: analytics.player_metrics(frame),
+            ),
+            "team_metrics": (
+                lambda: sql_team_metrics(db, 1),
+                lambda: analytics.team_metrics(frame),
+            ),
+        }
+
+        print(f"load_season_frame: {load_ms:.1f} ms")
+        print(f"{'metric':<18}{'legacy ms':>12}{'engine ms':>12}{'load+engine':>13}{'speedup':>14}")
+        for name, (legacy, vectorized) in cases.items():
+            legacy_ms = time_call(legacy, repeat)
+            engine_ms = time_call(vectorized, repeat)
+            print(f"{name:<18}{legacy_ms:>12.1f}{engine_ms:>12.1f}{load_ms + engine_ms:>13.1f}{legacy_ms / engine_ms:>13.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite:///./bench_analytics.db", help="Database URL to seed (will be wiped)")
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10000, 1000000])
+    parser.add_argument("--teams", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for rounds in args.rounds:
+        run(args.url, rounds, args.teams, args.repeat)
+
+if __name__ == "__main__":
+    main()
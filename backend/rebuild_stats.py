@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+import argparse
+
+from app.core import stats_cache
+from app.db.base import SessionLocal
+import app.db.init_models  # Register every model before querying
+from app.models.league import League
+from app.crud import player_league_stats as player_league_stats_crud
+from app.crud import team_league_standings as team_league_standings_crud
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild season stats rollups from match results")
+    parser.add_argument("--league-id", type=int, action="append", help="League to rebuild (repeatable)")
+    parser.add_argument("--all", action="store_true", help="Rebuild every league")
+    
+    args = parser.parse_args()
+    
+    if not args.league_id and not args.all:
+        parser.print_help()
+        return
+    
+    db = SessionLocal()
+    try:
+        if args.all:
+            league_ids = [league_id for (league_id,) in db.query(League.id).order_by(League.id).all()]
+        else:
+            league_ids = args.league_id
+        
+        for league_id in league_ids:
+            # One transaction per league so a failure doesn't roll back finished leagues
+            player_rows = player_league_stats_crud.rebuild_league_player_stats(db, league_id)
+            team_rows = team_league_standings_crud.rebuild_league_team_standings(db, league_id)
+            # The rebuild usually follows edits made outside the API, so always
+            # invalidate the running server's cached stats
+            stats_cache.mark_league_changed(db, league_id)
+            db.commit()
+            print(f"League {league_id}: rebuilt {player_rows} player stats rows and {team_rows} team standings rows")
+    except Exception as e:
+        db.rollback()
+        print(f"Error rebuilding stats: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+import argparse
+
+from app.db.base import SessionLocal
+import app.db.init_models  # Register every model before querying
+from app.models.league import League
+from app.scoring import rescore_league
+
+def print_progress(done: int, total: int):
+    if done == total or done % 50 == 0:
+        print(f"  scored {done}/{total} matches", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Rescore every match of a league from its hole scores")
+    parser.add_argument("--league-id", type=int, action="append", help="League to rescore (repeatable)")
+    parser.add_argument("--all", action="store_true", help="Rescore every league")
+    parser.add_argument("--workers", type=int, default=None, help="Scoring processes (default: one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per UPDATE batch")
+    parser.add_argument(
+        "--handicaps-from-history", action="store_true",
+        help="Reset each match handicap to the player's handicap history going into the match date (changes made that day are skipped)"
+    )
+    
+    args = parser.parse_args()
+    
+    if not args.league_id and not args.all:
+        parser.print_help()
+        return
+    
+    db = SessionLocal()
+    try:
+        if args.all:
+            league_ids = [league_id for (league_id,) in db.query(League.id).order_by(League.id).all()]
+        else:
+            league_ids = args.league_id
+        
+        for league_id in league_ids:
+            print(f"League {league_id}:")
+            # One transaction per league so a failure doesn't roll back finished leagues
+            result = rescore_league(
+                db, league_id,
+                workers=args.workers,
+                batch_size=args.batch_size,
+                handicaps_from_history=args.handicaps_from_history,
+                progress=print_progress
+            )
+            db.commit()
+            print(
+                f"  {result['matches']} matches rescored in {result['seconds']}s: "
+                f"{result['matches_updated']} matches and {result['match_players_updated']} players changed"
+            )
+    except Exception as e:
+        db.rollback()
+        print(f"Error rescoring: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
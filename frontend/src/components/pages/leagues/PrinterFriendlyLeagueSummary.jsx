@@ -58,65 +58,26 @@ const PrinterFriendlyLeagueSummary = () => {
         const fetchAllData = async () => {
             setLoading(true);
             try {
-                // Fetch league details
-                const leagueData = await get(`/leagues/${leagueId}`);
-                setLeague(leagueData);
-
-                // Fetch weeks
-                const weeksData = await get(`/leagues/${leagueId}/weeks`);
-                setWeeks(weeksData);
-
-                // Find most recent week
-                if (weeksData && weeksData.length > 0) {
-                    // Sort weeks by week number descending to get the most recent one
-                    const sortedWeeks = [...weeksData].sort((a, b) => b.week_number - a.week_number);
-                    const latestWeek = sortedWeeks[0];
-                    setSelectedWeekId(latestWeek.id);
-
-                    // Fetch matches for the latest week
-                    await fetchMatchesForWeek(latestWeek.id, leagueData);
-                }
-
-                // Fetch leaderboard data
-                try {
-                    const leaderboardData = await get(`/leagues/${leagueId}/leaderboard`);
-                    setLeaderboardData(leaderboardData);
-                } catch (error) {
-                    console.error('Error fetching leaderboard:', error);
-                    setLeaderboardData([]);
-                }
-
-                // Fetch player stats
-                try {
-                    const playerStatsData = await get(`/player-stats/league/${leagueId}/player-stats?minimum_rounds=1`);
-                    setPlayerStats(playerStatsData);
-                } catch (error) {
-                    console.error('Error fetching player stats:', error);
-                    setPlayerStats([]);
-                }
-
-                // Fetch rankings data
-                await fetchRankingsData();
-
-                // Fetch most improved players
-                await fetchMostImprovedPlayers();
-
-                // Fetch MVP players
-                await fetchMvpPlayers();
-
-                // Find the previous week for showing results
-                if (weeksData && weeksData.length > 1) {
-                    // Sort weeks by week number descending
-                    const sortedWeeks = [...weeksData].sort((a, b) => b.week_number - a.week_number);
-                    // Get the second week (index 1) which is the previous week
-                    const prevWeek = sortedWeeks[1];
-                    if (prevWeek) {
-                        setPreviousWeek(prevWeek);
-                        // Fetch the previous week's matches
-                        fetchPreviousWeekMatches(prevWeek.id, leagueData);
-                    }
-                }
-
+                // One request returns every section of the report (latest week by default)
+                const summary = await get(`/leagues/${leagueId}/summary`);
+
+                setLeague(summary.league);
+                setWeeks(summary.weeks);
+                setSelectedWeekId(summary.selected_week?.id || null);
+                setMatches(summary.week_matches);
+                setPreviousWeek(summary.previous_week);
+                setPreviousWeekMatches(summary.previous_week_matches);
+                setMakeupMatches(summary.makeup_matches);
+                setLeaderboardData(summary.leaderboard);
+                setPlayerStats(summary.player_stats);
+                setRankingsData({
+                    topIndividualGross: summary.rankings.top_individual_gross,
+                    topIndividualNet: summary.rankings.top_individual_net,
+                    topTeamGross: summary.rankings.top_team_gross,
+                    topTeamNet: summary.rankings.top_team_net
+                });
+                setMostImprovedPlayers(summary.most_improved);
+                setMvpPlayers(summary.mvp);
             } catch (error) {
                 console.error('Error fetching data:', error);
                 setError('Failed to load league data. Please try again later.');
@@ -128,197 +89,6 @@ const PrinterFriendlyLeagueSummary = () => {
         fetchAllData();
     }, [leagueId]);
 
-    // Separate useEffect to fetch makeup matches after weeks and selectedWeekId are set
-    useEffect(() => {
-        if (weeks.length > 0 && selectedWeekId && league) {
-            console.log('Fetching makeup matches after week and league data loaded');
-            fetchMakeupMatches();
-        }
-    }, [weeks, selectedWeekId, league]);
-
-    const fetchMatchesForWeek = async (weekId, leagueData) => {
-        if (!weekId) return;
-
-        try {
-            const matchesData = await get(`/matches/weeks/${weekId}/matches`);
-
-            // Enrich the matches data with team and course details
-            if (leagueData?.teams && leagueData?.courses) {
-                const enrichedMatches = matchesData.map(match => {
-                    const homeTeam = leagueData.teams.find(team => team.id === match.home_team_id);
-                    const awayTeam = leagueData.teams.find(team => team.id === match.away_team_id);
-                    const course = leagueData.courses.find(course => course.id === match.course_id);
-
-                    return {
-                        ...match,
-                        home_team: homeTeam || { name: `Team #${match.home_team_id}` },
-                        away_team: awayTeam || { name: `Team #${match.away_team_id}` },
-                        course: course || { name: `Course #${match.course_id}` }
-                    };
-                });
-
-                setMatches(enrichedMatches);
-            } else {
-                setMatches(matchesData);
-            }
-        } catch (error) {
-            console.error('Error fetching matches:', error);
-            setMatches([]);
-        }
-    };
-
-    const fetchMakeupMatches = async () => {
-        try {
-            // Fetch all matches for the league
-            const allMatches = await get(`/leagues/${leagueId}/matches`);
-
-            // Find the current date
-            const currentDate = new Date();
-
-            // Find the week with the selectedWeekId
-            const currentWeek = weeks.find(week => week.id === selectedWeekId);
-
-            if (!currentWeek) {
-                console.log('No current week found for makeup matches calculation');
-                return;
-            }
-
-            console.log('Looking for makeup matches, current week:', currentWeek.week_number);
-
-            // Filter matches that:
-            // 1. Are not completed
-            // 2. Are from past weeks (not the current week)
-            // 3. Have a date in the past or are overdue
-            const makeup = allMatches.filter(match => {
-                // Check if match is not completed
-                if (match.is_completed) return false;
-
-                // Check if match is not from the current week
-                if (match.week_id === currentWeek.id) return false;
-
-                // Find the week this match belongs to
-                const matchWeek = weeks.find(w => w.id === match.week_id);
-                if (!matchWeek) return false;
-
-                // Check if the week's end date is in the past
-                const isOverdue = new Date(matchWeek.end_date) < currentDate;
-
-                // Add some debugging
-                if (isOverdue) {
-                    console.log(`Found makeup match: Week ${matchWeek.week_number}, Teams: ${match.home_team_id} vs ${match.away_team_id}`);
-                }
-
-                return isOverdue;
-            });
-
-            console.log(`Found ${makeup.length} makeup matches`);
-
-            // Enrich the makeup matches with team and course details
-            if (league?.teams && league?.courses) {
-                const enrichedMakeupMatches = makeup.map(match => {
-                    const homeTeam = league.teams.find(team => team.id === match.home_team_id);
-                    const awayTeam = league.teams.find(team => team.id === match.away_team_id);
-                    const course = league.courses.find(course => course.id === match.course_id);
-                    const matchWeek = weeks.find(w => w.id === match.week_id);
-
-                    return {
-                        ...match,
-                        home_team: homeTeam || { name: `Team #${match.home_team_id}` },
-                        away_team: awayTeam || { name: `Team #${match.away_team_id}` },
-                        course: course || { name: `Course #${match.course_id}` },
-                        week_number: matchWeek?.week_number || 'Unknown'
-                    };
-                });
-
-                setMakeupMatches(enrichedMakeupMatches);
-            } else {
-                setMakeupMatches(makeup);
-            }
-        } catch (error) {
-            console.error('Error fetching makeup matches:', error);
-            setMakeupMatches([]);
-        }
-    };
-
-    const fetchPreviousWeekMatches = async (weekId, leagueData) => {
-        if (!weekId) return;
-
-        try {
-            const matchesData = await get(`/matches/weeks/${weekId}/matches`);
-
-            // Include ALL matches (both completed and incomplete)
-            // Enrich the matches data with team and course details
-            if (leagueData?.teams && leagueData?.courses) {
-                const enrichedMatches = matchesData.map(match => {
-                    const homeTeam = leagueData.teams.find(team => team.id === match.home_team_id);
-                    const awayTeam = leagueData.teams.find(team => team.id === match.away_team_id);
-                    const course = leagueData.courses.find(course => course.id === match.course_id);
-
-                    return {
-                        ...match,
-                        home_team: homeTeam || { name: `Team #${match.home_team_id}` },
-                        away_team: awayTeam || { name: `Team #${match.away_team_id}` },
-                        course: course || { name: `Course #${match.course_id}` }
-                    };
-                });
-
-                setPreviousWeekMatches(enrichedMatches);
-            } else {
-                setPreviousWeekMatches(matchesData);
-            }
-        } catch (error) {
-            console.error('Error fetching previous week matches:', error);
-            setPreviousWeekMatches([]);
-        }
-    };
-
-    const fetchRankingsData = async () => {
-        try {
-            // Fetch all ranking data in parallel
-            const [individualGrossData, individualNetData, teamGrossData, teamNetData] = await Promise.all([
-                get(`/player-stats/league/${leagueId}/top-scores?limit=5&score_type=gross`).catch(() => []),
-                get(`/player-stats/league/${leagueId}/top-scores?limit=5&score_type=net`).catch(() => []),
-                get(`/team-stats/league/${leagueId}/top-scores?limit=5&score_type=gross`).catch(() => []),
-                get(`/team-stats/league/${leagueId}/top-scores?limit=5&score_type=net`).catch(() => [])
-            ]);
-
-            setRankingsData({
-                topIndividualGross: individualGrossData,
-                topIndividualNet: individualNetData,
-                topTeamGross: teamGrossData,
-                topTeamNet: teamNetData
-            });
-        } catch (error) {
-            console.error('Error fetching rankings data:', error);
-            setRankingsData({
-                topIndividualGross: [],
-                topIndividualNet: [],
-                topTeamGross: [],
-                topTeamNet: []
-            });
-        }
-    };
-
-    const fetchMostImprovedPlayers = async () => {
-        try {
-            const data = await get(`/player-stats/league/${leagueId}/most-improved?limit=5`);
-            setMostImprovedPlayers(data);
-        } catch (error) {
-            console.error('Error fetching most improved players:', error);
-            setMostImprovedPlayers([]);
-        }
-    };
-
-    const fetchMvpPlayers = async () => {
-        try {
-            const data = await get(`/player-stats/league/${leagueId}/mvp?limit=5&min_rounds=1`);
-            setMvpPlayers(data);
-        } catch (error) {
-            console.error('Error fetching MVP players:', error);
-            setMvpPlayers([]);
-        }
-    };
-
     // Helper function to format points
     const formatPoints = (points) => {
         if (points === null || points === undefined) return '0';
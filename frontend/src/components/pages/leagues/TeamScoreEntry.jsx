@@ -5,7 +5,7 @@ import {
     Container, TextField, Grid
 } from '@mui/material';
 import { Save as SaveIcon } from '@mui/icons-material';
-import { get, post } from '../../../services/api'; // Import API service
+import { get, post, patch } from '../../../services/api'; // Import API service
 
 const TeamScoreEntry = () => {
     const { matchId, token } = useParams();
@@ -116,16 +116,10 @@ const TeamScoreEntry = () => {
             try {
                 setSaving(true);
 
-                // Prepare just this score for saving
-                const scoreToSave = {
-                    player_id: newScores[playerIndex].player_id,
-                    hole_id: parseInt(holeId),
+                // Save just this hole; the full card is only sent by Save Scores
+                const playerId = newScores[playerIndex].player_id;
+                await patch(`/matches/${matchId}/holes/${parseInt(holeId)}/players/${playerId}?token=${token}`, {
                     strokes: parseInt(value)
-                };
-
-                // Call API with just this one score using API service
-                await post(`/matches/${matchId}/team-scores?token=${token}`, {
-                    scores: [scoreToSave]
                 });
 
                 // Show subtle success indicator
@@ -68,6 +68,10 @@ export const put = (endpoint, data) => fetchData(endpoint, {
     method: 'PUT',
     body: JSON.stringify(data)
 });
+export const patch = (endpoint, data) => fetchData(endpoint, {
+    method: 'PATCH',
+    body: JSON.stringify(data)
+});
 export const del = (endpoint) => fetchData(endpoint, {
     method: 'DELETE'
 });
\ No newline at end of file